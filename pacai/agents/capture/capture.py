@@ -160,6 +160,14 @@ class CaptureAgent(BaseAgent):
 
         return self.distancer.getDistance(pos1, pos2)
 
+    def getMazeDistancesFrom(self, pos, targets):
+        """
+        Returns the distance from pos to each of the targets using the builtin distancer.
+        This is faster than calling `CaptureAgent.getMazeDistance` for each target.
+        """
+
+        return self.distancer.getDistancesFrom(pos, targets)
+
     def getPreviousObservation(self):
         """
         Returns the `pacai.core.gamestate.AbstractGameState` object corresponding to
@@ -29,17 +29,21 @@ class ReflexCaptureAgent(CaptureAgent):
 
         return random.choice(bestActions)
 
-    def getSuccessor(self, gameState, action):
+    def getSuccessor(self, gameState, action, validate = True):
         """
         Finds the next successor which is a grid position (location tuple).
+        Callers that only pass actions from the legal actions of gameState
+        may pass validate = False to skip checking the action
+        (see `pacai.core.gamestate.AbstractGameState.generateSuccessor`).
         """
 
-        successor = gameState.generateSuccessor(self.index, action)
+        successor = gameState.generateSuccessor(self.index, action, validate)
         pos = successor.getAgentState(self.index).getPosition()
 
         if (pos != util.nearestPoint(pos)):
             # Only half a grid position was covered.
-            return successor.generateSuccessor(self.index, action)
+            # Agents in between grid points must continue straight, so the action is still legal.
+            return successor.generateSuccessor(self.index, action, validate = False)
         else:
             return successor
 
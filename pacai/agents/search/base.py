@@ -8,6 +8,7 @@ from pacai.core.gamestate import AbstractGameState
 from pacai.core.search.heuristic import null as nullHeuristic
 from pacai.core.search.position import PositionSearchProblem
 from pacai.core.search.problem import SearchProblem
+from pacai.core.search.stats import SearchStats
 from pacai.student.search import depthFirstSearch
 from pacai.util import reflection
 
@@ -19,12 +20,16 @@ class SearchAgent(BaseAgent):
 
     As a default, this agent runs `pacai.student.search.depthFirstSearch` on a
     `pacai.core.search.position.PositionSearchProblem` to find location (1, 1).
+
+    Every search collects a `pacai.core.search.stats.SearchStats`,
+    which is logged (and appended as a JSON line to statsPath, if given).
     """
 
     def __init__(self, index,
             fn: Union[str, Callable[[SearchProblem], any]] = depthFirstSearch,
             prob: Union[str, Callable[[AbstractGameState], SearchProblem]] = PositionSearchProblem,
             heuristic: Union[str, Callable] = nullHeuristic,
+            statsPath: Union[str, None] = None,
             **kwargs):
         super().__init__(index, **kwargs)
 
@@ -36,6 +41,10 @@ class SearchAgent(BaseAgent):
             self.searchType = prob
         logging.info('[SearchAgent] using problem type %s.' % (self.searchType))
 
+        # The names of the search function and heuristic (if any) for the stats.
+        self._functionName = fn if isinstance(fn, str) else _getName(fn)
+        self._heuristicName = None
+
         if isinstance(fn, str):
             # Get the search function from the name and heuristic.
             self.searchFunction = self._fetchSearchFunction(fn, heuristic)
@@ -50,6 +59,12 @@ class SearchAgent(BaseAgent):
         # The currentl action (from self._actions) that the agent is performing.
         self._actionIndex = 0
 
+        # Where to append the stats of each search (as JSON lines).
+        self._statsPath = statsPath
+
+        # The stats from the last search.
+        self._searchStats = None
+
     def registerInitialState(self, state):
         """
         This is the first time that the agent sees the layout of the game board.
@@ -65,18 +80,41 @@ class SearchAgent(BaseAgent):
         starttime = time.time()
         problem = self.searchType(state)  # Makes a new search problem.
 
-        self._actions = self.searchFunction(problem)  # Find a path.
-        self._actionIndex = 0
+        stats = SearchStats()
+        stats.instrument(problem)
 
-        totalCost = problem.actionsCost(self._actions)
+        stats.start()
+        actions = self.searchFunction(problem)  # Find a path.
+        stats.stop()
 
+        self._actionIndex = 0
         state.setHighlightLocations(problem.getVisitHistory())
 
-        logging.info('Path found with total cost of %d in %.1f seconds' %
-                (totalCost, time.time() - starttime))
+        # Searches return None when there is no path, in which case the agent just stops.
+        if (actions is None):
+            totalCost = None
+            self._actions = []
+
+            logging.warning('No path found in %.1f seconds' % (time.time() - starttime))
+        else:
+            totalCost = problem.actionsCost(actions)
+            self._actions = problem.expandActions(actions)
+
+            logging.info('Path found with total cost of %d in %.1f seconds' %
+                    (totalCost, time.time() - starttime))
 
         logging.info('Search nodes expanded: %d' % problem.getExpandedCount())
 
+        self._searchStats = stats
+        self._reportStats(problem, totalCost)
+
+    def getSearchStats(self):
+        """
+        Get the `pacai.core.search.stats.SearchStats` of the last search (or None).
+        """
+
+        return self._searchStats
+
     def getAction(self, state):
         """
         Returns the next action in the path chosen earlier (in registerInitialState).
@@ -112,5 +150,44 @@ class SearchAgent(BaseAgent):
         logging.info('[SearchAgent] using function %s and heuristic %s.' %
                 (functionName, heuristic))
 
-        # Bind the heuristic.
-        return lambda x: function(x, heuristic = heuristic)
+        self._heuristicName = _getName(heuristic)
+
+        # Bind the heuristic (timing it if the problem is collecting stats).
+        def search(problem):
+            boundHeuristic = heuristic
+
+            stats = problem.getStats()
+            if (stats is not None):
+                boundHeuristic = stats.wrapHeuristic(heuristic)
+
+            return function(problem, heuristic = boundHeuristic)
+
+        return search
+
+    def _reportStats(self, problem, totalCost):
+        """
+        Log (and save) the stats of the last search.
+        The cost and path length are null if no path was found.
+        """
+
+        pathLength = None
+        if (totalCost is not None):
+            pathLength = len(self._actions)
+
+        statsJSON = self._searchStats.toJSON(
+                problem = _getName(type(problem)),
+                function = self._functionName,
+                heuristic = self._heuristicName,
+                cost = totalCost,
+                pathLength = pathLength)
+
+        logging.info('Search stats: %s' % (statsJSON))
+
+        if (self._statsPath is None):
+            return
+
+        with open(self._statsPath, 'a') as file:
+            file.write(statsJSON + '\n')
+
+def _getName(value):
+    return '%s.%s' % (getattr(value, '__module__', ''), getattr(value, '__qualname__', str(value)))
@@ -43,6 +43,8 @@ class CaptureGameState(AbstractGameState):
     A game state specific to capture.
     """
 
+    _UNDO_FIELDS = AbstractGameState._UNDO_FIELDS + ['_timeleft']
+
     def __init__(self, layout, timeleft):
         super().__init__(layout)
 
@@ -81,24 +83,20 @@ class CaptureGameState(AbstractGameState):
         self._redFood = Grid(self._food.getWidth(), self._food.getHeight(), initialValue = False)
         self._blueFood = Grid(self._food.getWidth(), self._food.getHeight(), initialValue = False)
 
-        for x in range(self._food.getWidth()):
-            for y in range(self._food.getHeight()):
-                if (not self._food[x][y]):
-                    continue
-
-                if (self.isOnRedSide((x, y))):
-                    self._redFood[x][y] = True
-                else:
-                    self._blueFood[x][y] = True
+        for (x, y) in self._food.asList():
+            if (self.isOnRedSide((x, y))):
+                self._redFood.set(x, y, True)
+            else:
+                self._blueFood.set(x, y, True)
 
     # Override
-    def generateSuccessor(self, agentIndex, action):
+    def generateSuccessor(self, agentIndex, action, validate = True):
         # Check that successors exist.
         if (self.isOver()):
             raise RuntimeError("Can't generate successors of a terminal state.")
 
         successor = self._initSuccessor()
-        successor._applySuccessorAction(agentIndex, action)
+        successor._applySuccessorAction(agentIndex, action, validate)
 
         return successor
 
@@ -131,9 +129,9 @@ class CaptureGameState(AbstractGameState):
         super().eatFood(x, y)
 
         if (self.isOnRedSide((x, y))):
-            self._redFood[x][y] = False
+            self._redFood.set(x, y, False)
         else:
-            self._blueFood[x][y] = False
+            self._blueFood.set(x, y, False)
 
     def getBlueCapsules(self):
         """
@@ -224,15 +222,16 @@ class CaptureGameState(AbstractGameState):
 
         return self._teams[agentIndex]
 
-    def _applySuccessorAction(self, agentIndex, action):
+    # Override
+    def _applySuccessorAction(self, agentIndex, action, validate = True):
         """
         Apply the action to the context state (self).
         """
 
         # Find appropriate rules for the agent.
-        AgentRules.applyAction(self, action, agentIndex)
+        AgentRules.applyAction(self, action, agentIndex, validate)
         AgentRules.checkDeath(self, agentIndex)
-        AgentRules.decrementTimer(self.getAgentState(agentIndex))
+        AgentRules.decrementTimer(self.getMutableAgentState(agentIndex))
 
         # Book keeping.
         self._lastAgentMoved = agentIndex
@@ -240,6 +239,35 @@ class CaptureGameState(AbstractGameState):
 
         self._hash = None
 
+    # Override
+    def _uneatCapsule(self, x, y):
+        if (not self._capsulesCopied):
+            self._redCapsules = self._redCapsules.copy()
+            self._blueCapsules = self._blueCapsules.copy()
+
+        super()._uneatCapsule(x, y)
+
+        if (self.isOnRedSide((x, y))):
+            capsules = self._redCapsules
+        else:
+            capsules = self._blueCapsules
+
+        capsules.append((x, y))
+        capsules.sort(key = self._layout.capsules.index)
+
+    # Override
+    def _uneatFood(self, x, y):
+        if (not self._foodCopied):
+            self._redFood = self._redFood.copy()
+            self._blueFood = self._blueFood.copy()
+
+        super()._uneatFood(x, y)
+
+        if (self.isOnRedSide((x, y))):
+            self._redFood.set(x, y, True)
+        else:
+            self._blueFood.set(x, y, True)
+
 class CaptureRules:
     """
     These game rules manage the control flow of a game, deciding when
@@ -342,20 +370,20 @@ class AgentRules:
         """
 
         agentState = state.getAgentState(agentIndex)
-        return Actions.getPossibleActions(agentState.getPosition(), agentState.getDirection(),
-                state.getWalls())
+        return state.getInitialLayout().getMoveTable().getPossibleActions(
+                agentState.getPosition(), agentState.getDirection())
 
     @staticmethod
-    def applyAction(state, action, agentIndex):
+    def applyAction(state, action, agentIndex, validate = True):
         """
         Edits the state to reflect the results of the action.
+        If validate is false, the action is trusted to be legal.
         """
 
-        legal = AgentRules.getLegalActions(state, agentIndex)
-        if (action not in legal):
+        if (validate and action not in AgentRules.getLegalActions(state, agentIndex)):
             raise ValueError('Illegal action: ' + str(action))
 
-        agentState = state.getAgentState(agentIndex)
+        agentState = state.getMutableAgentState(agentIndex)
 
         # Update position.
         vector = Actions.directionToVector(action, AgentRules.AGENT_SPEED)
@@ -414,7 +442,7 @@ class AgentRules:
                 otherTeam = state.getRedTeamIndices()
 
             for agentIndex in otherTeam:
-                state.getAgentState(agentIndex).setScaredTimer(SCARED_TIME)
+                state.getMutableAgentState(agentIndex).setScaredTimer(SCARED_TIME)
 
     @staticmethod
     def decrementTimer(agentState):
@@ -455,9 +483,10 @@ class AgentRules:
             # Otherwise, we are being eatten.
             if (agentState.isBraveGhost() or otherAgentState.isScaredGhost()):
                 state.addScore(teamPointModifier * KILL_POINTS)
-                otherAgentState.respawn()
+                state.getMutableAgentState(otherAgentIndex).respawn()
             else:
                 state.addScore(teamPointModifier * -KILL_POINTS)
+                agentState = state.getMutableAgentState(agentIndex)
                 agentState.respawn()
 
 #############################
@@ -619,19 +648,7 @@ def readCommand(argv):
         args['agents'][index] = agent
 
     # Choose a layout.
-    if options.layout.startswith('RANDOM'):
-        layoutSeed = None
-        if (options.layout != 'RANDOM'):
-            layoutSeed = int(options.layout[6:])
-
-        args['layout'] = Layout(generateMaze(layoutSeed).split('\n'))
-    elif options.layout.lower().find('capture') == -1:
-        raise ValueError('You must use a capture layout with capture.py.')
-    else:
-        args['layout'] = getLayout(options.layout)
-
-    if (args['layout'] is None):
-        raise ValueError('The layout ' + options.layout + ' cannot be found.')
+    args['layout'] = loadLayout(options.layout)
 
     args['length'] = options.maxMoves
     args['numGames'] = options.numGames
@@ -660,6 +677,27 @@ def loadAgents(isRed, agentModule, textgraphics, args):
 
     return createTeamFunction(indices[0], indices[1], isRed, **args)
 
+def loadLayout(name):
+    """
+    Load a capture layout by name,
+    or generate a random maze for 'RANDOM<seed>' (e.g. RANDOM23) or 'RANDOM'.
+    """
+
+    if name.startswith('RANDOM'):
+        layoutSeed = None
+        if (name != 'RANDOM'):
+            layoutSeed = int(name[6:])
+
+        return Layout(generateMaze(layoutSeed).split('\n'))
+    elif name.lower().find('capture') == -1:
+        raise ValueError('You must use a capture layout with capture.py.')
+
+    layout = getLayout(name)
+    if (layout is None):
+        raise ValueError('The layout ' + name + ' cannot be found.')
+
+    return layout
+
 def replayGame(layout, agents, actions, display, length, redTeamName, blueTeamName):
     agents = [DummyAgent(index) for index in range(len(agents))]
     rules = CaptureRules()
@@ -8,6 +8,7 @@ Have fun!
 """
 
 import logging
+import multiprocessing
 import os
 import pickle
 import random
@@ -50,7 +51,7 @@ class PacmanGameState(AbstractGameState):
         super().__init__(layout)
 
     # Override
-    def generateSuccessor(self, agentIndex, action):
+    def generateSuccessor(self, agentIndex, action, validate = True):
         """
         Returns the successor state after the specified agent takes the action.
         """
@@ -60,7 +61,7 @@ class PacmanGameState(AbstractGameState):
             raise RuntimeError("Can't generate successors of a terminal state.")
 
         successor = self._initSuccessor()
-        successor._applySuccessorAction(agentIndex, action)
+        successor._applySuccessorAction(agentIndex, action, validate)
 
         return successor
 
@@ -75,8 +76,8 @@ class PacmanGameState(AbstractGameState):
 
         return GhostRules.getLegalActions(self, agentIndex)
 
-    def generatePacmanSuccessor(self, action):
-        return self.generateSuccessor(PACMAN_AGENT_INDEX, action)
+    def generatePacmanSuccessor(self, action, validate = True):
+        return self.generateSuccessor(PACMAN_AGENT_INDEX, action, validate)
 
     def getGhostIndexes(self):
         return range(1, self.getNumAgents())
@@ -118,23 +119,24 @@ class PacmanGameState(AbstractGameState):
 
         return self._agentStates[PACMAN_AGENT_INDEX]
 
-    def _applySuccessorAction(self, agentIndex, action):
+    # Override
+    def _applySuccessorAction(self, agentIndex, action, validate = True):
         """
         Apply the action to the context state (self).
         """
 
         # Let the agent's logic deal with its action's effects on the board.
         if (agentIndex == PACMAN_AGENT_INDEX):
-            PacmanRules.applyAction(self, action)
+            PacmanRules.applyAction(self, action, validate)
         else:
-            GhostRules.applyAction(self, action, agentIndex)
+            GhostRules.applyAction(self, action, agentIndex, validate)
 
         # Time passes.
         if (agentIndex == PACMAN_AGENT_INDEX):
             # Penalty for waiting around.
             self.addScore(-TIME_PENALTY)
         else:
-            GhostRules.decrementTimer(self.getAgentState(agentIndex))
+            GhostRules.decrementTimer(self.getMutableAgentState(agentIndex))
 
         # Resolve multi-agent effects.
         GhostRules.checkDeath(self, agentIndex)
@@ -217,20 +219,20 @@ class PacmanRules:
         """
 
         agentState = state.getPacmanState()
-        return Actions.getPossibleActions(agentState.getPosition(), agentState.getDirection(),
-                state.getWalls())
+        return state.getInitialLayout().getMoveTable().getPossibleActions(
+                agentState.getPosition(), agentState.getDirection())
 
     @staticmethod
-    def applyAction(state, action):
+    def applyAction(state, action, validate = True):
         """
         Edits the state to reflect the results of the action.
+        If validate is false, the action is trusted to be legal.
         """
 
-        legal = PacmanRules.getLegalActions(state)
-        if (action not in legal):
+        if (validate and action not in PacmanRules.getLegalActions(state)):
             raise ValueError('Illegal pacman action: ' + str(action))
 
-        pacmanState = state.getPacmanState()
+        pacmanState = state.getMutableAgentState(PACMAN_AGENT_INDEX)
 
         # Update position.
         vector = Actions.directionToVector(action, PacmanRules.PACMAN_SPEED)
@@ -260,8 +262,8 @@ class PacmanRules:
             state.eatCapsule(x, y)
 
             # Reset all ghosts' scared timers.
-            for ghostState in state.getGhostStates():
-                ghostState.setScaredTimer(SCARED_TIME)
+            for ghostIndex in state.getGhostIndexes():
+                state.getMutableAgentState(ghostIndex).setScaredTimer(SCARED_TIME)
 
 class GhostRules:
     """
@@ -278,8 +280,8 @@ class GhostRules:
         """
 
         agentState = state.getGhostState(ghostIndex)
-        possibleActions = Actions.getPossibleActions(agentState.getPosition(),
-                agentState.getDirection(), state.getWalls())
+        possibleActions = state.getInitialLayout().getMoveTable().getPossibleActions(
+                agentState.getPosition(), agentState.getDirection())
         reverse = Actions.reverseDirection(agentState.getDirection())
 
         if (Directions.STOP in possibleActions):
@@ -291,12 +293,16 @@ class GhostRules:
         return possibleActions
 
     @staticmethod
-    def applyAction(state, action, ghostIndex):
-        legal = GhostRules.getLegalActions(state, ghostIndex)
-        if (action not in legal):
+    def applyAction(state, action, ghostIndex, validate = True):
+        """
+        Edits the state to reflect the results of the action.
+        If validate is false, the action is trusted to be legal.
+        """
+
+        if (validate and action not in GhostRules.getLegalActions(state, ghostIndex)):
             raise ValueError('Illegal ghost action: ' + str(action))
 
-        ghostState = state.getGhostState(ghostIndex)
+        ghostState = state.getMutableAgentState(ghostIndex)
         speed = GhostRules.GHOST_SPEED
         if (ghostState.isScared()):
             speed /= 2.0
@@ -341,7 +347,7 @@ class GhostRules:
         if (ghostState.isScared()):
             # Pacman ate a ghost.
             state.addScore(GHOST_POINTS)
-            ghostState.respawn()
+            state.getMutableAgentState(agentIndex).respawn()
         elif (not state.isOver()):
             # A ghost ate pacman.
             state.addScore(LOSE_POINTS)
@@ -415,6 +421,12 @@ def readCommand(argv):
             help = 'maximum time limit (seconds) an agent can spend computing per game '
                 + '(default: %(default)s)')
 
+    parser.add_argument('--workers', dest = 'workers',
+            action = 'store', type = int, default = None,
+            help = 'play the (non-training) games on this many worker processes, '
+                + 'seeding each game from the seed value '
+                + '(default: play every game in this process)')
+
     options, otherjunk = parser.parse_known_args(argv)
     args = dict()
 
@@ -430,6 +442,13 @@ def readCommand(argv):
     elif options.debug:
         updateLoggingLevel(logging.DEBUG)
 
+    if (options.workers is not None):
+        if (options.workers < 1):
+            raise ValueError('The number of workers must be positive.')
+
+        if (not options.nullGraphics or options.gif is not None):
+            raise ValueError('Worker processes can only be used with null graphics and no gif.')
+
     # If seed value is not entered generate a random seed value.
     seed = options.seed
     if seed is None:
@@ -484,7 +503,9 @@ def readCommand(argv):
     args['numGames'] = options.numGames
     args['pacman'] = BaseAgent.loadAgent(options.pacman, PACMAN_AGENT_INDEX, agentOpts)
     args['record'] = options.record
+    args['seed'] = seed
     args['timeout'] = options.timeout
+    args['workers'] = options.workers
 
     return args
 
@@ -512,7 +533,18 @@ def replayGame(layout, actions, display):
     display.finish()
 
 def runGames(layout, pacman, ghosts, display, numGames, record = None, numTraining = 0,
-        catchExceptions = False, timeout = 30, **kwargs):
+        catchExceptions = False, timeout = 30, seed = None, workers = None, **kwargs):
+    """
+    Play numGames games and log a summary of the non-training games.
+
+    If workers is set, then each game gets its own seed (derived from seed) and
+    the non-training games are played on a pool of that many worker processes.
+    Training games are always played in this process (in order),
+    since learning agents carry what they learned from one game to the next.
+    Each worker plays with its own copy of the (trained) agents,
+    so the results only depend on the seed and not on how the games were scheduled.
+    """
+
     rules = ClassicGameRules(timeout)
     games = []
 
@@ -521,7 +553,15 @@ def runGames(layout, pacman, ghosts, display, numGames, record = None, numTraini
         logging.info('Playing %d training games.' % numTraining)
         nullView = PacmanNullView()
 
-    for i in range(numGames):
+    # With workers, only the training games are played here.
+    numLocalGames = numGames
+    gameSeeds = None
+
+    if (workers is not None):
+        numLocalGames = min(numGames, numTraining)
+        gameSeeds = getGameSeeds(seed, numGames)
+
+    for i in range(numLocalGames):
         isTraining = (i < numTraining)
 
         if (isTraining):
@@ -530,20 +570,38 @@ def runGames(layout, pacman, ghosts, display, numGames, record = None, numTraini
         else:
             gameDisplay = display
 
+        if (gameSeeds is not None):
+            random.seed(gameSeeds[i])
+
         game = rules.newGame(layout, pacman, ghosts, gameDisplay, catchExceptions)
         game.run()
 
         if (not isTraining):
             games.append(game)
 
-        if (record):
-            path = 'pacman.replay'
-            if (isinstance(record, str)):
-                path = record
+        _recordGame(record, layout, game)
+
+    if (workers is not None and numGames > numTraining):
+        evaluationSeeds = gameSeeds[numTraining:]
+        workerArgs = (rules, layout, pacman, ghosts, display, catchExceptions)
 
-            components = {'layout': layout, 'actions': game.moveHistory}
-            with open(path, 'wb') as file:
-                pickle.dump(components, file)
+        if (workers == 1):
+            _initWorker(*workerArgs)
+            results = [_runWorkerGame(gameSeed) for gameSeed in evaluationSeeds]
+        else:
+            with multiprocessing.Pool(workers, _initWorker, workerArgs) as pool:
+                results = pool.map(_runWorkerGame, evaluationSeeds)
+
+        # Results come back in game order, no matter which worker played them.
+        for game in results:
+            # Workers do not send back their copies of the agents and display
+            # (which may not be picklable), so point the game back at the originals.
+            game.agents = [pacman] + ghosts[:layout.getNumGhosts()]
+            game.display = display
+            game.rules = rules
+
+            games.append(game)
+            _recordGame(record, layout, game)
 
     if ((numGames - numTraining) > 0):
         scores = [game.state.getScore() for game in games]
@@ -556,6 +614,56 @@ def runGames(layout, pacman, ghosts, display, numGames, record = None, numTraini
 
     return games
 
+def getGameSeeds(seed, numGames):
+    """
+    Derive a seed for each game from a single seed.
+    The same seed always gives the same game seeds.
+    """
+
+    if (seed is None):
+        seed = random.randint(0, 2**32)
+
+    rng = random.Random(seed)
+    return [rng.getrandbits(32) for i in range(numGames)]
+
+def _recordGame(record, layout, game):
+    if (not record):
+        return
+
+    path = 'pacman.replay'
+    if (isinstance(record, str)):
+        path = record
+
+    components = {'layout': layout, 'actions': game.moveHistory}
+    with open(path, 'wb') as file:
+        pickle.dump(components, file)
+
+# The game components held by each worker process (see _initWorker()).
+_workerArgs = None
+
+def _initWorker(rules, layout, pacman, ghosts, display, catchExceptions):
+    """
+    Hold onto the game components in a worker,
+    so they are only sent once per worker instead of once per game.
+    """
+
+    global _workerArgs
+    _workerArgs = (rules, layout, pacman, ghosts, display, catchExceptions)
+
+def _runWorkerGame(seed):
+    rules, layout, pacman, ghosts, display, catchExceptions = _workerArgs
+
+    random.seed(seed)
+
+    game = rules.newGame(layout, pacman, ghosts, display, catchExceptions)
+    game.run()
+
+    game.agents = None
+    game.display = None
+    game.rules = None
+
+    return game
+
 def main(argv):
     """
     Entry point for a pacman game.
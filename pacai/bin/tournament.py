@@ -0,0 +1,321 @@
+"""
+A round-robin tournament between capture teams.
+
+Every pair of teams plays every layout with every game seed, once from each side of the board.
+The matches are spread over a pool of worker processes,
+each match result is written to disk (as a line of JSON) as soon as it finishes,
+and the final standings are logged once all the matches are done.
+
+To run a tournament, type 'python -m pacai.bin.tournament --teams <team module> <team module> ...'
+from the command line.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import textwrap
+
+from pacai.bin import capture
+from pacai.bin.pacman import getGameSeeds
+from pacai.ui.capture.null import CaptureNullView
+from pacai.util.logs import initLogging
+from pacai.util.logs import updateLoggingLevel
+
+WIN_POINTS = 3
+TIE_POINTS = 1
+LOSS_POINTS = 0
+
+RED = 'Red'
+BLUE = 'Blue'
+
+def getMatches(teams, layouts, numGames, seed):
+    """
+    Expand a tournament into the list of matches to play.
+
+    Each pair of teams plays numGames games on each layout from both sides of the board.
+    Both sides of a pairing use the same game seeds,
+    and a 'RANDOM' layout becomes a random maze seeded by the game seed,
+    so swapping sides is the only difference between the two games.
+    """
+
+    gameSeeds = getGameSeeds(seed, numGames)
+    matches = []
+
+    for (firstTeam, secondTeam) in itertools.combinations(teams, 2):
+        for layoutName in layouts:
+            for gameSeed in gameSeeds:
+                matchLayout = layoutName
+                if (layoutName == 'RANDOM'):
+                    matchLayout = 'RANDOM%d' % (gameSeed)
+
+                for (red, blue) in [(firstTeam, secondTeam), (secondTeam, firstTeam)]:
+                    matches.append({
+                        'id': len(matches),
+                        'red': red,
+                        'blue': blue,
+                        'layout': matchLayout,
+                        'seed': gameSeed,
+                    })
+
+    return matches
+
+def getStandings(results):
+    """
+    Tally match results into standings, best team first.
+    Teams are ranked by points, then wins, then the total score (from their point of view).
+    """
+
+    standings = {}
+
+    for result in results:
+        for (team, color, sign) in [(result['red'], RED, 1), (result['blue'], BLUE, -1)]:
+            if (team not in standings):
+                standings[team] = {
+                    'team': team,
+                    'points': 0,
+                    'wins': 0,
+                    'ties': 0,
+                    'losses': 0,
+                    'score': 0,
+                }
+
+            standing = standings[team]
+            standing['score'] += sign * result['score']
+
+            if (result['winner'] is None):
+                standing['ties'] += 1
+                standing['points'] += TIE_POINTS
+            elif (result['winner'] == color):
+                standing['wins'] += 1
+                standing['points'] += WIN_POINTS
+            else:
+                standing['losses'] += 1
+                standing['points'] += LOSS_POINTS
+
+    return sorted(standings.values(),
+            key = lambda standing: (-standing['points'], -standing['wins'], -standing['score'],
+                standing['team']))
+
+def readCommand(argv):
+    """
+    Processes the command used to run a tournament from the command line.
+    """
+
+    description = """
+    DESCRIPTION:
+        This program will run a round-robin tournament between capture teams.
+        Every pair of teams plays on every layout, from both sides of the board.
+
+    EXAMPLES:
+        (1) python -m pacai.bin.tournament --teams pacai.core.baselineTeam pacai.student.myTeam
+          - Plays the baseline team against pacai.student.myTeam on the default layout.
+        (2) python -m pacai.bin.tournament --teams team1 team2 team3 --layouts defaultCapture RANDOM -n 5
+          - Plays every pair of the three teams on the default layout and on random mazes,
+            five games per layout per side.
+    """
+
+    parser = argparse.ArgumentParser(description = textwrap.dedent(description),
+            prog = os.path.basename(__file__), formatter_class = argparse.RawTextHelpFormatter)
+
+    parser.add_argument('-d', '--debug', dest = 'debug',
+            action = 'store_true', default = False,
+            help = 'set logging level to debug (default: %(default)s)')
+
+    parser.add_argument('-n', '--num-games', dest = 'numGames',
+            action = 'store', type = int, default = 1,
+            help = 'play the specified number of games per pairing, layout, and side '
+                + '(default: %(default)s)')
+
+    parser.add_argument('-q', '--quiet', dest = 'quiet',
+            action = 'store_true', default = False,
+            help = 'set logging level to warning (default: %(default)s)')
+
+    parser.add_argument('-s', '--seed', dest = 'seed',
+            action = 'store', type = int, default = None,
+            help = 'Enter seed value to randomize the games')
+
+    parser.add_argument('--catch-exceptions', dest = 'catchExceptions',
+            action = 'store_true', default = False,
+            help = 'turns on exception handling and timeouts during games (default: %(default)s)')
+
+    parser.add_argument('--layouts', dest = 'layouts',
+            action = 'store', type = str, nargs = '+', default = ['defaultCapture'],
+            help = 'play on the specified map layouts, RANDOM<seed> picks a seeded random map '
+                + 'and RANDOM picks a new random map for each game seed (default: %(default)s)')
+
+    parser.add_argument('--max-moves', dest = 'maxMoves',
+            action = 'store', type = int, default = 1200,
+            help = 'set maximum number of moves in a game (default: %(default)s)')
+
+    parser.add_argument('--results', dest = 'results',
+            action = 'store', type = str, default = 'tournament.jsonl',
+            help = 'write each match result (as a line of JSON) to the named file '
+                + '(default: %(default)s)')
+
+    parser.add_argument('--teams', dest = 'teams',
+            action = 'store', type = str, nargs = '+', required = True,
+            help = 'the team modules (with a createTeam function) to enter in the tournament')
+
+    parser.add_argument('--workers', dest = 'workers',
+            action = 'store', type = int, default = os.cpu_count(),
+            help = 'play the matches on this many worker processes (default: %(default)s)')
+
+    options, otherjunk = parser.parse_known_args(argv)
+    args = dict()
+
+    if len(otherjunk) != 0:
+        raise ValueError('Unrecognized options: \'%s\'.' % (str(otherjunk)))
+
+    # Set the logging level.
+    if options.quiet and options.debug:
+        raise ValueError('Logging cannont be set to both debug and quiet.')
+
+    if options.quiet:
+        updateLoggingLevel(logging.WARNING)
+    elif options.debug:
+        updateLoggingLevel(logging.DEBUG)
+
+    if (len(set(options.teams)) != len(options.teams) or len(options.teams) < 2):
+        raise ValueError('A tournament needs at least two distinct teams.')
+
+    if (options.workers < 1):
+        raise ValueError('The number of workers must be positive.')
+
+    # Check the layouts up front instead of in the middle of the tournament.
+    for layoutName in options.layouts:
+        capture.loadLayout(layoutName)
+
+    # If no seed entry generate a random seed value.
+    seed = options.seed
+    if seed is None:
+        seed = random.randint(0, 2**32)
+    logging.debug('Seed value: ' + str(seed))
+
+    args['catchExceptions'] = options.catchExceptions
+    args['layouts'] = options.layouts
+    args['length'] = options.maxMoves
+    args['numGames'] = options.numGames
+    args['resultsPath'] = options.results
+    args['seed'] = seed
+    args['teams'] = options.teams
+    args['workers'] = options.workers
+
+    return args
+
+def runTournament(teams, layouts, numGames, seed, length, resultsPath,
+        workers = 1, catchExceptions = False, **kwargs):
+    """
+    Play every match in the tournament and return the standings (see getStandings()).
+    The results of each match are written to resultsPath as they finish,
+    so an interrupted tournament still keeps the matches that were played.
+    """
+
+    matches = getMatches(teams, layouts, numGames, seed)
+    logging.info('Playing %d matches on %d worker(s).' % (len(matches), workers))
+
+    # Only log the details of each game when debugging.
+    workerArgs = (length, catchExceptions, logging.getLogger().getEffectiveLevel() <= logging.DEBUG)
+
+    with open(resultsPath, 'w') as file:
+        if (workers == 1):
+            _initWorker(*workerArgs)
+            results = _collectResults(map(_playMatch, matches), len(matches), file)
+        else:
+            with multiprocessing.Pool(workers, _initWorker, workerArgs) as pool:
+                finishedMatches = pool.imap_unordered(_playMatch, matches)
+                results = _collectResults(finishedMatches, len(matches), file)
+
+    logging.info("Match results written to: '%s'." % (resultsPath))
+
+    standings = getStandings(results)
+
+    logging.info('Standings:')
+    for (rank, standing) in enumerate(standings):
+        logging.info('%3d. %s: %d points (%d-%d-%d), score %d' % (rank + 1, standing['team'],
+                standing['points'], standing['wins'], standing['ties'], standing['losses'],
+                standing['score']))
+
+    return standings
+
+def _collectResults(finishedMatches, numMatches, file):
+    """
+    Write out each match result as soon as it comes in.
+    """
+
+    results = []
+
+    for result in finishedMatches:
+        file.write(json.dumps(result) + '\n')
+        file.flush()
+
+        results.append(result)
+        logging.info('Match %d/%d: %s (Red) vs %s (Blue) on %s, winner: %s.' % (
+                len(results), numMatches, result['red'], result['blue'], result['layout'],
+                result['winner']))
+
+    return results
+
+# The settings held by each worker process (see _initWorker()).
+_workerArgs = None
+
+def _initWorker(length, catchExceptions, logGames):
+    global _workerArgs
+    _workerArgs = (length, catchExceptions, logGames, CaptureNullView())
+
+def _playMatch(match):
+    length, catchExceptions, logGames, display = _workerArgs
+
+    loggingLevel = logging.getLogger().getEffectiveLevel()
+    if (not logGames):
+        updateLoggingLevel(logging.WARNING)
+
+    try:
+        return _playMatchGame(match, length, catchExceptions, display)
+    finally:
+        updateLoggingLevel(loggingLevel)
+
+def _playMatchGame(match, length, catchExceptions, display):
+    random.seed(match['seed'])
+
+    layout = capture.loadLayout(match['layout'])
+    redAgents = capture.loadAgents(True, match['red'], True, {})
+    blueAgents = capture.loadAgents(False, match['blue'], True, {})
+    agents = sum([list(el) for el in zip(redAgents, blueAgents)], [])
+
+    game = capture.CaptureRules().newGame(layout, agents, display, length, catchExceptions)
+    game.run()
+
+    score = game.state.getScore()
+
+    winner = None
+    if (score > 0):
+        winner = RED
+    elif (score < 0):
+        winner = BLUE
+
+    result = dict(match)
+    result['score'] = score
+    result['winner'] = winner
+    result['moves'] = len(game.moveHistory)
+    result['crashed'] = game.agentCrashed
+
+    return result
+
+def main(argv):
+    """
+    Entry point for a capture tournament.
+    The args are a blind pass of `sys.argv` with the executable stripped.
+    """
+
+    initLogging()
+
+    args = readCommand(argv)
+    return runTournament(**args)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -66,7 +66,7 @@ class Actions:
             next_y = y_int + dy
             next_x = x_int + dx
 
-            if (not walls[next_x][next_y]):
+            if (not walls.get(next_x, next_y)):
                 possible.append(dir)
 
         return possible
@@ -87,7 +87,7 @@ class Actions:
             if (next_y < 0 or next_y == walls.getHeight()):
                 continue
 
-            if (not walls[next_x][next_y]):
+            if (not walls.get(next_x, next_y)):
                 neighbors.append((next_x, next_y))
 
         return neighbors
@@ -97,3 +97,49 @@ class Actions:
         dx, dy = Actions.directionToVector(action)
         x, y = position
         return (x + dx, y + dy)
+
+class MoveTable:
+    """
+    The legal moves out of every open cell in a set of walls, computed once up front.
+    This answers the same questions as `Actions.getPossibleActions` and `Actions.getLegalNeighbors`
+    with a table lookup instead of probing the walls.
+
+    Layouts hold a shared table, see `pacai.core.layout.Layout.getMoveTable`.
+    """
+
+    def __init__(self, walls):
+        self._walls = walls
+
+        # {(x, y): (direction, ...)}
+        self._actions = {}
+
+        # {(x, y): ((x, y), ...)}
+        self._neighbors = {}
+
+        for position in walls.asList(False):
+            self._actions[position] = tuple(Actions.getPossibleActions(position, None, walls))
+            self._neighbors[position] = tuple(Actions.getLegalNeighbors(position, walls))
+
+    def getLegalNeighbors(self, position):
+        """
+        The same as `Actions.getLegalNeighbors`.
+        """
+
+        x, y = position
+        neighbors = self._neighbors.get((int(x + 0.5), int(y + 0.5)))
+        if (neighbors is None):
+            return Actions.getLegalNeighbors(position, self._walls)
+
+        return list(neighbors)
+
+    def getPossibleActions(self, position, direction):
+        """
+        The same as `Actions.getPossibleActions`.
+        """
+
+        actions = self._actions.get(position)
+        if (actions is None):
+            # In between grid points (or somewhere unusual), use the full logic.
+            return Actions.getPossibleActions(position, direction, self._walls)
+
+        return list(actions)
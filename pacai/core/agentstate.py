@@ -1,6 +1,10 @@
 from pacai.core.actions import Actions
 from pacai.core.directions import Directions
 from pacai.util import util
+from pacai.util.zobrist import ZobristTable
+
+# Keys for the zobrist hash of each agent's features (position, direction, etc).
+_zobristTable = ZobristTable()
 
 class AgentState:
     """
@@ -9,13 +13,18 @@ class AgentState:
     The convention for positions, like a graph, is that (0, 0) is the lower left corner,
     x increases horizontally and y increases vertically.
     Therefore, north is the direction of increasing y, or (0, 1).
+
+    Agent states are compact (slotted) records.
+    Game states share agent states between successors, and only copy the ones that change
+    (see `pacai.core.gamestate.AbstractGameState.getMutableAgentState`).
     """
 
+    __slots__ = ('_start', '_position', '_direction', '_isPacman', '_scaredTimer', '_hash')
+
     def __init__(self, position, direction, isPacman):
-        # Save the starting information for later use.
-        self._startPosition = position
-        self._startDirection = direction
-        self._startIsPacman = isPacman
+        # Save the starting information (position, direction, isPacman) for later use.
+        # This never changes, so it is shared by all copies.
+        self._start = (position, direction, isPacman)
 
         self._position = position
         self._direction = direction
@@ -23,18 +32,30 @@ class AgentState:
         self._isPacman = isPacman
         self._scaredTimer = 0
 
+        # The zobrist hash of the fields above.
+        # Every modification XORs out the old value's key and XORs in the new one.
+        self._hash = _zobristTable.hashFeatures([
+            ('position', self._position),
+            ('direction', self._direction),
+            ('isPacman', self._isPacman),
+            ('scaredTimer', self._scaredTimer),
+        ])
+
     def copy(self):
-        state = AgentState(self._startPosition, self._startDirection, self._startIsPacman)
+        # Skip the constructor, there is no need to rebuild the hash.
+        state = AgentState.__new__(AgentState)
 
+        state._start = self._start
         state._isPacman = self._isPacman
         state._position = self._position
         state._direction = self._direction
         state._scaredTimer = self._scaredTimer
+        state._hash = self._hash
 
         return state
 
     def decrementScaredTimer(self):
-        self._scaredTimer = max(0, self._scaredTimer - 1)
+        self.setScaredTimer(max(0, self._scaredTimer - 1))
 
     def getDirection(self):
         return self._direction
@@ -48,6 +69,14 @@ class AgentState:
     def getScaredTimer(self):
         return self._scaredTimer
 
+    def getSnapshot(self):
+        """
+        Get the changeable fields of this state (and their hash),
+        which can later be put back with `AgentState.restoreSnapshot`.
+        """
+
+        return (self._position, self._direction, self._isPacman, self._scaredTimer, self._hash)
+
     def isBraveGhost(self):
         """
         A ghost that is not scared.
@@ -68,27 +97,36 @@ class AgentState:
         return (self.isGhost() and self.isScared())
 
     def setIsPacman(self, isPacman):
-        self._isPacman = isPacman
+        self._setField('isPacman', isPacman)
 
     def setScaredTimer(self, timer):
-        self._scaredTimer = timer
+        self._setField('scaredTimer', timer)
 
     def snapToNearestPoint(self):
         """
         Move the agent to the nearest point to its current location.
         """
 
-        self._position = util.nearestPoint(self._position)
+        self._setField('position', util.nearestPoint(self._position))
+
+    def restoreSnapshot(self, snapshot):
+        """
+        Put back the fields saved by `AgentState.getSnapshot`.
+        """
+
+        self._position, self._direction, self._isPacman, self._scaredTimer, self._hash = snapshot
 
     def respawn(self):
         """
         This agent was killed, respawn it at the start as a pacman.
         """
 
-        self._position = self._startPosition
-        self._direction = self._startDirection
-        self._isPacman = self._startIsPacman
-        self._scaredTimer = 0
+        startPosition, startDirection, startIsPacman = self._start
+
+        self._setField('position', startPosition)
+        self._setField('direction', startDirection)
+        self._setField('isPacman', startIsPacman)
+        self._setField('scaredTimer', 0)
 
     def updatePosition(self, vector):
         """
@@ -98,12 +136,24 @@ class AgentState:
         x, y = self._position
         dx, dy = vector
 
-        self._position = (x + dx, y + dy)
+        self._setField('position', (x + dx, y + dy))
 
         direction = Actions.vectorToDirection(vector)
         if (direction != Directions.STOP):
             # If this is a zero vector, face the same direction as before.
-            self._direction = direction
+            self._setField('direction', direction)
+
+    def _setField(self, name, value):
+        """
+        Set one of the hashed fields (position, direction, isPacman, scaredTimer)
+        and swap its key in the hash.
+        """
+
+        attribute = '_' + name
+        oldValue = getattr(self, attribute)
+
+        self._hash ^= _zobristTable.getKey((name, oldValue)) ^ _zobristTable.getKey((name, value))
+        setattr(self, attribute, value)
 
     def __eq__(self, other):
         if (other is None):
@@ -115,7 +165,7 @@ class AgentState:
                 and self._scaredTimer == other._scaredTimer)
 
     def __hash__(self):
-        return util.buildHash(self._position, self._direction, self._isPacman, self._scaredTimer)
+        return self._hash
 
     def __str__(self):
         typeString = 'Ghost'
@@ -1,5 +1,5 @@
 from pacai.core.search.position import PositionSearchProblem
-from pacai.student import search
+from pacai.core.search import reference
 
 def manhattan(position1, position2):
     """
@@ -18,9 +18,8 @@ def euclidean(position1, position2):
 def maze(position1, position2, gameState):
     """
     Returns the maze distance between any two positions,
-    using the search functions you have already built.
-
-    WARNING: `pacai.student.search.breadthFirstSearch` must already be implemted.
+    using `pacai.core.search.reference.breadthFirstSearch`.
+    Raises a ValueError if there is no path between the positions.
 
     Example usage: `distance.maze((2, 4), (5, 6), gameState)`.
     """
@@ -38,4 +37,8 @@ def maze(position1, position2, gameState):
 
     prob = PositionSearchProblem(gameState, start = position1, goal = position2)
 
-    return len(search.breadthFirstSearch(prob))
+    path = reference.breadthFirstSearch(prob)
+    if (path is None):
+        raise ValueError('No path between %s and %s.' % (str(position1), str(position2)))
+
+    return len(path)
@@ -1,10 +1,23 @@
+import array
+import collections
+import hashlib
+import logging
+import mmap
+import os
+import struct
 import sys
+import tempfile
 
 from pacai.core.distance import manhattan
-from pacai.util import priorityQueue
 
 DEFAULT_DISTANCE = 10000
 
+# Layouts with more cells than this (walls included) use lazy distancers by default.
+MAX_EAGER_CELLS = 4096
+
+# The default number of rows (distances from a single cell) a lazy distancer keeps.
+DEFAULT_MAX_ROWS = 256
+
 class Distancer(object):
     """
     A class for computing and caching the shortest path between any two points in a given maze.
@@ -14,11 +27,18 @@ class Distancer(object):
     distancer = Distancer(gameState.getInitialLayout())
     distancer.getDistance((1, 1), (10, 10))
     ```
+
+    Normally the distances between all pairs of points are computed up front
+    (in `Distancer.getMazeDistances`).
+    For very large layouts, that table would take too long to compute (and too much memory),
+    so instead a lazy distancer only computes the distances from a point the first time
+    that point is asked about, and only keeps the most recently used maxRows of those.
+    If lazy is None, then only layouts with more than MAX_EAGER_CELLS cells are lazy.
     """
 
-    def __init__(self, layout):
+    def __init__(self, layout, lazy = None, maxRows = DEFAULT_MAX_ROWS):
         self._distances = None
-        self.dc = DistanceCalculator(layout, self)
+        self.dc = DistanceCalculator(layout, self, lazy, maxRows)
 
     def getMazeDistances(self):
         self.dc.run()
@@ -47,12 +67,85 @@ class Distancer(object):
 
         return bestDistance
 
+    def getDistancesFrom(self, pos, targets):
+        """
+        Get the distance from pos to each of the targets,
+        the same as `Distancer.getDistance` for each target but faster,
+        since pos only needs to be snapped to the grid (and looked up) once.
+        """
+
+        if (self._distances is None):
+            return [manhattan(pos, target) for target in targets]
+
+        # Usually everything is already on the grid.
+        if (isInt(pos) and all([x == int(x) and y == int(y) for (x, y) in targets])):
+            distances = self._distances.getDistancesFrom(pos, targets)
+            if (None in distances):
+                target = targets[distances.index(None)]
+                raise Exception("Position not in grid: " + str((pos, target)))
+
+            return distances
+
+        # Snap every target to the grid, remembering which target each snapped position is for.
+        gridTargets = []
+        owners = []
+        snapDistances = []
+
+        for (index, target) in enumerate(targets):
+            for (snap, snapDistance) in getGrids2D(target):
+                gridTargets.append(snap)
+                owners.append(index)
+                snapDistances.append(snapDistance)
+
+        # Like getDistance(), only distances that needed snapping start from a default distance.
+        posIsInt = isInt(pos)
+        results = []
+        for target in targets:
+            if (posIsInt and isInt(target)):
+                results.append(None)
+            else:
+                results.append(DEFAULT_DISTANCE)
+
+        for (posSnap, posSnapDistance) in getGrids2D(pos):
+            gridDistances = self._distances.getDistancesFrom(posSnap, gridTargets)
+
+            for i in range(len(gridTargets)):
+                gridDistance = gridDistances[i]
+                if (gridDistance is None):
+                    raise Exception("Position not in grid: " + str((posSnap, gridTargets[i])))
+
+                distance = gridDistance + posSnapDistance + snapDistances[i]
+
+                owner = owners[i]
+                if (results[owner] is None or results[owner] > distance):
+                    results[owner] = distance
+
+        return results
+
     def getDistanceOnGrid(self, pos1, pos2):
-        key = (pos1, pos2)
-        if key in self._distances:
-            return self._distances[key]
+        distance = self._distances.getDistance(pos1, pos2)
+        if (distance is None):
+            raise Exception("Position not in grid: " + str((pos1, pos2)))
 
-        raise Exception("Position not in grid: " + str(key))
+        return distance
+
+    def getNearest(self, pos, targets):
+        """
+        Get the target closest to pos (the first one on ties) and its distance, as a tuple.
+        Returns None if there are no targets.
+        """
+
+        if (len(targets) == 0):
+            return None
+
+        distances = self.getDistancesFrom(pos, targets)
+
+        bestIndex = 0
+        for i in range(1, len(distances)):
+            if (distances[i] < distances[bestIndex]):
+                bestIndex = i
+
+        return targets[bestIndex], distances[bestIndex]
 
     def isReadyForMazeDistance(self):
         return (self._distances is not None)
@@ -78,79 +171,489 @@ def getGrids1D(x):
 # MACHINERY FOR COMPUTING MAZE DISTANCES #
 ##########################################
 
+# The distance stored for pairs of cells that have no path between them (including walls).
+UNREACHABLE = 0xFFFF
+
+# Where distance tables are saved so that other processes (later games, parallel workers, etc)
+# can just map them in instead of computing them again.
+# Saving is opt-in (through the PACAI_DISTANCE_CACHE_DIR environment variable),
+# by default (None) distances are only cached in memory.
+# The directory should only be writable by the current user.
+CACHE_DIR = os.environ.get('PACAI_DISTANCE_CACHE_DIR') or None
+
+# The most distance tables kept in CACHE_DIR, the least recently saved are removed first.
+MAX_CACHE_FILES = 32
+
+# Saved tables start with a header: a magic string, the width and height of the layout,
+# and a SHA-256 of the walls digest and the distances (which is checked on load).
+_CACHE_MAGIC = b'PACAIDT1'
+_CACHE_HEADER = struct.Struct('<8sII32s16x')
+
+# All the distance tables computed or loaded by this process, keyed by getWallsDigest().
 distanceMap = {}
 
 class DistanceCalculator:
-    def __init__(self, layout, distancer):
+    def __init__(self, layout, distancer, lazy = None, maxRows = DEFAULT_MAX_ROWS):
         self.layout = layout
         self.distancer = distancer
-        self.cache = {}
+        self.maxRows = maxRows
+
+        if (lazy is None):
+            lazy = (layout.getWidth() * layout.getHeight() > MAX_EAGER_CELLS)
+
+        self.lazy = lazy
 
     def run(self):
-        if self.layout.walls not in self.cache:
-            self.cache[self.layout.walls] = computeDistances(self.layout)
+        if (self.lazy):
+            self.distancer._distances = LazyDistanceTable(self.layout, self.maxRows)
+        else:
+            self.distancer._distances = getDistanceTable(self.layout)
+
+class DistanceTable(object):
+    """
+    The maze distance between every pair of cells in a layout.
+
+    Cells are numbered the same way `pacai.core.grid.Grid` orders its bits,
+    cell (x, y) is number (x * height + y).
+    The distances are held in a flat array of unsigned shorts,
+    where the distance from cell i to cell j is at index (i * numCells + j).
+    So looking up a distance is just arithmetic instead of hashing a pair of positions.
+    """
+
+    def __init__(self, width, height, distances):
+        self._width = width
+        self._height = height
+        self._numCells = width * height
+        self._distances = distances
+
+    def getDistance(self, pos1, pos2):
+        """
+        Get the maze distance between two grid positions.
+        Returns sys.maxsize if there is no path between the positions,
+        and None if either position is a wall or outside of the layout.
+        """
+
+        x1, y1 = pos1
+        x2, y2 = pos2
+
+        if (x1 < 0 or y1 < 0 or x1 >= self._width or y1 >= self._height
+                or x2 < 0 or y2 < 0 or x2 >= self._width or y2 >= self._height):
+            return None
+
+        cell1 = int(x1) * self._height + int(y1)
+        cell2 = int(x2) * self._height + int(y2)
+
+        distance = self._distances[cell1 * self._numCells + cell2]
+        if (distance != UNREACHABLE):
+            return distance
+
+        # Only walls are unreachable from themselves.
+        if (self._distances[cell1 * (self._numCells + 1)] == UNREACHABLE
+                or self._distances[cell2 * (self._numCells + 1)] == UNREACHABLE):
+            return None
+
+        return sys.maxsize
+
+    def getDistancesFrom(self, source, targets):
+        """
+        Get the maze distance from a grid position to each target grid position,
+        with the same results as `DistanceTable.getDistance`.
+        """
+
+        row = self._getRowStart(source)
+        if (row is None):
+            return [None] * len(targets)
+
+        distances = self._distances
+        results = []
+
+        for (x, y) in targets:
+            if (x < 0 or y < 0 or x >= self._width or y >= self._height):
+                results.append(None)
+                continue
+
+            cell = int(x) * self._height + int(y)
+            distance = distances[row + cell]
+
+            if (distance != UNREACHABLE):
+                results.append(distance)
+            elif (distances[cell * (self._numCells + 1)] == UNREACHABLE):
+                # Only walls are unreachable from themselves.
+                results.append(None)
+            else:
+                results.append(sys.maxsize)
+
+        return results
+
+    def getHeight(self):
+        return self._height
+
+    def getWidth(self):
+        return self._width
+
+    def _getRowStart(self, pos):
+        """
+        Get the index of the start of the distances from pos,
+        or None if pos is a wall or outside of the layout.
+        """
+
+        x, y = pos
+        if (x < 0 or y < 0 or x >= self._width or y >= self._height):
+            return None
+
+        cell = int(x) * self._height + int(y)
+        if (self._distances[cell * (self._numCells + 1)] == UNREACHABLE):
+            return None
+
+        return cell * self._numCells
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+
+        # Memory mapped distances cannot be pickled.
+        state['_distances'] = array.array('H', self._distances)
+
+        return state
+
+class LazyDistanceTable(object):
+    """
+    A drop-in replacement for `DistanceTable` that runs a BFS from a cell
+    the first time a distance from (or to) that cell is needed.
+    Only the maxRows most recently used rows (distances from a single cell) are kept.
+    """
+
+    def __init__(self, layout, maxRows = DEFAULT_MAX_ROWS):
+        if (maxRows < 1):
+            raise ValueError('A lazy distance table must be able to hold at least one row.')
+
+        self._width = layout.getWidth()
+        self._height = layout.getHeight()
+        self._maxRows = maxRows
+        self._neighbors = getCellNeighbors(layout.walls)
+
+        # Huge layouts can have paths that are too long for an unsigned short.
+        self._typecode = 'H'
+        self._unreachable = UNREACHABLE
+        if (len(self._neighbors) >= UNREACHABLE):
+            self._typecode = 'L'
+            self._unreachable = 0xFFFFFFFF
+
+        # {cell: row}, least recently used first.
+        self._rows = collections.OrderedDict()
+
+    def getDistance(self, pos1, pos2):
+        """
+        Get the maze distance between two grid positions.
+        Returns sys.maxsize if there is no path between the positions,
+        and None if either position is a wall or outside of the layout.
+        """
+
+        x1, y1 = pos1
+        x2, y2 = pos2
+
+        if (x1 < 0 or y1 < 0 or x1 >= self._width or y1 >= self._height
+                or x2 < 0 or y2 < 0 or x2 >= self._width or y2 >= self._height):
+            return None
+
+        cell1 = int(x1) * self._height + int(y1)
+        cell2 = int(x2) * self._height + int(y2)
+
+        if (self._neighbors[cell1] is None or self._neighbors[cell2] is None):
+            return None
+
+        # Distances are symmetric, so use whichever row we already have.
+        if (cell1 not in self._rows and cell2 in self._rows):
+            cell1, cell2 = cell2, cell1
+
+        distance = self._getRow(cell1)[cell2]
+        if (distance == self._unreachable):
+            return sys.maxsize
+
+        return distance
+
+    def getDistancesFrom(self, source, targets):
+        """
+        Get the maze distance from a grid position to each target grid position,
+        with the same results as `LazyDistanceTable.getDistance`.
+        """
+
+        x, y = source
+        if (x < 0 or y < 0 or x >= self._width or y >= self._height):
+            return [None] * len(targets)
+
+        sourceCell = int(x) * self._height + int(y)
+        if (self._neighbors[sourceCell] is None):
+            return [None] * len(targets)
+
+        row = self._getRow(sourceCell)
+        results = []
+
+        for (x, y) in targets:
+            if (x < 0 or y < 0 or x >= self._width or y >= self._height):
+                results.append(None)
+                continue
+
+            cell = int(x) * self._height + int(y)
+            distance = row[cell]
+
+            if (self._neighbors[cell] is None):
+                results.append(None)
+            elif (distance == self._unreachable):
+                results.append(sys.maxsize)
+            else:
+                results.append(distance)
 
-        self.distancer._distances = self.cache[self.layout.walls]
+        return results
+
+    def getHeight(self):
+        return self._height
+
+    def getNumRows(self):
+        """
+        Get the number of rows currently held.
+        """
+
+        return len(self._rows)
+
+    def getWidth(self):
+        return self._width
+
+    def _getRow(self, cell):
+        row = self._rows.get(cell)
+        if (row is not None):
+            self._rows.move_to_end(cell)
+            return row
+
+        row = array.array(self._typecode, bfs(self._neighbors, cell, self._unreachable))
+
+        self._rows[cell] = row
+        if (len(self._rows) > self._maxRows):
+            self._rows.popitem(last = False)
+
+        return row
 
 def computeDistances(layout):
     """
-    Runs UCS to all other positions from each position.
+    Runs BFS to all other positions from each position,
+    and returns the results as a `DistanceTable`.
     """
 
-    distances = {}
-    allNodes = layout.walls.asList(False)
+    width = layout.getWidth()
+    height = layout.getHeight()
+    numCells = width * height
+
+    if (numCells >= UNREACHABLE):
+        raise ValueError('Layout is too large for a distance table (%d cells).' % (numCells))
+
+    neighbors = getCellNeighbors(layout.walls)
 
-    for source in allNodes:
-        dist = {}
-        closed = {}
+    distances = array.array('H', [UNREACHABLE]) * (numCells * numCells)
+    for source in range(numCells):
+        if (neighbors[source] is None):
+            continue
 
-        for node in allNodes:
-            dist[node] = sys.maxsize
+        start = source * numCells
+        distances[start:(start + numCells)] = array.array('H', bfs(neighbors, source))
 
-        queue = priorityQueue.PriorityQueue()
-        queue.push(source, 0)
-        dist[source] = 0
+    return DistanceTable(width, height, distances)
 
-        while not queue.isEmpty():
-            node = queue.pop()
-            if node in closed:
+def getDistanceTable(layout):
+    """
+    Get the `DistanceTable` for a layout.
+    Tables are shared by every layout with the same walls,
+    first from memory, then from CACHE_DIR, and are only computed if neither has them.
+    """
+
+    digest = getWallsDigest(layout.walls)
+
+    table = distanceMap.get(digest)
+    if (table is not None):
+        return table
+
+    table = _loadDistanceTable(digest, layout.getWidth(), layout.getHeight())
+    if (table is None):
+        table = computeDistances(layout)
+        _saveDistanceTable(digest, table)
+
+    distanceMap[digest] = table
+    return table
+
+def getWallsDigest(walls):
+    """
+    Get a stable (across processes and runs) digest for the walls of a layout.
+    """
+
+    hasher = hashlib.sha256()
+    hasher.update(('%d,%d,%s;' % (walls.getWidth(), walls.getHeight(), sys.byteorder)).encode())
+    hasher.update(walls.toBytes())
+
+    return hasher.hexdigest()
+
+def getDistanceOnGrid(distances, pos1, pos2):
+    distance = distances.getDistance(pos1, pos2)
+    if (distance is None):
+        return DEFAULT_DISTANCE
+
+    return distance
+
+def bfs(neighbors, source, unreachable = UNREACHABLE):
+    """
+    Get the distance from the source cell to every cell (unreachable for cells with no path).
+    """
+
+    row = [unreachable] * len(neighbors)
+    row[source] = 0
+
+    queue = [source]
+    for cell in queue:
+        nextDistance = row[cell] + 1
+
+        for neighbor in neighbors[cell]:
+            if (row[neighbor] == unreachable):
+                row[neighbor] = nextDistance
+                queue.append(neighbor)
+
+    return row
+
+def getCellNeighbors(walls):
+    """
+    Get the open neighboring cells of every cell (None for walls).
+    Cells are numbered x * height + y.
+    """
+
+    width = walls.getWidth()
+    height = walls.getHeight()
+
+    neighbors = []
+    for x in range(width):
+        for y in range(height):
+            if (walls.get(x, y)):
+                neighbors.append(None)
                 continue
 
-            closed[node] = True
-            nodeDist = dist[node]
             adjacent = []
-            x, y = node
+            for (nextX, nextY) in [(x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)]:
+                if (0 <= nextX < width and 0 <= nextY < height
+                        and not walls.get(nextX, nextY)):
+                    adjacent.append(nextX * height + nextY)
+
+            neighbors.append(adjacent)
+
+    return neighbors
 
-            if not layout.isWall((x, y + 1)):
-                adjacent.append((x, y + 1))
+def _getCachePath(digest):
+    return os.path.join(CACHE_DIR, digest + '.dist')
 
-            if not layout.isWall((x, y - 1)):
-                adjacent.append((x, y - 1))
+def _getChecksum(digest, distances):
+    hasher = hashlib.sha256()
+    hasher.update(digest.encode())
+    hasher.update(distances)
 
-            if not layout.isWall((x + 1, y)):
-                adjacent.append((x + 1, y))
+    return hasher.digest()
 
-            if not layout.isWall((x - 1, y)):
-                adjacent.append((x - 1, y))
+def _isPrivateDir(path):
+    """
+    Check that only the current user can write to a directory,
+    so that no one else could have planted a table in it.
+    """
 
-            for other in adjacent:
-                if other not in dist:
-                    continue
+    # Ownership and permissions are not checked on systems without them (i.e. Windows).
+    if (not hasattr(os, 'getuid')):
+        return True
 
-                oldDist = dist[other]
-                newDist = nodeDist + 1
-                if newDist < oldDist:
-                    dist[other] = newDist
-                    queue.push(other, newDist)
+    try:
+        info = os.stat(path)
+    except OSError:
+        return False
 
-        for target in allNodes:
-            distances[(target, source)] = dist[target]
+    return (info.st_uid == os.getuid() and (info.st_mode & 0o022) == 0)
 
-    return distances
+def _loadDistanceTable(digest, width, height):
+    """
+    Memory map a saved distance table, or return None if it is not saved (or not valid).
+    """
 
-def getDistanceOnGrid(distances, pos1, pos2):
-    key = (pos1, pos2)
-    if key in distances:
-        return distances[key]
+    if (CACHE_DIR is None):
+        return None
+
+    # Nothing has been saved yet.
+    if (not os.path.isdir(CACHE_DIR)):
+        return None
+
+    if (not _isPrivateDir(CACHE_DIR)):
+        logging.warning("Not using distance cache that other users can write to: '%s'."
+                % (CACHE_DIR))
+        return None
+
+    path = _getCachePath(digest)
+    numCells = width * height
+
+    try:
+        with open(path, 'rb') as file:
+            data = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if (len(data) != _CACHE_HEADER.size + (numCells * numCells * 2)):
+        logging.debug("Ignoring distance table with the wrong size: '%s'." % (path))
+        return None
+
+    magic, savedWidth, savedHeight, checksum = _CACHE_HEADER.unpack_from(data)
+    distances = memoryview(data)[_CACHE_HEADER.size:]
+
+    if (magic != _CACHE_MAGIC or (savedWidth, savedHeight) != (width, height)
+            or checksum != _getChecksum(digest, distances)):
+        logging.warning("Ignoring invalid distance table: '%s'." % (path))
+        return None
+
+    return DistanceTable(width, height, distances.cast('H'))
+
+def _saveDistanceTable(digest, table):
+    """
+    Save a distance table to the cache directory (removing old tables past MAX_CACHE_FILES).
+    The cache is just an optimization, so failing to save is not an error.
+    """
+
+    if (CACHE_DIR is None):
+        return
+
+    path = _getCachePath(digest)
+    distances = table._distances.tobytes()
+    header = _CACHE_HEADER.pack(_CACHE_MAGIC, table.getWidth(), table.getHeight(),
+            _getChecksum(digest, distances))
+
+    try:
+        os.makedirs(CACHE_DIR, mode = 0o700, exist_ok = True)
+        if (not _isPrivateDir(CACHE_DIR)):
+            logging.warning("Not saving to distance cache that other users can write to: '%s'."
+                    % (CACHE_DIR))
+            return
+
+        # Write to a temp file first, so that other processes never see a partial table.
+        fd, tempPath = tempfile.mkstemp(dir = CACHE_DIR, suffix = '.tmp')
+        with os.fdopen(fd, 'wb') as file:
+            file.write(header)
+            file.write(distances)
+
+        os.replace(tempPath, path)
+        _pruneCache()
+    except OSError as ex:
+        logging.debug("Could not save distance table to '%s': %s." % (path, ex))
+
+def _pruneCache():
+    """
+    Remove the least recently saved tables until there are at most MAX_CACHE_FILES.
+    """
 
-    return DEFAULT_DISTANCE
+    paths = [os.path.join(CACHE_DIR, name) for name in os.listdir(CACHE_DIR)
+            if name.endswith('.dist')]
+    if (len(paths) <= MAX_CACHE_FILES):
+        return
+
+    paths.sort(key = os.path.getmtime)
+    for path in paths[:(len(paths) - MAX_CACHE_FILES)]:
+        try:
+            os.remove(path)
+        except OSError:
+            # Another process may have removed it (or still have it mapped on Windows).
+            pass
@@ -5,8 +5,12 @@ Feature extractors for game states.
 import abc
 
 from pacai.core.actions import Actions
-from pacai.core.search import search
-from pacai.student.searchAgents import AnyFoodSearchProblem
+from pacai.core.search.nearest import TargetDistanceField
+
+# The walls, food, and food distance field from the last call to `_getFoodField`.
+# Features are computed for every action from a state, and nearby states only differ by a few food,
+# so the field is usually either reused as is or updated for a few food.
+_lastFoodField = (None, None, None)
 
 class FeatureExtractor(abc.ABC):
     """
@@ -51,15 +55,15 @@ class SimpleExtractor(FeatureExtractor):
         next_x, next_y = int(x + dx), int(y + dy)
 
         # Count the number of ghosts 1-step away.
+        moveTable = state.getInitialLayout().getMoveTable()
         features["#-of-ghosts-1-step-away"] = sum((next_x, next_y) in
-                Actions.getLegalNeighbors(g, walls) for g in ghosts)
+                moveTable.getLegalNeighbors(g) for g in ghosts)
 
         # If there is no danger of ghosts then add the food feature.
         if not features["#-of-ghosts-1-step-away"] and food[next_x][next_y]:
             features["eats-food"] = 1.0
 
-        prob = AnyFoodSearchProblem(state, start = (next_x, next_y))
-        dist = len(search.bfs(prob))
+        dist = _getFoodField(walls, food).getDistance((next_x, next_y))
         if dist is not None:
             # Make the distance a number less than one otherwise the update will diverge wildly.
             features["closest-food"] = float(dist) / (walls.getWidth() * walls.getHeight())
@@ -68,3 +72,30 @@ class SimpleExtractor(FeatureExtractor):
             features[key] /= 10.0
 
         return features
+
+def _getFoodField(walls, food):
+    """
+    Get a `pacai.core.search.nearest.TargetDistanceField` for the food,
+    updating the last one (instead of starting over) if it was for the same walls.
+    """
+
+    global _lastFoodField
+
+    lastWalls, lastFood, field = _lastFoodField
+    if (walls is lastWalls and food == lastFood):
+        return field
+
+    if (walls is not lastWalls):
+        field = TargetDistanceField(walls, food.asList())
+    else:
+        foodPositions = set(food.asList())
+        lastFoodPositions = set(lastFood.asList())
+
+        for position in lastFoodPositions - foodPositions:
+            field.removeTarget(position)
+
+        for position in foodPositions - lastFoodPositions:
+            field.addTarget(position)
+
+    _lastFoodField = (walls, food.copy(), field)
+    return field
@@ -1,8 +1,10 @@
 import abc
 import copy
+import operator
 
 from pacai.core.agentstate import AgentState
 from pacai.core.directions import Directions
+from pacai.core.visitHistory import VisitHistory
 from pacai.util import util
 
 class AbstractGameState(abc.ABC):
@@ -15,6 +17,27 @@ class AbstractGameState(abc.ABC):
     Only use the accessor methods to get data about the game state.
     """
 
+    # The simple fields that `AbstractGameState.applyMove` snapshots and
+    # `AbstractGameState.undoMove` restores.
+    # Children that keep more per-move data should extend this.
+    # (Agent states and eaten items are recorded separately, only when a move changes them.)
+    _UNDO_FIELDS = [
+        '_gameover',
+        '_hash',
+        '_itemsHash',
+        '_lastAgentMoved',
+        '_lastCapsuleEaten',
+        '_lastFoodEaten',
+        '_score',
+        '_win',
+    ]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # Snapshot all the undo fields (as a tuple) in one call.
+        cls._getUndoFields = operator.attrgetter(*cls._UNDO_FIELDS)
+
     def __init__(self, layout):
         self._lastAgentMoved = None
         self._gameover = False
@@ -22,10 +45,14 @@ class AbstractGameState(abc.ABC):
 
         self._layout = layout
 
-        # Keep a copy of the hash, since it is expensive to compute.
+        # Keep a copy of the hash.
         # Any children should be sure to clear the hash when modifications are made.
         self._hash = None
 
+        # The zobrist hash of the remaining food and capsules (see `pacai.util.zobrist`).
+        # Eating food or a capsule XORs that item's key out, so it never needs to be rebuilt.
+        self._itemsHash = layout.getZobristItemsHash()
+
         # For food and capsules, we will only copy on write (if we eat one of them).
         # This avoid additional copies on successors that don't eat.
 
@@ -37,21 +64,33 @@ class AbstractGameState(abc.ABC):
         self._capsules = layout.capsules.copy()
         self._lastCapsuleEaten = None
 
-        # An ordered list of locations that this state considers special.
+        # An ordered collection of locations that this state considers special
+        # (a `pacai.core.visitHistory.VisitHistory` once set).
         # A view may choose to specially represent these locations.
         self._highlightLocations = []
 
+        # Agent states are also copy on write.
+        # Successors share them, and an agent's state is only copied when it is modified.
         self._agentStates = []
         for (isPacman, position) in layout.agentPositions:
             self._agentStates.append(AgentState(position, Directions.STOP, isPacman))
+        self._agentStatesCopied = [True] * len(self._agentStates)
 
         self._score = 0
 
+        # While applyMove() is running, the record of the move being applied.
+        self._undoRecord = None
+
     @abc.abstractmethod
-    def generateSuccessor(self, agentIndex, action):
+    def generateSuccessor(self, agentIndex, action, validate = True):
         """
         Returns the successor state after the specified agent takes the action.
         Treat the returned state as a SHALLOW copy that has been modified.
+
+        By default, the action is checked against the agent's legal actions.
+        Callers that only pass actions they got from `AbstractGameState.getLegalActions`
+        (e.g. tree searches) may pass validate = False to skip that check.
+        Passing an illegal action without validation results in undefined behavior.
         """
 
         pass
@@ -64,6 +103,32 @@ class AbstractGameState(abc.ABC):
 
         pass
 
+    def applyMove(self, agentIndex, action, validate = True):
+        """
+        Apply the action to this state in place (instead of creating a successor).
+        Returns an undo record that can later be passed to `AbstractGameState.undoMove`
+        to return this state to exactly how it was before the move.
+
+        This allows a search to walk a game tree using a single state.
+        Moves must be undone in the reverse order that they were applied.
+        See `AbstractGameState.generateSuccessor` for the meaning of validate.
+        """
+
+        if (self.isOver()):
+            raise RuntimeError("Can't apply moves to a terminal state.")
+
+        record = UndoRecord(self._getUndoFields(self))
+
+        # Agent states are modified in place (once this state owns them),
+        # getMutableAgentState() records the fields of each one before its first change.
+        self._undoRecord = record
+        try:
+            self._applySuccessorAction(agentIndex, action, validate)
+        finally:
+            self._undoRecord = None
+
+        return record
+
     def addScore(self, score):
         self._hash = None
         self._score += score
@@ -82,6 +147,10 @@ class AbstractGameState(abc.ABC):
 
         self._capsules.remove((x, y))
         self._lastCapsuleEaten = (x, y)
+        self._itemsHash ^= self._layout.getZobristTable().getKey(('capsule', (x, y)))
+
+        if (self._undoRecord is not None):
+            self._undoRecord.recordCapsule(x, y)
 
         self._hash = None
         return True
@@ -98,8 +167,12 @@ class AbstractGameState(abc.ABC):
             self._food = self._food.copy()
             self._foodCopied = True
 
-        self._food[x][y] = False
+        self._food.set(x, y, False)
         self._lastFoodEaten = (x, y)
+        self._itemsHash ^= self._layout.getZobristTable().getKey(('food', (x, y)))
+
+        if (self._undoRecord is not None):
+            self._undoRecord.recordFood(x, y)
 
         self._hash = None
         return True
@@ -110,6 +183,37 @@ class AbstractGameState(abc.ABC):
 
         self._hash = None
 
+    def generateSuccessors(self, agentIndex):
+        """
+        Returns a list of (action, successor) for every legal action the agent can take.
+        This is the same as calling `AbstractGameState.generateSuccessor` on each action from
+        `AbstractGameState.getLegalActions`, but the legal actions are only computed once,
+        the successors do not re-validate them,
+        and the copy-on-write setup is done once and shared by all the successors.
+        A terminal state has no successors.
+        """
+
+        if (self.isOver()):
+            return []
+
+        actions = self.getLegalActions(agentIndex)
+        if (len(actions) == 0):
+            return []
+
+        base = self._initSuccessor()
+
+        successors = []
+        for (i, action) in enumerate(actions):
+            # The last successor can just take the base.
+            successor = base
+            if (i < len(actions) - 1):
+                successor = base._copySuccessor()
+
+            successor._applySuccessorAction(agentIndex, action, validate = False)
+            successors.append((action, successor))
+
+        return successors
+
     def getAgentPosition(self, index):
         """
         Returns a location tuple of the agent with the given index.
@@ -125,9 +229,20 @@ class AbstractGameState(abc.ABC):
         return tuple(int(pos) for pos in position)
 
     def getAgentState(self, index):
+        """
+        Get the `pacai.core.agentstate.AgentState` for the agent with the given index.
+        Agent states may be shared with other game states, so the caller should not modify it
+        (see `AbstractGameState.getMutableAgentState`).
+        """
+
         return self._agentStates[index]
 
     def getAgentStates(self):
+        """
+        Get all the agent states.
+        The caller should not modify the list or the agent states inside it.
+        """
+
         return self._agentStates
 
     def getCapsules(self):
@@ -173,6 +288,23 @@ class AbstractGameState(abc.ABC):
     def getLastFoodEaten(self):
         return self._lastFoodEaten
 
+    def getMutableAgentState(self, index):
+        """
+        Get an agent state that can be modified without affecting any other game state.
+        This is meant for game rules that are applying an action to this state.
+        """
+
+        if (not self._agentStatesCopied[index]):
+            self._agentStates[index] = self._agentStates[index].copy()
+            self._agentStatesCopied[index] = True
+
+        agentState = self._agentStates[index]
+
+        if (self._undoRecord is not None):
+            self._undoRecord.recordAgentState(index, agentState)
+
+        return agentState
+
     def getNumAgents(self):
         return len(self._agentStates)
 
@@ -217,14 +349,14 @@ class AbstractGameState(abc.ABC):
         Returns true if the location (x, y) has food.
         """
 
-        return self._food[x][y]
+        return self._food.get(x, y)
 
     def hasWall(self, x, y):
         """
         Returns true if (x, y) has a wall, false otherwise.
         """
 
-        return self._layout.walls[x][y]
+        return self._layout.walls.get(x, y)
 
     def isLose(self):
         return self.isOver() and not self._win
@@ -236,12 +368,71 @@ class AbstractGameState(abc.ABC):
         return self.isOver() and self._win
 
     def setHighlightLocations(self, locations):
-        self._highlightLocations = list(locations)
+        """
+        Set the locations to highlight, in order.
+        Only the first time each location appears is kept.
+        """
+
+        if (isinstance(locations, VisitHistory)):
+            locations = locations.copy()
+        else:
+            locations = VisitHistory.fromLocations(self._layout.getWidth(),
+                    self._layout.getHeight(), locations)
+
+        self._highlightLocations = locations
 
     def setScore(self, score):
         self._score = score
         self._hash = None
 
+    def undoMove(self, record):
+        """
+        Undo a move made with `AbstractGameState.applyMove`.
+        """
+
+        if (record.eatenFood is not None):
+            for (x, y) in record.eatenFood:
+                self._uneatFood(x, y)
+
+        if (record.eatenCapsules is not None):
+            for (x, y) in record.eatenCapsules:
+                self._uneatCapsule(x, y)
+
+        if (record.agentStates is not None):
+            for (index, snapshot) in record.agentStates:
+                # Successors made in the meantime may share this agent state,
+                # in which case getMutableAgentState() makes this state its own copy first.
+                if (not self._agentStatesCopied[index]):
+                    self._agentStates[index] = self._agentStates[index].copy()
+                    self._agentStatesCopied[index] = True
+
+                self._agentStates[index].restoreSnapshot(snapshot)
+
+        for (name, value) in zip(self._UNDO_FIELDS, record.fields):
+            setattr(self, name, value)
+
+    @abc.abstractmethod
+    def _applySuccessorAction(self, agentIndex, action, validate = True):
+        """
+        Apply the action to the context state (self).
+        """
+
+        pass
+
+    def _copySuccessor(self):
+        """
+        Get a copy of a successor from `AbstractGameState._initSuccessor`
+        that no action has been applied to yet.
+        Everything the two share is already marked to be copied on write,
+        so only the agent state list needs its own copy.
+        """
+
+        successor = copy.copy(self)
+        successor._agentStates = list(self._agentStates)
+        successor._agentStatesCopied = list(self._agentStatesCopied)
+
+        return successor
+
     def _initSuccessor(self):
         """
         Get a state that will eventually serve as a successor.
@@ -253,14 +444,45 @@ class AbstractGameState(abc.ABC):
         successor._hash = None
 
         # Leave food and capsules as a shallow copy, but mark them to be copied on write.
+        # Since they are now shared, this state must also copy them before any in-place move.
         successor._foodCopied = False
         successor._capsulesCopied = False
+        self._foodCopied = False
+        self._capsulesCopied = False
 
-        # Agent states need to be deep copied.
-        successor._agentStates = [agentState.copy() for agentState in self._agentStates]
+        # Agent states are shared in the same way, but each one is copied on write individually.
+        successor._agentStates = list(self._agentStates)
+        successor._agentStatesCopied = [False] * len(self._agentStates)
+        self._agentStatesCopied = [False] * len(self._agentStates)
 
         return successor
 
+    def _uneatCapsule(self, x, y):
+        """
+        Put back a capsule that was eaten.
+        The hash is not updated, the caller is expected to restore it.
+        """
+
+        if (not self._capsulesCopied):
+            self._capsules = self._capsules.copy()
+            self._capsulesCopied = True
+
+        # Remaining capsules always keep the same order they have in the layout.
+        self._capsules.append((x, y))
+        self._capsules.sort(key = self._layout.capsules.index)
+
+    def _uneatFood(self, x, y):
+        """
+        Put back food that was eaten.
+        The hash is not updated, the caller is expected to restore it.
+        """
+
+        if (not self._foodCopied):
+            self._food = self._food.copy()
+            self._foodCopied = True
+
+        self._food.set(x, y, True)
+
     def __eq__(self, other):
         if (other is None):
             return False
@@ -287,9 +509,67 @@ class AbstractGameState(abc.ABC):
                 and self._agentStates == other._agentStates
                 and self._layout == other._layout)
 
+    def __getstate__(self):
+        # The cached hash includes the hash of the layout, which is only valid in this process.
+        state = self.__dict__.copy()
+        state['_hash'] = None
+
+        return state
+
     def __hash__(self):
         if (self._hash is None):
-            self._hash = util.buildHash(self._score, self._gameover, self._win, *self._capsules,
-                self._food, *self._agentStates, self._layout)
+            # The food, capsules, and agents are all incrementally hashed,
+            # so this does not depend on the size of the board.
+            self._hash = util.buildHash(self._score, self._gameover, self._win, self._itemsHash,
+                *self._agentStates, self._layout)
 
         return self._hash
+
+class UndoRecord(object):
+    """
+    The information needed to undo a move made with `AbstractGameState.applyMove`.
+    Callers should treat this as opaque.
+
+    Only what the move actually changed is recorded,
+    so the lists below stay None until there is something to put in them.
+    """
+
+    __slots__ = ('fields', 'agentStates', 'eatenFood', 'eatenCapsules')
+
+    def __init__(self, fields):
+        # The values of the state's _UNDO_FIELDS before the move (in the same order).
+        self.fields = fields
+
+        # [(agent index, `pacai.core.agentstate.AgentState.getSnapshot`)] for each agent
+        # from before the move first changed it.
+        self.agentStates = None
+
+        # Positions of the items eaten during the move.
+        self.eatenFood = None
+        self.eatenCapsules = None
+
+    def recordAgentState(self, index, agentState):
+        """
+        Record an agent's state, unless it was already recorded for this move.
+        """
+
+        if (self.agentStates is None):
+            self.agentStates = []
+        else:
+            for (recordedIndex, snapshot) in self.agentStates:
+                if (recordedIndex == index):
+                    return
+
+        self.agentStates.append((index, agentState.getSnapshot()))
+
+    def recordCapsule(self, x, y):
+        if (self.eatenCapsules is None):
+            self.eatenCapsules = []
+
+        self.eatenCapsules.append((x, y))
+
+    def recordFood(self, x, y):
+        if (self.eatenFood is None):
+            self.eatenFood = []
+
+        self.eatenFood.append((x, y))
@@ -1,8 +1,15 @@
+import weakref
+
 class Grid:
     """
-    A 2-dimensional array of objects backed by a list of lists.
+    A 2-dimensional array of booleans backed by a packed bitset.
     Data is accessed via grid[x][y] where (x, y) are positions on a Pacman map with x horizontal,
     y vertical and the origin (0, 0) in the bottom left corner.
+
+    The cells are packed eight to a byte in a bytearray,
+    where the cell (x, y) is held in bit (x * height + y).
+    This makes copying, counting, comparing, and hashing grids proportional to the number of
+    machine words in the grid instead of the number of cells.
     """
 
     def __init__(self, width, height, initialValue = False):
@@ -11,74 +18,246 @@ class Grid:
 
         self._width = width
         self._height = height
-        self._data = [[initialValue for y in range(height)] for x in range(width)]
+
+        numCells = width * height
+        self._data = bytearray((numCells + 7) // 8)
+
+        # Cached columns for grid[x][y] access, made the first time each column is read
+        # (see `_GridColumn`).
+        self._columns = None
+
+        if (initialValue):
+            self._setBits((1 << numCells) - 1)
 
     def asList(self, key = True):
         values = []
 
-        for x in range(self._width):
-            for y in range(self._height):
-                if self[x][y] == key:
-                    values.append((x, y))
+        if (key is True or key == 1):
+            # Walk only the set bits, lowest (and therefore x-major first) to highest.
+            bits = self._getBits()
+            while (bits):
+                lowBit = bits & -bits
+                values.append(self._cellIndexToPosition(lowBit.bit_length() - 1))
+                bits ^= lowBit
+        elif (key is False or key == 0):
+            for x in range(self._width):
+                for y in range(self._height):
+                    if (not self.get(x, y)):
+                        values.append((x, y))
 
         return values
 
     def copy(self):
-        grid = Grid(self._width, self._height)
-        grid._data = [row.copy() for row in self._data]
+        grid = Grid.__new__(Grid)
+        grid._width = self._width
+        grid._height = self._height
+        grid._data = self._data.copy()
+        grid._columns = None
         return grid
 
-    def count(self, item =True):
-        return sum([x.count(item) for x in self._data])
+    def count(self, item = True):
+        numSet = bin(self._getBits()).count('1')
+
+        if (item is True or item == 1):
+            return numSet
+        elif (item is False or item == 0):
+            return (self._width * self._height) - numSet
+
+        return 0
 
     def deepCopy(self):
         return self.copy()
 
+    def get(self, x, y):
+        """
+        Get the value at (x, y).
+        This is the same as grid[x][y], but does not need to build an intermediate column.
+        """
+
+        if (x < 0 or y < 0 or x >= self._width or y >= self._height):
+            x, y = self._normalizePosition(x, y)
+
+        index = x * self._height + y
+        return (self._data[index >> 3] >> (index & 7)) & 1 == 1
+
     def getHeight(self):
         return self._height
 
     def getWidth(self):
         return self._width
 
+    def set(self, x, y, value):
+        """
+        Set the value at (x, y).
+        This is the same as grid[x][y] = value,
+        but does not need to build an intermediate column.
+        """
+
+        if (x < 0 or y < 0 or x >= self._width or y >= self._height):
+            x, y = self._normalizePosition(x, y)
+
+        index = x * self._height + y
+        if (value):
+            self._data[index >> 3] |= (1 << (index & 7))
+        else:
+            self._data[index >> 3] &= ~(1 << (index & 7))
+
+        columns = self._columns
+        if (columns is not None and columns[x] is not None):
+            list.__setitem__(columns[x], y, bool(value))
+
     def shallowCopy(self):
-        grid = Grid(self._width, self._height)
+        grid = Grid.__new__(Grid)
+        grid._width = self._width
+        grid._height = self._height
         grid._data = self._data
+
+        # The cells are shared, so the cached columns (which are kept up to date by set()) are too.
+        if (self._columns is None):
+            self._columns = [None] * self._width
+        grid._columns = self._columns
+
         return grid
 
+    def toBytes(self):
+        """
+        Get the packed cells as bytes,
+        where cell (x, y) is bit (x * height + y) (the lowest bit of a byte is first).
+        """
+
+        return bytes(self._data)
+
     def _cellIndexToPosition(self, index):
-        x = index / self._height
+        x = index // self._height
         y = index % self._height
 
         return x, y
 
+    def _getBits(self):
+        """
+        Get the entire grid as a single int, where cell (x, y) is bit (x * height + y).
+        """
+
+        return int.from_bytes(self._data, 'little')
+
+    def _normalizePosition(self, x, y):
+        """
+        Resolve negative indexes the same way a list would, and reject out of range positions.
+        """
+
+        if (x < 0):
+            x += self._width
+
+        if (y < 0):
+            y += self._height
+
+        if (x < 0 or x >= self._width or y < 0 or y >= self._height):
+            raise IndexError('Grid position out of range: (%d, %d).' % (x, y))
+
+        return x, y
+
+    def _getColumnValues(self, x):
+        start = x * self._height
+        end = start + self._height
+
+        # Only convert the bytes the column is in.
+        bits = int.from_bytes(self._data[(start >> 3):((end + 7) >> 3)], 'little') >> (start & 7)
+
+        return [(bits >> y) & 1 == 1 for y in range(self._height)]
+
+    def _setBits(self, bits):
+        self._data = bytearray(bits.to_bytes(len(self._data), 'little'))
+        self._columns = None
+
     def __eq__(self, other):
-        if (other is None):
+        if (other is None or not isinstance(other, Grid)):
             return False
 
-        return self._data == other._data
+        return (self._data == other._data
+                and self._width == other._width
+                and self._height == other._height)
 
-    def __getitem__(self, i):
-        return self._data[i]
+    def __getitem__(self, x):
+        # Columns that have already been read are the common case, so check for them first.
+        columns = self._columns
+        if (columns is not None and -self._width <= x < self._width):
+            column = columns[x]
+            if (column is not None):
+                return column
 
-    def __hash__(self):
-        hashcode = 0
-        base = 1
+        if (x < 0):
+            x += self._width
+
+        if (x < 0 or x >= self._width):
+            raise IndexError('Grid column out of range: %d.' % (x))
+
+        if (columns is None):
+            columns = [None] * self._width
+            self._columns = columns
+
+        column = _GridColumn(self, x)
+        columns[x] = column
+
+        return column
+
+    def __getstate__(self):
+        # Cached columns are rebuilt as needed.
+        state = self.__dict__.copy()
+        state['_columns'] = None
 
-        for row in self._data:
-            for value in row:
-                if (value):
-                    hashcode += base
-                base *= 2
+        return state
 
-        return hash(hashcode)
+    def __hash__(self):
+        return hash(self._getBits())
 
     def __lt__(self, other):
         return self.__hash__() < other.__hash__()
 
-    def __setitem__(self, key, item):
-        self._data[key] = item
+    def __setitem__(self, x, column):
+        for y in range(self._height):
+            self.set(x, y, column[y])
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._columns = None
+
+        # Grids pickled (e.g. in replays) before the bitset backing hold a list of lists.
+        if (isinstance(self._data, list)):
+            rows = self._data
+            self._data = bytearray((self._width * self._height + 7) // 8)
+            for x in range(self._width):
+                for y in range(self._height):
+                    self.set(x, y, rows[x][y])
 
     def __str__(self):
-        out = [[str(self._data[x][y])[0] for x in range(self._width)] for y in range(self._height)]
+        out = [[str(self.get(x, y))[0] for x in range(self._width)] for y in range(self._height)]
         out.reverse()
         return '\n'.join([''.join(x) for x in out])
+
+class _GridColumn(list):
+    """
+    A cached copy of a single column (fixed x) of a `Grid`.
+    This is what allows the grid[x][y] notation to read and write the underlying bitset.
+
+    Reading is just reading a list (which is as fast as reading a grid gets),
+    `Grid.set` keeps the cached values up to date,
+    and writing through the column writes to the grid.
+    """
+
+    __slots__ = ('_grid', '_x')
+
+    def __init__(self, grid, x):
+        super().__init__(grid._getColumnValues(x))
+
+        # The grid holds on to its columns, so don't make a reference cycle back to it.
+        self._grid = weakref.ref(grid)
+        self._x = x
+
+    def __setitem__(self, y, value):
+        grid = self._grid()
+        if (grid is None):
+            # Nothing else can see the grid anymore, so only this column needs to change.
+            list.__setitem__(self, y, bool(value))
+            return
+
+        grid.set(self._x, y, value)
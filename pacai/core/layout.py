@@ -1,8 +1,11 @@
 import os
 import random
 
+from pacai.core.actions import MoveTable
 from pacai.core.distance import manhattan
 from pacai.core.grid import Grid
+from pacai.core.layoutAnalysis import LayoutAnalysis
+from pacai.util.zobrist import ZobristTable
 
 # By default, the layout directory is adjacent to this file.
 DEFAULT_LAYOUT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'layouts')
@@ -24,14 +27,71 @@ class Layout(object):
         self.numGhosts = 0
         self.layoutText = layoutText
 
+        # Derived structures that are built on first use.
+        # See getLayoutAnalysis(), getMoveTable(), and getZobristTable().
+        self._layoutAnalysis = None
+        self._moveTable = None
+        self._zobristTable = None
+        self._zobristItemsHash = None
+
         self.processLayoutText(layoutText, maxGhosts)
 
     def getNumGhosts(self):
         return self.numGhosts
 
+    def getLayoutAnalysis(self):
+        """
+        Get the `pacai.core.layoutAnalysis.LayoutAnalysis` for this layout's walls
+        (dead ends, articulation points, border chokepoints, etc).
+        The analysis is done once and shared by every state from this layout.
+        """
+
+        # Layouts unpickled from older replays will not have the attribute.
+        if (getattr(self, '_layoutAnalysis', None) is None):
+            self._layoutAnalysis = LayoutAnalysis(self.walls)
+
+        return self._layoutAnalysis
+
+    def getMoveTable(self):
+        """
+        Get the `pacai.core.actions.MoveTable` for this layout's walls.
+        The table is built once and shared by every state from this layout.
+        """
+
+        # Layouts unpickled from older replays will not have the attribute.
+        if (getattr(self, '_moveTable', None) is None):
+            self._moveTable = MoveTable(self.walls)
+
+        return self._moveTable
+
+    def getZobristItemsHash(self):
+        """
+        Get the zobrist hash of all the food and capsules on this layout.
+        """
+
+        self.getZobristTable()
+        return self._zobristItemsHash
+
+    def getZobristTable(self):
+        """
+        Get the keys used to incrementally hash the food and capsules of states on this layout.
+        Food is keyed as ('food', (x, y)) and capsules as ('capsule', (x, y)).
+        The table is built once and shared by every state from this layout.
+        """
+
+        # Layouts unpickled from older replays will not have the attribute.
+        if (getattr(self, '_zobristTable', None) is None):
+            features = [('food', position) for position in self.food.asList()]
+            features += [('capsule', position) for position in self.capsules]
+
+            self._zobristTable = ZobristTable(features)
+            self._zobristItemsHash = self._zobristTable.hashFeatures(features)
+
+        return self._zobristTable
+
     def isWall(self, pos):
         x, col = pos
-        return self.walls[x][col]
+        return self.walls.get(x, col)
 
     def getHeight(self):
         return self.height
@@ -72,6 +132,16 @@ class Layout(object):
         row, col = [int(x) for x in pacPos]
         return ghostPos in self.visibility[row][col][pacDirection]
 
+    def __getstate__(self):
+        # Derived structures are cheap to rebuild, so don't carry them into replays.
+        state = self.__dict__.copy()
+        state['_layoutAnalysis'] = None
+        state['_moveTable'] = None
+        state['_zobristTable'] = None
+        state['_zobristItemsHash'] = None
+
+        return state
+
     def __str__(self):
         return "\n".join(self.layoutText)
 
@@ -104,9 +174,9 @@ class Layout(object):
 
     def processLayoutChar(self, x, y, layoutChar, maxGhosts):
         if (layoutChar == '%'):
-            self.walls[x][y] = True
+            self.walls.set(x, y, True)
         elif (layoutChar == '.'):
-            self.food[x][y] = True
+            self.food.set(x, y, True)
         elif (layoutChar == 'o'):
             self.capsules.append((x, y))
         elif (layoutChar == 'P'):
@@ -0,0 +1,258 @@
+"""
+Static analysis of the shape of a maze.
+Everything here only depends on the walls, so it is computed once per layout
+(see `pacai.core.layout.Layout.getLayoutAnalysis`) and every query is a lookup.
+"""
+
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+
+class LayoutAnalysis(object):
+    """
+    Topological facts about the open cells of a layout:
+
+     - Dead end depth:
+       How far a cell is inside a dead end (a part of the maze with only one way out).
+       Cells that are not in a dead end (i.e. are on a loop or between loops) have a depth of 0.
+     - Articulation points:
+       Cells that would split the maze into disconnected pieces if they were walls.
+     - Border entries (for capture):
+       The cells on each team's side of the center line that an agent can cross from/into.
+     - Border chokepoints (for capture):
+       The cells on each team's side that cut off part of that side from every border entry,
+       i.e. where a defender can block every path to what is behind it.
+
+    Red's side is the left half of the board (x < width // 2), like in `pacai.bin.capture`.
+    """
+
+    def __init__(self, walls):
+        self._width = walls.getWidth()
+        self._height = walls.getHeight()
+
+        # {cell: [neighboring open cells]}
+        self._neighbors = {}
+        for cell in walls.asList(False):
+            self._neighbors[cell] = _getOpenNeighbors(walls, cell)
+
+        self._deadEndDepths = self._computeDeadEndDepths()
+        self._articulationPoints = self._computeArticulationPoints()
+
+        self._borderEntries = {}
+        self._borderChokepoints = {}
+        for isRed in [True, False]:
+            self._borderEntries[isRed] = self._computeBorderEntries(isRed)
+            self._borderChokepoints[isRed] = self._computeBorderChokepoints(isRed)
+
+    def getArticulationPoints(self):
+        return set(self._articulationPoints)
+
+    def getBorderChokepoints(self, isRed):
+        """
+        Get the cells on red's (or blue's) side that cut off part of that side from every entry.
+        """
+
+        return set(self._borderChokepoints[isRed])
+
+    def getBorderEntries(self, isRed):
+        """
+        Get the cells in red's (or blue's) border column that have an open cell across the border,
+        in order of increasing y.
+        """
+
+        return list(self._borderEntries[isRed])
+
+    def getDeadEndDepth(self, position):
+        """
+        Get the number of moves from a cell to the mouth of the dead end it is in,
+        or 0 if the cell is not in a dead end.
+        """
+
+        return self._deadEndDepths.get(position, 0)
+
+    def isArticulationPoint(self, position):
+        return position in self._articulationPoints
+
+    def isBorderChokepoint(self, position, isRed):
+        return position in self._borderChokepoints[isRed]
+
+    def isDeadEnd(self, position):
+        return self.getDeadEndDepth(position) > 0
+
+    def isOnRedSide(self, position):
+        return position[0] < self._width // 2
+
+    def _computeArticulationPoints(self):
+        points = set()
+        reached = set()
+
+        for cell in self._neighbors:
+            if (cell in reached):
+                continue
+
+            componentPoints, component = _findArticulationPoints(self._neighbors, cell)
+            points |= componentPoints
+            reached |= component
+
+        return points
+
+    def _computeBorderChokepoints(self, isRed):
+        """
+        Find the articulation points of a team's side,
+        with all the border entries joined to a single extra node (standing in for the other side).
+        """
+
+        entries = self._borderEntries[isRed]
+        if (len(entries) == 0):
+            return set()
+
+        # Any value that can't be a cell works as the extra node.
+        enemySide = 'enemySide'
+        neighbors = {enemySide: list(entries)}
+
+        for (cell, cellNeighbors) in self._neighbors.items():
+            if (self.isOnRedSide(cell) != isRed):
+                continue
+
+            neighbors[cell] = [neighbor for neighbor in cellNeighbors
+                    if self.isOnRedSide(neighbor) == isRed]
+
+        for entry in entries:
+            neighbors[entry].append(enemySide)
+
+        points, component = _findArticulationPoints(neighbors, enemySide)
+        points.discard(enemySide)
+
+        return points
+
+    def _computeBorderEntries(self, isRed):
+        borderX = self._width // 2 - 1
+        step = 1
+        if (not isRed):
+            borderX += 1
+            step = -1
+
+        entries = []
+        for y in range(self._height):
+            if ((borderX, y) in self._neighbors and (borderX + step, y) in self._neighbors):
+                entries.append((borderX, y))
+
+        return entries
+
+    def _computeDeadEndDepths(self):
+        """
+        Repeatedly peel off cells with only one open neighbor (the tips of dead ends).
+        Whatever is left is the loops of the maze and the paths between them,
+        and the depth of a peeled cell is its distance to the closest of those cells.
+        """
+
+        degrees = {cell: len(cellNeighbors) for (cell, cellNeighbors) in self._neighbors.items()}
+
+        peeled = [cell for (cell, degree) in degrees.items() if degree <= 1]
+        isPeeled = set(peeled)
+
+        for cell in peeled:
+            for neighbor in self._neighbors[cell]:
+                if (neighbor in isPeeled):
+                    continue
+
+                degrees[neighbor] -= 1
+                if (degrees[neighbor] == 1):
+                    peeled.append(neighbor)
+                    isPeeled.add(neighbor)
+
+        # BFS into the dead ends from the cells that were not peeled.
+        depths = {}
+        queue = []
+        for cell in self._neighbors:
+            if (cell not in isPeeled):
+                depths[cell] = 0
+                queue.append(cell)
+
+        _expandDepths(self._neighbors, depths, queue)
+
+        # Parts of the maze without any loop get peeled entirely,
+        # measure those from the last cell peeled (the middle of the part).
+        for cell in reversed(peeled):
+            if (cell not in depths):
+                depths[cell] = 0
+                _expandDepths(self._neighbors, depths, [cell])
+
+        return {cell: depth for (cell, depth) in depths.items() if depth > 0}
+
+def _expandDepths(neighbors, depths, queue):
+    """
+    BFS out from the cells in the queue (which already have depths),
+    giving each newly reached cell a depth one more than the cell it was reached from.
+    """
+
+    for cell in queue:
+        for neighbor in neighbors[cell]:
+            if (neighbor not in depths):
+                depths[neighbor] = depths[cell] + 1
+                queue.append(neighbor)
+
+def _findArticulationPoints(neighbors, root):
+    """
+    Find the articulation points in the connected component containing root
+    with an iterative version of Tarjan's algorithm.
+    Returns the articulation points and all the nodes in the component.
+    """
+
+    discovery = {root: 0}
+    low = {root: 0}
+    parents = {root: None}
+
+    points = set()
+    numRootChildren = 0
+
+    stack = [(root, iter(neighbors[root]))]
+    while (len(stack) > 0):
+        node, children = stack[-1]
+
+        descended = False
+        for child in children:
+            if (child not in discovery):
+                parents[child] = node
+                discovery[child] = len(discovery)
+                low[child] = discovery[child]
+
+                stack.append((child, iter(neighbors[child])))
+                descended = True
+                break
+            elif (child != parents[node]):
+                low[node] = min(low[node], discovery[child])
+
+        if (descended):
+            continue
+
+        stack.pop()
+
+        parent = parents[node]
+        if (parent is None):
+            continue
+
+        low[parent] = min(low[parent], low[node])
+
+        if (parents[parent] is None):
+            numRootChildren += 1
+        elif (low[node] >= discovery[parent]):
+            points.add(parent)
+
+    if (numRootChildren > 1):
+        points.add(root)
+
+    return points, set(discovery.keys())
+
+def _getOpenNeighbors(walls, cell):
+    x, y = cell
+    neighbors = []
+
+    for action in Directions.CARDINAL:
+        dx, dy = Actions.directionToVector(action)
+        nextX, nextY = int(x + dx), int(y + dy)
+
+        if (0 <= nextX < walls.getWidth() and 0 <= nextY < walls.getHeight()
+                and not walls.get(nextX, nextY)):
+            neighbors.append((nextX, nextY))
+
+    return neighbors
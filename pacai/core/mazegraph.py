@@ -0,0 +1,231 @@
+"""
+A compact graph view of a maze.
+
+Most of a maze is corridors: chains of cells with exactly two open neighbors.
+A `MazeGraph` only keeps the other cells (junctions and dead ends) as nodes,
+and contracts each corridor between them into a single weighted edge.
+Searches and distance computations over this graph touch far fewer states than over every cell,
+and every edge remembers the actions (and so the cells) along its corridor,
+so paths through the graph can always be expanded back into moves on the board.
+"""
+
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+from pacai.util.priorityQueue import IndexedPriorityQueue
+
+class MazeGraph(object):
+    """
+    The junctions and dead ends (nodes) of a maze, and the corridors (edges) between them.
+
+    Edges are directed (each corridor appears once from each end)
+    and identified by the node they leave from and the first action taken along the corridor.
+    Each edge is a tuple: (the node at the other end, the tuple of actions along the corridor, cost).
+    The cost of an edge is the number of moves along it.
+
+    Positions that must be nodes (e.g. the start and goal of a search)
+    can be passed as extraNodes, which will split the corridors they are in.
+    """
+
+    def __init__(self, walls, extraNodes = ()):
+        self._walls = walls
+
+        # {node: {first action: (other node, actions, cost)}}
+        self._edges = {}
+
+        # {corridor cell: (node, first action, number of moves from the node to the cell)}
+        # Each corridor cell is only recorded from one of its ends.
+        self._corridorCells = {}
+
+        self._buildNodes(extraNodes)
+        self._buildEdges()
+
+    def getCorridorEnds(self, position):
+        """
+        Get the ways to get from an open position to the nodes at the ends of its corridor.
+        Returns a list of (node, actions, cost) tuples,
+        which is just [(position, (), 0)] if the position is already a node.
+        """
+
+        if (position in self._edges):
+            return [(position, (), 0)]
+
+        if (position not in self._corridorCells):
+            raise ValueError('Position is not open: %s.' % (str(position)))
+
+        node, firstAction, offset = self._corridorCells[position]
+        otherNode, actions, cost = self._edges[node][firstAction]
+
+        # Back along the corridor to the node it was recorded from.
+        backActions = tuple([Actions.reverseDirection(action)
+                for action in reversed(actions[:offset])])
+
+        return [
+            (node, backActions, offset),
+            (otherNode, actions[offset:], cost - offset),
+        ]
+
+    def getEdge(self, node, action):
+        """
+        Get the edge that leaves the node with the given action,
+        or None if there is no such edge.
+        """
+
+        return self._edges[node].get(action)
+
+    def getEdges(self, node):
+        """
+        Get all the edges leaving a node.
+        """
+
+        return list(self._edges[node].values())
+
+    def getEdgeCells(self, node, actions):
+        """
+        Get the cells visited by following the actions from the node (not including the node).
+        """
+
+        x, y = node
+        cells = []
+
+        for action in actions:
+            dx, dy = Actions.directionToVector(action)
+            x, y = int(x + dx), int(y + dy)
+            cells.append((x, y))
+
+        return cells
+
+    def getNodeDistances(self, source):
+        """
+        Run Dijkstra's algorithm over the graph from a node,
+        and return the distance to every node reachable from it as a dict.
+        """
+
+        distances = {source: 0}
+        closed = set()
+
+        queue = IndexedPriorityQueue()
+        queue.push(source, 0)
+
+        while (not queue.isEmpty()):
+            node = queue.pop()
+            closed.add(node)
+
+            for (otherNode, actions, cost) in self._edges[node].values():
+                distance = distances[node] + cost
+                if (otherNode in closed):
+                    continue
+
+                if (otherNode not in distances or distance < distances[otherNode]):
+                    distances[otherNode] = distance
+                    queue.update(otherNode, distance)
+
+        return distances
+
+    def getNodes(self):
+        return list(self._edges.keys())
+
+    def getNumEdges(self):
+        """
+        Get the number of (undirected) corridors.
+        """
+
+        return sum([len(edges) for edges in self._edges.values()]) // 2
+
+    def getNumNodes(self):
+        return len(self._edges)
+
+    def isNode(self, position):
+        return position in self._edges
+
+    def _buildEdges(self):
+        for node in self._edges:
+            for action in Directions.CARDINAL:
+                if (self._getNeighbor(node, action) is None):
+                    continue
+
+                self._edges[node][action] = self._followCorridor(node, action)
+
+    def _buildNodes(self, extraNodes):
+        for position in extraNodes:
+            if (self._walls.get(*position)):
+                raise ValueError('Nodes must be open positions: %s.' % (str(position)))
+
+            self._edges[tuple(position)] = {}
+
+        openCells = self._walls.asList(False)
+
+        for cell in openCells:
+            if (len(self._getOpenActions(cell)) != 2):
+                self._edges[cell] = {}
+
+        # Every corridor that touches a node can hang its edges on that node.
+        reached = set(self._edges.keys())
+        self._floodCorridors(list(reached), reached)
+
+        # Anything left is a ring of corridor cells with no junction,
+        # which needs a node of its own.
+        for cell in openCells:
+            if (cell in reached):
+                continue
+
+            self._edges[cell] = {}
+            reached.add(cell)
+            self._floodCorridors([cell], reached)
+
+    def _floodCorridors(self, stack, reached):
+        """
+        Mark every open cell connected to the cells on the stack as reached.
+        """
+
+        while (len(stack) > 0):
+            current = stack.pop()
+            for action in self._getOpenActions(current):
+                neighbor = self._getNeighbor(current, action)
+                if (neighbor not in reached):
+                    reached.add(neighbor)
+                    stack.append(neighbor)
+
+    def _followCorridor(self, node, firstAction):
+        """
+        Walk from a node along a corridor until the next node,
+        and return the edge: (other node, actions, cost).
+        Also records the corridor cells along the way.
+        """
+
+        actions = [firstAction]
+        position = self._getNeighbor(node, firstAction)
+
+        while (position not in self._edges):
+            self._corridorCells.setdefault(position, (node, firstAction, len(actions)))
+
+            # Corridor cells have exactly two ways out, take the one we did not come in from.
+            reverse = Actions.reverseDirection(actions[-1])
+            for action in self._getOpenActions(position):
+                if (action != reverse):
+                    break
+
+            actions.append(action)
+            position = self._getNeighbor(position, action)
+
+        return (position, tuple(actions), len(actions))
+
+    def _getNeighbor(self, position, action):
+        """
+        Get the open position next to this one in the direction of the action,
+        or None if there is a wall there.
+        """
+
+        x, y = position
+        dx, dy = Actions.directionToVector(action)
+        nextX, nextY = int(x + dx), int(y + dy)
+
+        if (nextX < 0 or nextY < 0
+                or nextX >= self._walls.getWidth() or nextY >= self._walls.getHeight()
+                or self._walls.get(nextX, nextY)):
+            return None
+
+        return (nextX, nextY)
+
+    def _getOpenActions(self, position):
+        return [action for action in Directions.CARDINAL
+                if self._getNeighbor(position, action) is not None]
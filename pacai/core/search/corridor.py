@@ -0,0 +1,102 @@
+from pacai.core.mazegraph import MazeGraph
+from pacai.core.search.position import DEFAULT_GOAL_POSITION
+from pacai.core.search.problem import SearchProblem
+from pacai.core.visitHistory import VisitHistory
+
+class CorridorSearchProblem(SearchProblem):
+    """
+    A `pacai.core.search.problem.SearchProblem` for finding a specific location on the board,
+    like `pacai.core.search.position.PositionSearchProblem`,
+    but searching over a `pacai.core.mazegraph.MazeGraph` instead of every cell.
+
+    The states are the (x, y) positions of the graph's nodes
+    (junctions, dead ends, the start, and the goal),
+    and each action is a whole corridor: the tuple of moves from one node to the next.
+    `CorridorSearchProblem.expandActions` turns a path of corridors back into moves.
+    """
+
+    def __init__(self, gameState, goal = DEFAULT_GOAL_POSITION, start = None):
+        """
+        Args:
+            gameState: A `pacai.core.gamestate.AbstractGameState`.
+            goal: The target position.
+        """
+
+        super().__init__()
+
+        self.walls = gameState.getWalls()
+        self.goal = goal
+
+        self.startState = start
+        if (self.startState is None):
+            self.startState = gameState.getAgentPosition(0)
+
+        if (self.startState is None):
+            raise ValueError("Could not find starting location.")
+
+        self.graph = MazeGraph(self.walls, extraNodes = [self.startState, self.goal])
+
+        self._visitHistory = VisitHistory(self.walls.getWidth(), self.walls.getHeight())
+
+    def actionsCost(self, actions):
+        """
+        Returns the number of moves along a path of corridors.
+        If the path does not follow the graph, return 999999.
+        """
+
+        if (actions is None):
+            return 999999
+
+        node = self.startingState()
+        cost = 0
+
+        for corridor in actions:
+            edge = None
+            if (len(corridor) > 0):
+                edge = self.graph.getEdge(node, corridor[0])
+
+            if (edge is None or edge[1] != tuple(corridor)):
+                return 999999
+
+            node = edge[0]
+            cost += edge[2]
+
+        return cost
+
+    def expandActions(self, actions):
+        if (actions is None):
+            return None
+
+        moves = []
+        for corridor in actions:
+            moves += corridor
+
+        return moves
+
+    def isGoal(self, state):
+        if (state != self.goal):
+            return False
+
+        self._visitedLocations.add(state)
+        self._visitHistory.append(state)
+
+        return True
+
+    def startingState(self):
+        return self.startState
+
+    def successorStates(self, state):
+        """
+        Returns the nodes at the other end of each corridor leaving this node,
+        the corridor's moves, and its length.
+        """
+
+        successors = self.graph.getEdges(state)
+
+        # Bookkeeping for display purposes (the highlight in the GUI).
+        self._numExpanded += 1
+        if (state not in self._visitedLocations):
+            self._visitedLocations.add(state)
+            self._visitHistory.append(state)
+
+        return successors
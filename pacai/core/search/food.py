@@ -1,5 +1,6 @@
 from pacai.core.actions import Actions
 from pacai.core.directions import Directions
+from pacai.core.grid import Grid
 from pacai.core.search.problem import SearchProblem
 
 class FoodSearchProblem(SearchProblem):
@@ -38,9 +39,9 @@ class FoodSearchProblem(SearchProblem):
             x, y = state[0]
             dx, dy = Actions.directionToVector(direction)
             nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
+            if not self.walls.get(nextx, nexty):
                 nextFood = state[1].copy()
-                nextFood[nextx][nexty] = False
+                nextFood.set(nextx, nexty, False)
                 successors.append((((nextx, nexty), nextFood), direction, 1))
 
         return successors
@@ -57,8 +58,94 @@ class FoodSearchProblem(SearchProblem):
             # figure out the next state and see whether it's legal
             dx, dy = Actions.directionToVector(action)
             x, y = int(x + dx), int(y + dy)
-            if self.walls[x][y]:
+            if self.walls.get(x, y):
                 return 999999
             cost += 1
 
         return cost
+
+class CompactFoodSearchProblem(FoodSearchProblem):
+    """
+    The same problem as `FoodSearchProblem`, but with a compact representation of the food.
+
+    A search state in this problem is a tuple (pacmanPosition, foodMask).
+    Where foodMask is an int with a bit set for each remaining food,
+    bit i is for the food at `CompactFoodSearchProblem.getFoodPositions()[i]`.
+    So making a successor, checking for the goal, and hashing a state are all O(1)
+    (instead of copying or counting a whole grid).
+
+    Heuristics written for `FoodSearchProblem` states can be used through
+    `CompactFoodSearchProblem.toGridState`, e.g.:
+    ```
+    lambda state, problem: foodHeuristic(problem.toGridState(state), problem)
+    ```
+    """
+
+    def __init__(self, startingGameState):
+        super().__init__(startingGameState)
+
+        food = startingGameState.getFood()
+        self._width = food.getWidth()
+        self._height = food.getHeight()
+
+        self._foodPositions = food.asList()
+
+        # {food position: bit}
+        self._foodBits = {}
+        for (i, position) in enumerate(self._foodPositions):
+            self._foodBits[position] = 1 << i
+
+        self.start = (self.start[0], (1 << len(self._foodPositions)) - 1)
+
+    def getFoodGrid(self, foodMask):
+        """
+        Get a `pacai.core.grid.Grid` of the food in a food mask.
+        """
+
+        grid = Grid(self._width, self._height, False)
+        for (x, y) in self.getFoodList(foodMask):
+            grid.set(x, y, True)
+
+        return grid
+
+    def getFoodList(self, foodMask):
+        """
+        Get the positions of the food in a food mask.
+        """
+
+        return [position for position in self._foodPositions if foodMask & self._foodBits[position]]
+
+    def getFoodPositions(self):
+        """
+        Get the position of the food for each bit of a food mask.
+        """
+
+        return list(self._foodPositions)
+
+    def isGoal(self, state):
+        return state[1] == 0
+
+    def successorStates(self, state):
+        """
+        Returns successor states, the actions they require, and a cost of 1.
+        """
+
+        successors = []
+        self._numExpanded += 1
+
+        (x, y), foodMask = state
+        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+            dx, dy = Actions.directionToVector(direction)
+            nextx, nexty = int(x + dx), int(y + dy)
+            if not self.walls.get(nextx, nexty):
+                nextFood = foodMask & ~self._foodBits.get((nextx, nexty), 0)
+                successors.append((((nextx, nexty), nextFood), direction, 1))
+
+        return successors
+
+    def toGridState(self, state):
+        """
+        Convert a state of this problem into the matching `FoodSearchProblem` state.
+        """
+
+        return (state[0], self.getFoodGrid(state[1]))
@@ -3,7 +3,11 @@ A heuristic function estimates the cost from the current state to the nearest
 goal in the provided `pacai.core.search.problem.SearchProblem`.
 """
 
+import sys
+
 from pacai.core import distance
+from pacai.core import distanceCalculator
+from pacai.core.search import landmark as landmarkTable
 
 def null(state, problem = None):
     """
@@ -32,9 +36,143 @@ def euclidean(position, problem):
 
     return distance.euclidean(position1, position2)
 
+def landmark(position, problem):
+    """
+    This heuristic is the best lower bound on the maze distance to the goal
+    that the triangle inequality gives with a few landmarks (ALT),
+    see `pacai.core.search.landmark`.
+    The landmarks are picked (and their distances computed) once per layout.
+
+    Like maze distance, this assumes that each move costs at least 1.
+    """
+
+    table = landmarkTable.getLandmarkTable(problem.walls)
+    return table.getLowerBound(position, problem.goal)
+
 def numFood(state, problem):
     """
     This heuristic is the amount of food left to on the board.
+    Works with both grids of food and food masks
+    (see `pacai.core.search.food.CompactFoodSearchProblem`).
+    """
+
+    food = state[1]
+    if (isinstance(food, int)):
+        return bin(food).count('1')
+
+    return food.count()
+
+def foodSpanningTree(state, problem):
     """
+    This heuristic is the maze distance to the closest food,
+    plus the total maze distance along a minimum spanning tree of the remaining food.
+    Any path that eats all the food has to get to some first food and then connect all the food,
+    so this is admissible (and consistent).
+
+    Works for both `pacai.core.search.food.FoodSearchProblem`
+    and `pacai.core.search.food.CompactFoodSearchProblem`.
+    The maze distances from each food to every cell are computed once per problem,
+    and the spanning tree is computed once per set of remaining food.
+    Both are kept in `problem.heuristicInfo`.
+    """
+
+    info = problem.heuristicInfo.get('foodSpanningTree')
+    if (info is None):
+        info = _FoodSpanningTreeInfo(problem)
+        problem.heuristicInfo['foodSpanningTree'] = info
+
+    position, food = state
+    if (not isinstance(food, int)):
+        food = info.getFoodMask(food)
+
+    if (food == 0):
+        return 0
+
+    return info.getClosestDistance(position, food) + info.getTreeCost(food)
+
+class _FoodSpanningTreeInfo(object):
+    """
+    What `foodSpanningTree` precomputes and memoizes for a problem.
+    Food is identified by its index in the starting food (like in food masks).
+    """
+
+    def __init__(self, problem):
+        walls = problem.walls
+        self._height = walls.getHeight()
+
+        self._foodPositions = problem.startingGameState.getFood().asList()
+        self._foodBits = {position: 1 << i for (i, position) in enumerate(self._foodPositions)}
+
+        # The distance from each food to every cell (sys.maxsize if there is no path).
+        neighbors = distanceCalculator.getCellNeighbors(walls)
+        self._rows = [distanceCalculator.bfs(neighbors, self._getCell(position), sys.maxsize)
+                for position in self._foodPositions]
+
+        # {food mask: cost of the minimum spanning tree of that food}
+        self._treeCosts = {0: 0}
+
+    def getClosestDistance(self, position, foodMask):
+        cell = self._getCell(position)
+        return min([self._rows[i][cell] for i in _getBitIndexes(foodMask)])
+
+    def getFoodMask(self, foodGrid):
+        mask = 0
+        for position in foodGrid.asList():
+            mask |= self._foodBits[position]
+
+        return mask
+
+    def getTreeCost(self, foodMask):
+        cost = self._treeCosts.get(foodMask)
+        if (cost is None):
+            cost = self._computeTreeCost(foodMask)
+            self._treeCosts[foodMask] = cost
+
+        return cost
+
+    def _computeTreeCost(self, foodMask):
+        """
+        Prim's algorithm over the complete graph of the food (with maze distance edges).
+        """
+
+        foods = _getBitIndexes(foodMask)
+        foodCells = [self._getCell(self._foodPositions[i]) for i in foods]
+
+        # The distance from the tree to each food not yet in it.
+        row = self._rows[foods[0]]
+        distances = [row[cell] for cell in foodCells[1:]]
+        remaining = foods[1:]
+        remainingCells = foodCells[1:]
+
+        cost = 0
+        while (len(remaining) > 0):
+            closest = min(range(len(remaining)), key = lambda i: distances[i])
+            cost += distances[closest]
+
+            row = self._rows[remaining[closest]]
+
+            del remaining[closest]
+            del remainingCells[closest]
+            del distances[closest]
+
+            for i in range(len(remaining)):
+                distances[i] = min(distances[i], row[remainingCells[i]])
+
+        return cost
+
+    def _getCell(self, position):
+        x, y = position
+        return int(x) * self._height + int(y)
+
+def _getBitIndexes(mask):
+    indexes = []
+
+    index = 0
+    while (mask):
+        if (mask & 1):
+            indexes.append(index)
+
+        mask >>= 1
+        index += 1
 
-    return state[1].count()
+    return indexes
@@ -0,0 +1,129 @@
+"""
+Landmark (ALT) lower bounds on maze distance.
+
+A few cells of a layout are picked as landmarks and a BFS is run from each of them once.
+By the triangle inequality, for any landmark L and cells a and b:
+`distance(a, b) >= |distance(L, a) - distance(L, b)|`,
+so the largest of these differences is an admissible (and consistent) estimate of maze distance
+that is much tighter than the manhattan distance in mazes with long detours.
+"""
+
+import sys
+
+from pacai.core import distanceCalculator
+
+DEFAULT_NUM_LANDMARKS = 8
+
+# {(walls digest, number of landmarks): LandmarkTable}
+landmarkMap = {}
+
+# The walls, number of landmarks, and table of the last lookup.
+# Heuristics look up the same table for every state they see, so skip hashing the walls.
+_lastLookup = (None, None, None)
+
+class LandmarkTable(object):
+    """
+    The distances from a few landmarks to every cell of a layout.
+
+    Landmarks are picked one at a time as the cell farthest from every landmark so far
+    (starting with the cell farthest from an arbitrary open cell),
+    which spreads them out to the ends of the maze, where their bounds are the tightest.
+    Every connected part of the maze gets a landmark before any part gets a second one.
+    """
+
+    def __init__(self, walls, numLandmarks = DEFAULT_NUM_LANDMARKS):
+        self._width = walls.getWidth()
+        self._height = walls.getHeight()
+
+        self._landmarks = []
+
+        neighbors = distanceCalculator.getCellNeighbors(walls)
+        openCells = [cell for cell in range(len(neighbors)) if neighbors[cell] is not None]
+
+        # The distance from each landmark to each cell (sys.maxsize when there is no path).
+        rows = []
+
+        if (len(openCells) > 0):
+            # How far each cell is from the closest landmark so far
+            # (from the arbitrary cell before there are any landmarks).
+            closest = distanceCalculator.bfs(neighbors, openCells[0], sys.maxsize)
+
+            while (len(self._landmarks) < numLandmarks):
+                landmark = max(openCells, key = lambda cell: closest[cell])
+                if (len(rows) > 0 and closest[landmark] == 0):
+                    # Every cell is already a landmark.
+                    break
+
+                row = distanceCalculator.bfs(neighbors, landmark, sys.maxsize)
+
+                if (len(rows) == 0):
+                    closest = row
+                else:
+                    closest = [min(distance, closest[cell]) for (cell, distance) in enumerate(row)]
+
+                self._landmarks.append(landmark)
+                rows.append(row)
+
+        # For each open cell, the distances to it from every landmark (None for walls).
+        self._vectors = [None] * len(neighbors)
+        for cell in openCells:
+            self._vectors[cell] = tuple([row[cell] for row in rows])
+
+    def getLandmarks(self):
+        """
+        Get the (x, y) positions of the landmarks.
+        """
+
+        return [(cell // self._height, cell % self._height) for cell in self._landmarks]
+
+    def getLowerBound(self, pos1, pos2):
+        """
+        Get a lower bound on the maze distance between two grid positions.
+        Returns 0 if either position is a wall or outside of the layout.
+        """
+
+        vector1 = self._getVector(pos1)
+        vector2 = self._getVector(pos2)
+
+        if (vector1 is None or vector2 is None):
+            return 0
+
+        bound = 0
+        for (distance1, distance2) in zip(vector1, vector2):
+            difference = abs(distance1 - distance2)
+            if (difference > bound):
+                bound = difference
+
+        return bound
+
+    def getNumLandmarks(self):
+        return len(self._landmarks)
+
+    def _getVector(self, position):
+        x, y = position
+        if (x < 0 or y < 0 or x >= self._width or y >= self._height):
+            return None
+
+        return self._vectors[int(x) * self._height + int(y)]
+
+def getLandmarkTable(walls, numLandmarks = DEFAULT_NUM_LANDMARKS):
+    """
+    Get the `LandmarkTable` for some walls.
+    Tables are computed once and shared by every layout with the same walls.
+    """
+
+    global _lastLookup
+
+    lastWalls, lastNumLandmarks, table = _lastLookup
+    if (walls is lastWalls and numLandmarks == lastNumLandmarks):
+        return table
+
+    key = (distanceCalculator.getWallsDigest(walls), numLandmarks)
+
+    table = landmarkMap.get(key)
+    if (table is None):
+        table = LandmarkTable(walls, numLandmarks)
+        landmarkMap[key] = table
+
+    _lastLookup = (walls, numLandmarks, table)
+    return table
@@ -0,0 +1,221 @@
+"""
+Fast answers to "where is the closest target (e.g. food) and how do I get there?".
+
+`findNearest` answers it for a single position with one BFS that stops at the first target.
+When the same question is asked from many positions (or many times while targets are eaten),
+a `TargetDistanceField` answers it with a lookup.
+"""
+
+import heapq
+
+from pacai.core import distanceCalculator
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+
+def findNearest(walls, source, targets):
+    """
+    Run a single BFS from the source until it reaches any of the target positions.
+    Returns the closest target and the actions to get there (ties go to the first target found),
+    or None if no target can be reached.
+    """
+
+    targets = set(targets)
+
+    # {position: (previous position, action from it)}
+    parents = {source: None}
+
+    queue = [source]
+    for position in queue:
+        if (position in targets):
+            return position, _getPath(parents, position)
+
+        x, y = position
+        for action in Directions.CARDINAL:
+            dx, dy = Actions.directionToVector(action)
+            nextPosition = (int(x + dx), int(y + dy))
+
+            if (nextPosition in parents or walls.get(*nextPosition)):
+                continue
+
+            parents[nextPosition] = (position, action)
+            queue.append(nextPosition)
+
+    return None
+
+class TargetDistanceField(object):
+    """
+    The maze distance from every cell to its closest target (and which target that is),
+    computed with one multi-source BFS out from all the targets.
+
+    Adding or removing a target (e.g. when food is eaten) only recomputes the cells
+    that the target is (or was) the closest to.
+    """
+
+    def __init__(self, walls, targets):
+        self._width = walls.getWidth()
+        self._height = walls.getHeight()
+        self._neighbors = distanceCalculator.getCellNeighbors(walls)
+
+        # For each cell, the distance to the closest target and which target cell it is.
+        # Both are None for walls and for cells that can't reach any target.
+        self._distances = [None] * len(self._neighbors)
+        self._owners = [None] * len(self._neighbors)
+
+        self._targets = set()
+        for position in targets:
+            cell = self._getCell(position)
+            if (cell is None or self._neighbors[cell] is None):
+                raise ValueError('Targets must be open positions: %s.' % (str(position)))
+
+            self._targets.add(cell)
+            self._distances[cell] = 0
+            self._owners[cell] = cell
+
+        queue = list(self._targets)
+        for cell in queue:
+            for neighbor in self._neighbors[cell]:
+                if (self._distances[neighbor] is None):
+                    self._distances[neighbor] = self._distances[cell] + 1
+                    self._owners[neighbor] = self._owners[cell]
+                    queue.append(neighbor)
+
+    def addTarget(self, position):
+        """
+        Add a target and update the distances of the cells it is now the closest target to.
+        """
+
+        target = self._getCell(position)
+        if (target is None or self._neighbors[target] is None):
+            raise ValueError('Targets must be open positions: %s.' % (str(position)))
+
+        if (target in self._targets):
+            raise ValueError('Position is already a target: %s.' % (str(position)))
+
+        self._targets.add(target)
+        self._distances[target] = 0
+        self._owners[target] = target
+
+        # BFS out from the new target for as long as it is closer than the old closest target.
+        queue = [target]
+        for cell in queue:
+            distance = self._distances[cell] + 1
+
+            for neighbor in self._neighbors[cell]:
+                if (self._distances[neighbor] is None or distance < self._distances[neighbor]):
+                    self._distances[neighbor] = distance
+                    self._owners[neighbor] = target
+                    queue.append(neighbor)
+
+    def getDistance(self, position):
+        """
+        Get the maze distance from a position to its closest target,
+        or None if the position is a wall (or outside the layout) or can't reach any target.
+        """
+
+        cell = self._getCell(position)
+        if (cell is None):
+            return None
+
+        return self._distances[cell]
+
+    def getNearest(self, position):
+        """
+        Get the closest target to a position, and the actions to get there.
+        Returns None if no target can be reached.
+        """
+
+        cell = self._getCell(position)
+        if (cell is None or self._distances[cell] is None):
+            return None
+
+        actions = []
+        while (self._distances[cell] > 0):
+            # Any neighbor one step closer is on a shortest path.
+            for neighbor in self._neighbors[cell]:
+                if (self._distances[neighbor] == self._distances[cell] - 1):
+                    break
+
+            actions.append(self._getAction(cell, neighbor))
+            cell = neighbor
+
+        return self._getPosition(cell), actions
+
+    def getTargets(self):
+        return [self._getPosition(cell) for cell in sorted(self._targets)]
+
+    def isTarget(self, position):
+        return self._getCell(position) in self._targets
+
+    def removeTarget(self, position):
+        """
+        Remove a target and update the distances of the cells it was the closest target to.
+        """
+
+        target = self._getCell(position)
+        if (target not in self._targets):
+            raise ValueError('Position is not a target: %s.' % (str(position)))
+
+        self._targets.remove(target)
+
+        # Find every cell that was closest to the removed target.
+        # Each cell got its target from a neighbor, so these cells are all connected to the target.
+        orphans = [target]
+        isOrphan = {target}
+        for cell in orphans:
+            for neighbor in self._neighbors[cell]:
+                if (self._owners[neighbor] == target and neighbor not in isOrphan):
+                    orphans.append(neighbor)
+                    isOrphan.add(neighbor)
+
+        for cell in orphans:
+            self._distances[cell] = None
+            self._owners[cell] = None
+
+        # Grow back into the forgotten cells from the cells around them.
+        # The cells around them have different distances, so go in order of distance.
+        queue = []
+        for cell in orphans:
+            for neighbor in self._neighbors[cell]:
+                if (self._distances[neighbor] is not None):
+                    heapq.heappush(queue, (self._distances[neighbor] + 1, cell,
+                            self._owners[neighbor]))
+
+        while (len(queue) > 0):
+            distance, cell, owner = heapq.heappop(queue)
+            if (self._distances[cell] is not None):
+                continue
+
+            self._distances[cell] = distance
+            self._owners[cell] = owner
+
+            for neighbor in self._neighbors[cell]:
+                if (self._distances[neighbor] is None):
+                    heapq.heappush(queue, (distance + 1, neighbor, owner))
+
+    def _getAction(self, cell, nextCell):
+        x, y = self._getPosition(cell)
+        nextX, nextY = self._getPosition(nextCell)
+
+        return Actions.vectorToDirection((nextX - x, nextY - y))
+
+    def _getCell(self, position):
+        x, y = position
+        if (x < 0 or y < 0 or x >= self._width or y >= self._height):
+            return None
+
+        return int(x) * self._height + int(y)
+
+    def _getPosition(self, cell):
+        return (cell // self._height, cell % self._height)
+
+def _getPath(parents, position):
+    actions = []
+
+    step = parents[position]
+    while (step is not None):
+        position, action = step
+        actions.append(action)
+        step = parents[position]
+
+    actions.reverse()
+    return actions
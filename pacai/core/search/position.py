@@ -1,6 +1,7 @@
 from pacai.core.actions import Actions
 from pacai.core.directions import Directions
 from pacai.core.search.problem import SearchProblem
+from pacai.core.visitHistory import VisitHistory
 
 DEFAULT_COST_FUNCTION = lambda x: 1
 DEFAULT_GOAL_POSITION = (1, 1)
@@ -27,6 +28,8 @@ class PositionSearchProblem(SearchProblem):
         self.goal = goal
         self.costFn = costFn
 
+        self._visitHistory = VisitHistory(self.walls.getWidth(), self.walls.getHeight())
+
         self.startState = start
         if (self.startState is None):
             self.startState = gameState.getAgentPosition(0)
@@ -63,7 +66,7 @@ class PositionSearchProblem(SearchProblem):
             dx, dy = Actions.directionToVector(action)
             nextx, nexty = int(x + dx), int(y + dy)
 
-            if (not self.walls[nextx][nexty]):
+            if (not self.walls.get(nextx, nexty)):
                 nextState = (nextx, nexty)
                 cost = self.costFn(nextState)
 
@@ -96,7 +99,7 @@ class PositionSearchProblem(SearchProblem):
             # Check figure out the next state and see whether its' legal
             dx, dy = Actions.directionToVector(action)
             x, y = int(x + dx), int(y + dy)
-            if (self.walls[x][y]):
+            if (self.walls.get(x, y)):
                 return 999999
 
             cost += self.costFn((x, y))
@@ -29,9 +29,14 @@ class SearchProblem(abc.ABC):
         # Keep track of the coordinates we have visited.
         # Students are not required to use these,
         # but doing so will allow the GUI to highlight the visited coordinates.
+        # Problems that know the size of the board should replace the history with a
+        # `pacai.core.visitHistory.VisitHistory`, which only keeps the first visit to each cell.
         self._visitedLocations = set()
         self._visitHistory = []
 
+        # An optional `pacai.core.search.stats.SearchStats` collecting stats about the search.
+        self._stats = None
+
     @abc.abstractmethod
     def actionsCost(self, actions):
         """
@@ -43,9 +48,26 @@ class SearchProblem(abc.ABC):
 
         pass
 
+    def expandActions(self, actions):
+        """
+        Convert the actions found by a search into the moves (`pacai.core.directions.Directions`)
+        an agent should make.
+        For most problems, the actions already are moves.
+        """
+
+        return actions
+
     def getExpandedCount(self):
         return self._numExpanded
 
+    def getStats(self):
+        """
+        Get the `pacai.core.search.stats.SearchStats` attached to this problem (or None).
+        Searches can report on their frontier through it.
+        """
+
+        return self._stats
+
     def getVisitHistory(self):
         return self._visitHistory
 
@@ -60,6 +82,9 @@ class SearchProblem(abc.ABC):
 
         pass
 
+    def setStats(self, stats):
+        self._stats = stats
+
     @abc.abstractmethod
     def startingState(self):
         """
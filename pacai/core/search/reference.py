@@ -0,0 +1,197 @@
+"""
+Reference implementations of the classic graph search algorithms.
+
+Unlike `pacai.core.search.search` (which points at the student implementations),
+these are meant to be used by infrastructure that needs a fast and correct search
+(e.g. `pacai.core.distance.maze` and `pacai.core.featureExtractors.SimpleExtractor`).
+All of them:
+ - keep closed (and seen) states in sets, so membership checks are O(1),
+ - keep each state in the frontier at most once
+   (best-first searches use a `pacai.util.priorityQueue.IndexedPriorityQueue`),
+ - keep a parent pointer for each state and only build the path once a goal is found,
+ - return a list of actions that reaches a goal, or None if no goal can be reached,
+ - report on their frontier to the problem's `pacai.core.search.stats.SearchStats` (if any).
+
+Any `pacai.core.search.problem.SearchProblem` works, as long as its states are hashable.
+"""
+
+import collections
+
+from pacai.util.priorityQueue import IndexedPriorityQueue
+
+def breadthFirstSearch(problem):
+    """
+    Search the shallowest nodes in the search tree first.
+    States are checked for the goal as soon as they are generated.
+    """
+
+    start = problem.startingState()
+    if (problem.isGoal(start)):
+        return []
+
+    stats = problem.getStats()
+
+    # {state: (parent state, action from the parent)}
+    parents = {start: None}
+
+    queue = collections.deque([start])
+    while (len(queue) > 0):
+        state = queue.popleft()
+
+        for (nextState, action, cost) in problem.successorStates(state):
+            if (nextState in parents):
+                continue
+
+            parents[nextState] = (state, action)
+            if (problem.isGoal(nextState)):
+                return _getPath(parents, nextState)
+
+            queue.append(nextState)
+            if (stats is not None):
+                stats.recordPush(len(queue))
+
+    return None
+
+def depthFirstSearch(problem):
+    """
+    Search the deepest nodes in the search tree first.
+    """
+
+    stats = problem.getStats()
+
+    # {state: (parent state, action from the parent)}
+    parents = {}
+
+    # States that have been pushed (only kept for stats).
+    pushed = set()
+
+    # (state, (parent state, action from the parent))
+    stack = [(problem.startingState(), None)]
+    while (len(stack) > 0):
+        state, step = stack.pop()
+        if (state in parents):
+            continue
+
+        parents[state] = step
+        if (problem.isGoal(state)):
+            return _getPath(parents, state)
+
+        for (nextState, action, cost) in problem.successorStates(state):
+            if (nextState in parents):
+                continue
+
+            stack.append((nextState, (state, action)))
+            if (stats is not None):
+                stats.recordPush(len(stack), nextState in pushed)
+                pushed.add(nextState)
+
+    return None
+
+def uniformCostSearch(problem):
+    """
+    Search the node of least total cost first.
+    """
+
+    return _bestFirstSearch(problem, lambda state, cost: cost)
+
+def aStarSearch(problem, heuristic = None, tieBreak = True):
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+    Without a heuristic, this is just `uniformCostSearch`.
+
+    If tieBreak is True, then nodes with the same combined cost and heuristic
+    are searched deepest (highest cost) first.
+    In a maze this expands far fewer of the many nodes that tie with the optimal path.
+    """
+
+    if (heuristic is None):
+        return uniformCostSearch(problem)
+
+    priority = lambda state, cost: cost + heuristic(state, problem)
+    return _bestFirstSearch(problem, priority, tieBreak)
+
+def greedySearch(problem, heuristic):
+    """
+    Search the node with the lowest heuristic first.
+    The path found is not necessarily the cheapest.
+    """
+
+    return _bestFirstSearch(problem, lambda state, cost: heuristic(state, problem))
+
+def _bestFirstSearch(problem, priorityFunction, tieBreak = False):
+    """
+    Search the node with the lowest priority (from priorityFunction(state, cost)) first.
+    When a cheaper path to a state in the frontier is found,
+    its priority is lowered in place (so every state is in the frontier at most once).
+
+    Ties are broken by insertion order (or by highest cost first when tieBreak is True),
+    which also means that states never have to be compared.
+    """
+
+    start = problem.startingState()
+    stats = problem.getStats()
+
+    # {state: (parent state, action from the parent)}
+    parents = {start: None}
+    costs = {start: 0}
+    closed = set()
+
+    # Priorities are (priority, tie breaker).
+    queue = IndexedPriorityQueue()
+    queue.push(start, (priorityFunction(start, 0), 0))
+
+    while (not queue.isEmpty()):
+        state = queue.pop()
+
+        if (problem.isGoal(state)):
+            return _getPath(parents, state)
+
+        closed.add(state)
+
+        for (nextState, action, stepCost) in problem.successorStates(state):
+            if (nextState in closed):
+                continue
+
+            cost = costs[state] + stepCost
+            if (nextState in costs and costs[nextState] <= cost):
+                continue
+
+            costs[nextState] = cost
+            parents[nextState] = (state, action)
+
+            tie = 0
+            if (tieBreak):
+                tie = -cost
+
+            duplicate = (nextState in queue)
+            queue.update(nextState, (priorityFunction(nextState, cost), tie))
+
+            if (stats is not None):
+                stats.recordPush(len(queue), duplicate)
+
+    return None
+
+def _getPath(parents, state):
+    """
+    Follow the parent pointers back from a state to the start,
+    and return the actions along the way (in order).
+    """
+
+    actions = []
+
+    step = parents[state]
+    while (step is not None):
+        state, action = step
+        actions.append(action)
+        step = parents[state]
+
+    actions.reverse()
+    return actions
+
+# Abbreviations
+
+bfs = breadthFirstSearch
+dfs = depthFirstSearch
+astar = aStarSearch
+ucs = uniformCostSearch
+greedy = greedySearch
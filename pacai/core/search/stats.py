@@ -0,0 +1,136 @@
+"""
+Statistics about how a search spent its time.
+
+A `SearchStats` is attached to a `pacai.core.search.problem.SearchProblem`
+with `SearchStats.instrument`, which counts and times the problem's expansions.
+Searches that know about stats (like the ones in `pacai.core.search.reference`)
+also report on their frontier through `pacai.core.search.problem.SearchProblem.getStats`,
+and heuristics can be counted and timed by wrapping them with `SearchStats.wrapHeuristic`.
+"""
+
+import functools
+import json
+import time
+
+class SearchStats(object):
+    """
+    Counters and timers for a single search.
+    All times are in seconds.
+    """
+
+    def __init__(self):
+        # The number of states expanded and successors generated.
+        self.numExpanded = 0
+        self.numGenerated = 0
+
+        # Time spent getting successors.
+        self.expansionTime = 0.0
+        self.maxExpansionTime = 0.0
+
+        # The number of pushes onto the frontier, the largest the frontier got,
+        # and the number of pushes of a state that was already in the frontier.
+        # These stay at 0 for searches that don't report on their frontier.
+        self.numPushes = 0
+        self.peakFrontierSize = 0
+        self.numDuplicatePushes = 0
+
+        self.numHeuristicCalls = 0
+        self.heuristicTime = 0.0
+
+        self._startTime = None
+        self.totalTime = 0.0
+
+    def instrument(self, problem):
+        """
+        Attach these stats to a problem, and start counting and timing its expansions.
+        Returns the problem.
+        """
+
+        successorStates = problem.successorStates
+
+        @functools.wraps(successorStates)
+        def timedSuccessorStates(state):
+            startTime = time.perf_counter()
+            successors = successorStates(state)
+            self.recordExpansion(len(successors), time.perf_counter() - startTime)
+
+            return successors
+
+        problem.successorStates = timedSuccessorStates
+        problem.setStats(self)
+
+        return problem
+
+    def recordExpansion(self, numSuccessors, seconds):
+        self.numExpanded += 1
+        self.numGenerated += numSuccessors
+
+        self.expansionTime += seconds
+        self.maxExpansionTime = max(self.maxExpansionTime, seconds)
+
+    def recordHeuristic(self, seconds):
+        self.numHeuristicCalls += 1
+        self.heuristicTime += seconds
+
+    def recordPush(self, frontierSize, duplicate = False):
+        """
+        Record a push onto the frontier (after which it has frontierSize items).
+        """
+
+        self.numPushes += 1
+        self.peakFrontierSize = max(self.peakFrontierSize, frontierSize)
+
+        if (duplicate):
+            self.numDuplicatePushes += 1
+
+    def start(self):
+        self._startTime = time.perf_counter()
+
+    def stop(self):
+        if (self._startTime is not None):
+            self.totalTime += time.perf_counter() - self._startTime
+            self._startTime = None
+
+    def toDict(self):
+        meanExpansionTime = 0.0
+        if (self.numExpanded > 0):
+            meanExpansionTime = self.expansionTime / self.numExpanded
+
+        return {
+            'numExpanded': self.numExpanded,
+            'numGenerated': self.numGenerated,
+            'numPushes': self.numPushes,
+            'peakFrontierSize': self.peakFrontierSize,
+            'numDuplicatePushes': self.numDuplicatePushes,
+            'numHeuristicCalls': self.numHeuristicCalls,
+            'heuristicTime': self.heuristicTime,
+            'expansionTime': self.expansionTime,
+            'meanExpansionTime': meanExpansionTime,
+            'maxExpansionTime': self.maxExpansionTime,
+            'totalTime': self.totalTime,
+        }
+
+    def toJSON(self, **extra):
+        """
+        Get the stats (and any extra keyword values) as a JSON object string.
+        """
+
+        values = self.toDict()
+        values.update(extra)
+
+        return json.dumps(values, sort_keys = True)
+
+    def wrapHeuristic(self, heuristic):
+        """
+        Get a version of the heuristic that is counted and timed by these stats.
+        """
+
+        @functools.wraps(heuristic)
+        def timedHeuristic(state, problem):
+            startTime = time.perf_counter()
+            value = heuristic(state, problem)
+            self.recordHeuristic(time.perf_counter() - startTime)
+
+            return value
+
+        return timedHeuristic
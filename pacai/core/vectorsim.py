@@ -0,0 +1,345 @@
+"""
+A vectorized engine that plays many independent games of classic Pacman in lockstep.
+
+Each game is the same as a `pacai.bin.pacman.PacmanGameState` started from the same layout,
+but the whole batch is held as NumPy arrays (food bitplanes, agent positions, directions,
+scared timers, scores, etc) and every step moves one agent in all of the games at once
+using array operations that implement `pacai.bin.pacman.PacmanRules` and
+`pacai.bin.pacman.GhostRules`.
+Given the same actions, every game ends up with exactly the same outcome as the scalar engine.
+
+This is meant for workloads like reinforcement learning and agent evaluation that
+need to play a lot of games, and is not used by the rest of pacai.
+NumPy is an optional dependency of pacai (`pip install linqs-pacai[vector]`),
+so it must be installed to use this module.
+
+Actions are passed and returned as indexes into `ACTIONS`.
+"""
+
+try:
+    import numpy
+except ImportError:
+    # Keep the module importable (e.g. for documentation) without NumPy.
+    numpy = None
+
+from pacai.bin import pacman
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+
+ACTIONS = [
+    Directions.NORTH,
+    Directions.SOUTH,
+    Directions.EAST,
+    Directions.WEST,
+    Directions.STOP,
+]
+
+ACTION_INDEXES = {action: index for (index, action) in enumerate(ACTIONS)}
+
+STOP_INDEX = ACTION_INDEXES[Directions.STOP]
+
+# The unit movement vector for each action, [actionIndex] -> (dx, dy).
+_VECTORS = None
+
+# The index of the reverse of each action.
+_REVERSE = None
+
+if (numpy is not None):
+    _VECTORS = numpy.array([Actions.directionToVector(action) for action in ACTIONS], dtype = int)
+    _REVERSE = numpy.array([ACTION_INDEXES[Actions.reverseDirection(action)]
+            for action in ACTIONS])
+
+class PacmanVectorSimulator(object):
+    """
+    N independent games of classic Pacman on the same layout.
+
+    Agent 0 is always pacman and agents 1 to getNumAgents() - 1 are ghosts.
+    The caller drives the games the same way `pacai.core.game.Game` does,
+    calling `PacmanVectorSimulator.step` for each agent in turn.
+    Games that are over are left untouched by later steps.
+    """
+
+    def __init__(self, layout, numGames):
+        if (numpy is None):
+            raise ImportError('The vectorized simulator requires NumPy.')
+
+        self._layout = layout
+        self._numGames = numGames
+        self._numAgents = len(layout.agentPositions)
+
+        width = layout.getWidth()
+        height = layout.getHeight()
+
+        self._walls = numpy.array([[layout.walls.get(x, y) for y in range(height)]
+                for x in range(width)], dtype = bool)
+
+        # [game, x, y]
+        initialFood = numpy.array([[layout.food.get(x, y) for y in range(height)]
+                for x in range(width)], dtype = bool)
+        self._food = numpy.repeat(initialFood[numpy.newaxis], numGames, axis = 0)
+
+        # Capsules are tracked with a mask over the layout's capsules, [game, capsuleIndex].
+        self._capsules = numpy.ones((numGames, len(layout.capsules)), dtype = bool)
+
+        # [x, y] -> the index of the capsule at that location, or -1.
+        self._capsuleIndexes = numpy.full((width, height), -1, dtype = int)
+        for (index, (x, y)) in enumerate(layout.capsules):
+            self._capsuleIndexes[x, y] = index
+
+        # [agentIndex] -> (x, y)
+        self._startPositions = numpy.array([position for (isPacman, position)
+                in layout.agentPositions], dtype = float)
+
+        # [game, agentIndex, (x, y)]
+        # Scared ghosts move at half speed, so positions are floats (like the scalar engine).
+        self._positions = numpy.repeat(self._startPositions[numpy.newaxis], numGames, axis = 0)
+
+        # [game, agentIndex] -> action index
+        self._directions = numpy.full((numGames, self._numAgents), STOP_INDEX, dtype = int)
+
+        # [game, agentIndex]
+        self._scaredTimers = numpy.zeros((numGames, self._numAgents), dtype = int)
+
+        # [game]
+        self._scores = numpy.zeros(numGames, dtype = int)
+        self._gameover = numpy.zeros(numGames, dtype = bool)
+        self._win = numpy.zeros(numGames, dtype = bool)
+
+    def getAgentDirections(self):
+        """
+        Get the direction each agent is facing as an action index, [game, agentIndex].
+        """
+
+        return self._directions.copy()
+
+    def getAgentPositions(self):
+        """
+        Get the position of each agent, [game, agentIndex, (x, y)].
+        """
+
+        return self._positions.copy()
+
+    def getCapsules(self):
+        """
+        Get a mask of the remaining capsules, [game, capsuleIndex].
+        Capsule indexes match the layout's capsule list.
+        """
+
+        return self._capsules.copy()
+
+    def getFood(self):
+        """
+        Get the remaining food, [game, x, y].
+        """
+
+        return self._food.copy()
+
+    def getLayout(self):
+        return self._layout
+
+    def getLegalActionMask(self, agentIndex):
+        """
+        Get a mask of the legal actions for an agent, [game, actionIndex].
+        This matches `pacai.bin.pacman.PacmanGameState.getLegalActions`.
+        Games that are over have no legal actions.
+        """
+
+        games = numpy.arange(self._numGames)
+        positions = self._positions[:, agentIndex]
+        directions = self._directions[:, agentIndex]
+
+        gridPositions = numpy.floor(positions + 0.5).astype(int)
+        onGrid = (numpy.abs(positions - gridPositions).sum(axis = 1) <= Actions.TOLERANCE)
+
+        nextX = gridPositions[:, 0, numpy.newaxis] + _VECTORS[numpy.newaxis, :, 0]
+        nextY = gridPositions[:, 1, numpy.newaxis] + _VECTORS[numpy.newaxis, :, 1]
+        mask = ~self._walls[nextX, nextY]
+
+        # In between grid points, all agents must continue straight.
+        mask[~onGrid] = False
+        mask[games[~onGrid], directions[~onGrid]] = True
+
+        if (agentIndex != pacman.PACMAN_AGENT_INDEX):
+            # Ghosts cannot stop, and cannot turn around unless they reach a dead end.
+            mask[:, STOP_INDEX] = False
+
+            reverse = _REVERSE[directions]
+            removeReverse = mask[games, reverse] & (mask.sum(axis = 1) > 1)
+            mask[games[removeReverse], reverse[removeReverse]] = False
+
+        mask[self._gameover] = False
+
+        return mask
+
+    def getNumAgents(self):
+        return self._numAgents
+
+    def getNumFood(self):
+        """
+        Get the amount of food left in each game, [game].
+        """
+
+        return self._food.sum(axis = (1, 2))
+
+    def getNumGames(self):
+        return self._numGames
+
+    def getScaredTimers(self):
+        """
+        Get the scared timer of each agent, [game, agentIndex].
+        """
+
+        return self._scaredTimers.copy()
+
+    def getScores(self):
+        """
+        Get the score of each game, [game].
+        """
+
+        return self._scores.copy()
+
+    def isLose(self):
+        return self._gameover & ~self._win
+
+    def isOver(self):
+        return self._gameover.copy()
+
+    def isWin(self):
+        return self._gameover & self._win
+
+    def sampleRandomActions(self, agentIndex, rng):
+        """
+        Choose a legal action uniformly at random for the agent in each game
+        (like `pacai.agents.ghost.random.RandomGhost`).
+        Games that are over get `Directions.STOP`.
+        rng is a `numpy.random.Generator`.
+        """
+
+        mask = self.getLegalActionMask(agentIndex)
+
+        # Pick the legal action with the highest random weight.
+        weights = rng.random(mask.shape)
+        weights[~mask] = -1.0
+        actions = numpy.argmax(weights, axis = 1)
+
+        actions[~mask.any(axis = 1)] = STOP_INDEX
+        return actions
+
+    def step(self, agentIndex, actions, validate = True):
+        """
+        Have the agent take an action in every game that is not yet over.
+        actions holds an action (as an action index or a `pacai.core.directions.Directions`)
+        for each game, the actions for games that are already over are ignored.
+
+        If validate is true, a ValueError is raised if any action is illegal
+        (see `pacai.core.gamestate.AbstractGameState.generateSuccessor`).
+        """
+
+        actions = numpy.asarray(actions)
+        if (actions.dtype.kind not in 'iu'):
+            actions = numpy.array([ACTION_INDEXES[action] for action in actions], dtype = int)
+
+        if (actions.shape != (self._numGames, )):
+            raise ValueError('Expected %d actions, got %s.' % (self._numGames, actions.shape))
+
+        active = ~self._gameover
+        games = numpy.arange(self._numGames)[active]
+        actions = actions[active]
+
+        if (validate):
+            legal = self.getLegalActionMask(agentIndex)
+            if (not legal[games, actions].all()):
+                raise ValueError('Illegal action for agent %d.' % (agentIndex))
+
+        if (agentIndex == pacman.PACMAN_AGENT_INDEX):
+            self._stepPacman(games, actions)
+        else:
+            self._stepGhost(agentIndex, games, actions)
+
+    def _checkDeath(self, games, ghostIndex):
+        """
+        Resolve a collision between pacman and a ghost (`pacai.bin.pacman.GhostRules.checkDeath`).
+        """
+
+        distance = numpy.abs(self._positions[games, ghostIndex]
+                - self._positions[games, pacman.PACMAN_AGENT_INDEX]).sum(axis = 1)
+        collided = games[distance <= pacman.COLLISION_TOLERANCE]
+
+        scared = (self._scaredTimers[collided, ghostIndex] > 0)
+
+        # Pacman ate a ghost.
+        eaten = collided[scared]
+        self._scores[eaten] += pacman.GHOST_POINTS
+        self._positions[eaten, ghostIndex] = self._startPositions[ghostIndex]
+        self._directions[eaten, ghostIndex] = STOP_INDEX
+        self._scaredTimers[eaten, ghostIndex] = 0
+
+        # A ghost ate pacman.
+        killed = collided[~scared]
+        killed = killed[~self._gameover[killed]]
+        self._scores[killed] += pacman.LOSE_POINTS
+        self._gameover[killed] = True
+        self._win[killed] = False
+
+    def _move(self, games, agentIndex, actions, speeds):
+        """
+        Move agents and update their direction (`pacai.core.agentstate.AgentState.updatePosition`).
+        """
+
+        self._positions[games, agentIndex] += _VECTORS[actions] * speeds[:, numpy.newaxis]
+
+        # Stopping keeps the same direction.
+        moved = (actions != STOP_INDEX)
+        self._directions[games[moved], agentIndex] = actions[moved]
+
+    def _stepGhost(self, agentIndex, games, actions):
+        # Scared ghosts move at half speed.
+        speeds = numpy.full(len(games), pacman.GhostRules.GHOST_SPEED)
+        speeds[self._scaredTimers[games, agentIndex] > 0] /= 2.0
+
+        self._move(games, agentIndex, actions, speeds)
+
+        # Time passes, ghosts that are no longer scared snap back to the grid.
+        scared = games[self._scaredTimers[games, agentIndex] > 0]
+        self._scaredTimers[scared, agentIndex] -= 1
+
+        unscared = scared[self._scaredTimers[scared, agentIndex] == 0]
+        self._positions[unscared, agentIndex] = numpy.floor(
+                self._positions[unscared, agentIndex] + 0.5)
+
+        self._checkDeath(games, agentIndex)
+
+    def _stepPacman(self, games, actions):
+        speeds = numpy.full(len(games), pacman.PacmanRules.PACMAN_SPEED)
+        self._move(games, pacman.PACMAN_AGENT_INDEX, actions, speeds)
+
+        # Pacman always moves a full square, so he is always on the grid.
+        positions = self._positions[games, pacman.PACMAN_AGENT_INDEX].astype(int)
+        x = positions[:, 0]
+        y = positions[:, 1]
+
+        # Eat food.
+        ate = self._food[games, x, y]
+        eatingGames = games[ate]
+        self._food[eatingGames, x[ate], y[ate]] = False
+        self._scores[eatingGames] += pacman.FOOD_POINTS
+
+        cleared = eatingGames[~self._food[eatingGames].any(axis = (1, 2))]
+        self._scores[cleared] += pacman.BOARD_CLEAR_POINTS
+        self._gameover[cleared] = True
+        self._win[cleared] = True
+
+        # Eat a capsule (only if there was no food).
+        capsuleIndexes = self._capsuleIndexes[x, y]
+        hasCapsule = ~ate & (capsuleIndexes >= 0)
+        hasCapsule[hasCapsule] = self._capsules[games[hasCapsule], capsuleIndexes[hasCapsule]]
+
+        capsuleGames = games[hasCapsule]
+        self._capsules[capsuleGames, capsuleIndexes[hasCapsule]] = False
+        self._scaredTimers[capsuleGames, 1:] = pacman.SCARED_TIME
+
+        # Penalty for waiting around.
+        self._scores[games] -= pacman.TIME_PENALTY
+
+        for ghostIndex in range(1, self._numAgents):
+            self._checkDeath(games, ghostIndex)
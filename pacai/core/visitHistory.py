@@ -0,0 +1,99 @@
+"""
+A record of the order in which the cells of a board were first visited (e.g. by a search).
+"""
+
+import array
+
+class VisitHistory(object):
+    """
+    The first-visit order of each cell of a board, kept in an array sized to the board.
+
+    Visiting a cell again does nothing, so a history never takes more than one slot per cell
+    no matter how many times cells are visited.
+    Iterating over a history gives the visited positions in the order they were first visited,
+    in time proportional to the number of cells.
+
+    `VisitHistory.append` is an alias of `VisitHistory.add`,
+    so a history can stand in for a list of visited positions.
+    """
+
+    def __init__(self, width, height):
+        self._width = width
+        self._height = height
+
+        # For each cell (x * height + y), 0 if it has not been visited,
+        # otherwise one more than the number of cells visited before it.
+        self._orders = array.array('L', [0]) * (width * height)
+        self._numVisited = 0
+
+    @staticmethod
+    def fromLocations(width, height, locations):
+        """
+        Build a history from a sequence of visited positions.
+        """
+
+        history = VisitHistory(width, height)
+        for position in locations:
+            history.add(position)
+
+        return history
+
+    def add(self, position):
+        """
+        Record a visit to a position.
+        Returns True if this is the first visit to the position.
+        """
+
+        cell = self._getCell(position)
+        if (self._orders[cell] != 0):
+            return False
+
+        self._numVisited += 1
+        self._orders[cell] = self._numVisited
+
+        return True
+
+    append = add
+
+    def copy(self):
+        history = VisitHistory(self._width, self._height)
+        history._orders = array.array('L', self._orders)
+        history._numVisited = self._numVisited
+
+        return history
+
+    def getOrder(self, position):
+        """
+        Get how many positions were visited before this one,
+        or None if the position has not been visited.
+        """
+
+        order = self._orders[self._getCell(position)]
+        if (order == 0):
+            return None
+
+        return order - 1
+
+    def _getCell(self, position):
+        x, y = position
+        x, y = int(x), int(y)
+
+        if (x < 0 or y < 0 or x >= self._width or y >= self._height):
+            raise ValueError('Position is not on the board: %s.' % (str(position)))
+
+        return x * self._height + y
+
+    def __contains__(self, position):
+        return self.getOrder(position) is not None
+
+    def __iter__(self):
+        positions = [None] * self._numVisited
+
+        for (cell, order) in enumerate(self._orders):
+            if (order != 0):
+                positions[order - 1] = (cell // self._height, cell % self._height)
+
+        return iter(positions)
+
+    def __len__(self):
+        return self._numVisited
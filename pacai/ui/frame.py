@@ -90,12 +90,12 @@ class Frame(abc.ABC):
         draw = ImageDraw.Draw(image)
 
         # First, draw any highlights.
-        for i in range(len(self._highlightLocations)):
-            (x, y) = self._highlightLocations[i]
+        numHighlights = len(self._highlightLocations)
+        for (i, (x, y)) in enumerate(self._highlightLocations):
             startPoint = self._toImageCoords(x, y)
             endPoint = self._toImageCoords(x + 1, y - 1)
 
-            intensity = int((i / len(self._highlightLocations)) * MAX_HIGHLIGHT_INTENSITY_RANGE)
+            intensity = int((i / numHighlights) * MAX_HIGHLIGHT_INTENSITY_RANGE)
 
             draw.rectangle([startPoint, endPoint], fill = (255, intensity, intensity))
 
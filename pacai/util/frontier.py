@@ -0,0 +1,117 @@
+"""
+Containers for the frontier of a search.
+
+These are drop-in replacements for `pacai.util.queue.Queue`, `pacai.util.stack.Stack`,
+and `pacai.util.priorityQueue.PriorityQueueWithFunction`
+that also keep count of the items in them,
+so checking whether an item is in the frontier (`item in frontier`) is O(1)
+instead of a scan over every item.
+
+Items (or their keys, see below) must be hashable.
+If a key function is given, then membership is checked by key instead of by item
+(e.g. `keyFunction = lambda node: node.state` to check for states in a frontier of search nodes).
+"""
+
+from pacai.util.priorityQueue import PriorityQueueWithFunction
+from pacai.util.queue import Queue
+from pacai.util.stack import Stack
+
+class FrontierQueue(Queue):
+    """
+    A `pacai.util.queue.Queue` with O(1) membership checks.
+    """
+
+    def __init__(self, keyFunction = None):
+        super().__init__()
+        self._membership = _Membership(keyFunction)
+
+    def push(self, item):
+        super().push(item)
+        self._membership.add(item)
+
+    def pop(self):
+        item = super().pop()
+        self._membership.remove(item)
+
+        return item
+
+    def __contains__(self, key):
+        return key in self._membership
+
+class FrontierStack(Stack):
+    """
+    A `pacai.util.stack.Stack` with O(1) membership checks.
+    """
+
+    def __init__(self, keyFunction = None):
+        super().__init__()
+        self._membership = _Membership(keyFunction)
+
+    def push(self, item):
+        super().push(item)
+        self._membership.add(item)
+
+    def pop(self):
+        item = super().pop()
+        self._membership.remove(item)
+
+        return item
+
+    def __contains__(self, key):
+        return key in self._membership
+
+class FrontierPriorityQueueWithFunction(PriorityQueueWithFunction):
+    """
+    A `pacai.util.priorityQueue.PriorityQueueWithFunction` with O(1) membership checks.
+    """
+
+    def __init__(self, priorityFunction, keyFunction = None):
+        super().__init__(priorityFunction)
+        self._membership = _Membership(keyFunction)
+
+    def push(self, item):
+        super().push(item)
+        self._membership.add(item)
+
+    def pop(self):
+        item = super().pop()
+        self._membership.remove(item)
+
+        return item
+
+    def __contains__(self, key):
+        return key in self._membership
+
+class _Membership(object):
+    """
+    A count of the items (or their keys) in a container.
+    Items can be in a container more than once, so only the last copy to leave removes the key.
+    """
+
+    def __init__(self, keyFunction = None):
+        self._keyFunction = keyFunction
+
+        # {key: number of items with that key}
+        self._counts = {}
+
+    def add(self, item):
+        key = self._getKey(item)
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+    def remove(self, item):
+        key = self._getKey(item)
+
+        count = self._counts[key] - 1
+        if (count == 0):
+            del self._counts[key]
+        else:
+            self._counts[key] = count
+
+    def _getKey(self, item):
+        if (self._keyFunction is None):
+            return item
+
+        return self._keyFunction(item)
+
+    def __contains__(self, key):
+        return key in self._counts
@@ -56,3 +56,133 @@ class PriorityQueueWithFunction(PriorityQueue):
 
     def __len__(self):
         return len(self.heap)
+
+class IndexedPriorityQueue(object):
+    """
+    A priority queue that knows where each of its items is,
+    so the priority of an item can be changed (in O(log n)) instead of pushing it again,
+    and membership can be checked in O(1).
+
+    Items must be hashable, and each item can only be in the queue once.
+    Items with the same priority are popped in the order they were pushed (or last updated),
+    so items are never compared to each other.
+    """
+
+    def __init__(self):
+        # A binary heap of [priority, insertion count, item] entries.
+        # Insertion counts are unique, so comparing entries never gets to the items.
+        self._heap = []
+
+        # {item: index of its entry in the heap}
+        self._indexes = {}
+
+        self._count = 0
+
+    def push(self, item, priority):
+        """
+        Add an item that is not already in the queue.
+        """
+
+        if (item in self._indexes):
+            raise ValueError('Item is already in the queue: %s.' % (str(item)))
+
+        self._heap.append([priority, self._nextCount(), item])
+        self._indexes[item] = len(self._heap) - 1
+        self._siftUp(len(self._heap) - 1)
+
+    def pop(self):
+        """
+        Remove and return the item with the lowest priority.
+        """
+
+        if (len(self._heap) == 0):
+            raise IndexError('Pop from an empty priority queue.')
+
+        item = self._heap[0][2]
+        del self._indexes[item]
+
+        lastEntry = self._heap.pop()
+        if (len(self._heap) > 0):
+            self._heap[0] = lastEntry
+            self._siftDown(0)
+
+        return item
+
+    def update(self, item, priority):
+        """
+        If the item is not in the queue, push it.
+        If the item is in the queue with a higher priority, lower its priority to the given one.
+        If the item is in the queue with an equal or lower priority, do nothing.
+
+        Returns True if the queue changed.
+        """
+
+        index = self._indexes.get(item)
+        if (index is None):
+            self.push(item, priority)
+            return True
+
+        entry = self._heap[index]
+        if (entry[0] <= priority):
+            return False
+
+        entry[0] = priority
+        entry[1] = self._nextCount()
+        self._siftUp(index)
+
+        return True
+
+    def getPriority(self, item):
+        return self._heap[self._indexes[item]][0]
+
+    def isEmpty(self):
+        return len(self._heap) == 0
+
+    def _nextCount(self):
+        self._count += 1
+        return self._count
+
+    def _siftDown(self, index):
+        heap = self._heap
+        entry = heap[index]
+        size = len(heap)
+
+        while (True):
+            child = 2 * index + 1
+            if (child >= size):
+                break
+
+            if (child + 1 < size and heap[child + 1] < heap[child]):
+                child += 1
+
+            if (entry <= heap[child]):
+                break
+
+            heap[index] = heap[child]
+            self._indexes[heap[index][2]] = index
+            index = child
+
+        heap[index] = entry
+        self._indexes[entry[2]] = index
+
+    def _siftUp(self, index):
+        heap = self._heap
+        entry = heap[index]
+
+        while (index > 0):
+            parent = (index - 1) // 2
+            if (heap[parent] <= entry):
+                break
+
+            heap[index] = heap[parent]
+            self._indexes[heap[index][2]] = index
+            index = parent
+
+        heap[index] = entry
+        self._indexes[entry[2]] = index
+
+    def __contains__(self, item):
+        return item in self._indexes
+
+    def __len__(self):
+        return len(self._heap)
@@ -2,20 +2,24 @@
 A queue container data structure.
 """
 
+import collections
+
 class Queue(object):
     """
     A container with a first-in-first-out (FIFO) queuing policy.
+    Both pushing and popping are O(1).
     """
 
     def __init__(self):
-        self.list = []
+        # Newest items on the left, like a list that is pushed to at index 0.
+        self.list = collections.deque()
 
     def push(self, item):
         """
         Enqueue the item into the queue.
         """
 
-        self.list.insert(0, item)
+        self.list.appendleft(item)
 
     def pop(self):
         """
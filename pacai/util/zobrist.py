@@ -0,0 +1,69 @@
+"""
+Zobrist hashing.
+A collection of features is hashed by XORing together a random-looking key for each feature.
+Since XOR is its own inverse, adding or removing a single feature only costs one XOR
+instead of rehashing the whole collection.
+"""
+
+import hashlib
+
+# Mixed into every key, so that different seeds give unrelated tables.
+DEFAULT_SEED = 140
+
+KEY_BITS = 64
+
+class ZobristTable(object):
+    """
+    A mapping from hashable features to random-looking keys.
+
+    Each key is derived from a digest of its feature (and the seed),
+    so the same feature always gets the same key in every process and run
+    no matter what order features are seen in.
+    This keeps hashes built from these keys valid after being pickled and loaded elsewhere.
+    Features should be built from strings, bools, and numbers (possibly nested in tuples).
+    """
+
+    def __init__(self, features = (), seed = DEFAULT_SEED):
+        self._seed = str(seed).encode()
+        self._keys = {}
+
+        for feature in features:
+            self.getKey(feature)
+
+    def getKey(self, feature):
+        key = self._keys.get(feature)
+        if (key is None):
+            digest = hashlib.blake2b(repr(_canonicalize(feature)).encode(),
+                    digest_size = KEY_BITS // 8, key = self._seed).digest()
+            key = int.from_bytes(digest, 'little')
+            self._keys[feature] = key
+
+        return key
+
+    def hashFeatures(self, features):
+        """
+        Get the combined (XORed) key for all the given features.
+        """
+
+        hashCode = 0
+        for feature in features:
+            hashCode ^= self.getKey(feature)
+
+        return hashCode
+
+def _canonicalize(feature):
+    """
+    Get a version of the feature where values that are equal (e.g. 1, 1.0, and True)
+    are all the same type, so they have the same repr.
+    """
+
+    if (isinstance(feature, tuple)):
+        return tuple([_canonicalize(value) for value in feature])
+
+    if (isinstance(feature, (bool, int))):
+        return int(feature)
+
+    if (isinstance(feature, float) and feature.is_integer()):
+        return int(feature)
+
+    return feature
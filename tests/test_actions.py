@@ -0,0 +1,30 @@
+import unittest
+
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+from pacai.core.layout import getLayout
+
+"""
+Test the precomputed move table against the direct wall probing.
+"""
+class ActionsTest(unittest.TestCase):
+    def test_move_table(self):
+        layout = getLayout('mediumClassic')
+        walls = layout.walls
+        table = layout.getMoveTable()
+
+        self.assertIs(table, layout.getMoveTable())
+
+        for position in walls.asList(False):
+            self.assertEqual(Actions.getPossibleActions(position, Directions.STOP, walls),
+                    table.getPossibleActions(position, Directions.STOP))
+            self.assertEqual(Actions.getLegalNeighbors(position, walls),
+                    table.getLegalNeighbors(position))
+
+        # Between grid points, agents must continue straight.
+        self.assertEqual([Directions.EAST], table.getPossibleActions((1.5, 1), Directions.EAST))
+        self.assertEqual(Actions.getLegalNeighbors((1.5, 1), walls),
+                table.getLegalNeighbors((1.5, 1)))
+
+if __name__ == '__main__':
+    unittest.main()
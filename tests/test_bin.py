@@ -1,8 +1,11 @@
+import os
+import tempfile
 import unittest
 
 from pacai.bin import capture
 from pacai.bin import gridworld
 from pacai.bin import pacman
+from pacai.bin import tournament
 
 """
 This is a test class to assess the executables of this project.
@@ -41,6 +44,25 @@ class BinTest(unittest.TestCase):
             if status.code != 0:
                 self.fail("Error occured when running --help.")
 
+    def test_tournament(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            resultsPath = os.path.join(tempDir, 'results.jsonl')
+
+            standings = tournament.main(['--teams', 'pacai.core.baselineTeam',
+                    'pacai.student.myTeam', '--layouts', 'testCapture', 'RANDOM94',
+                    '--max-moves', '100', '--workers', '2', '--seed', '1234',
+                    '--results', resultsPath, '--catch-exceptions'])
+
+            with open(resultsPath, 'r') as file:
+                numResults = len(file.readlines())
+
+        # Two layouts, played from both sides.
+        self.assertEqual(4, numResults)
+
+        self.assertEqual(2, len(standings))
+        for standing in standings:
+            self.assertEqual(4, standing['wins'] + standing['ties'] + standing['losses'])
+
     def test_gridworld(self):
         # Run game of gridworld with default agents.
         gridworld.main(['--null-graphics'])
@@ -60,6 +82,19 @@ class BinTest(unittest.TestCase):
         # Run game of pacman with seed value entry.
         pacman.main(['-p', 'GreedyAgent', '--null-graphics', '--seed', '1234'])
 
+    def test_pacman_workers(self):
+        args = ['-p', 'GreedyAgent', '--null-graphics', '--layout', 'smallClassic',
+                '--num-games', '4', '--seed', '1234']
+
+        # Games are seeded individually, so the number of workers does not change the results.
+        serialGames = pacman.main(args + ['--workers', '1'])
+        parallelGames = pacman.main(args + ['--workers', '2'])
+
+        self.assertEqual([game.moveHistory for game in serialGames],
+                [game.moveHistory for game in parallelGames])
+        self.assertEqual([game.state.getScore() for game in serialGames],
+                [game.state.getScore() for game in parallelGames])
+
     def test_capture_seeded_maze_generations(self):
         # Run game of capture with random generated map without seed value.
         capture.main(['--null-graphics', '--layout', 'RANDOM']) 
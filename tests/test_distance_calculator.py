@@ -0,0 +1,182 @@
+import logging
+import os
+import tempfile
+import unittest
+
+from pacai.core import distanceCalculator
+from pacai.core.distance import manhattan
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+
+"""
+Test maze distances.
+"""
+class DistanceCalculatorTest(unittest.TestCase):
+    def test_maze_distances(self):
+        layout = Layout([
+            '%%%%%%',
+            '%.%..%',
+            '%.%%.%',
+            '%....%',
+            '%%%%%%',
+        ])
+
+        distancer = distanceCalculator.Distancer(layout)
+        distancer.getMazeDistances()
+        self.assertTrue(distancer.isReadyForMazeDistance())
+
+        # Around the wall.
+        self.assertEqual(8, distancer.getDistance((1, 3), (3, 3)))
+        self.assertEqual(8, distancer.getDistance((3, 3), (1, 3)))
+        self.assertEqual(0, distancer.getDistance((4, 1), (4, 1)))
+
+        # Positions between cells snap to the closest route.
+        self.assertEqual(7.5, distancer.getDistance((1, 2.5), (3, 3)))
+        self.assertEqual(3.0, distancer.getDistance((1.0, 1.0), (4.0, 1.0)))
+
+        with self.assertRaises(Exception):
+            distancer.getDistance((2, 3), (1, 1))
+
+    def test_symmetric(self):
+        # Maze distances are symmetric and never shorter than manhattan distances.
+        layout = getLayout('testCapture')
+
+        distancer = distanceCalculator.Distancer(layout)
+        distancer.getMazeDistances()
+
+        cells = layout.walls.asList(False)
+        for cell in cells:
+            for other in cells:
+                self.assertGreaterEqual(distancer.getDistance(cell, other), manhattan(cell, other))
+                self.assertEqual(distancer.getDistance(cell, other),
+                        distancer.getDistance(other, cell))
+
+    def test_lazy(self):
+        layout = getLayout('defaultCapture')
+        cells = layout.walls.asList(False)
+
+        eager = distanceCalculator.Distancer(layout, lazy = False)
+        eager.getMazeDistances()
+
+        lazy = distanceCalculator.Distancer(layout, lazy = True, maxRows = 3)
+        lazy.getMazeDistances()
+
+        for cell in cells[::7]:
+            for other in cells:
+                self.assertEqual(eager.getDistance(cell, other), lazy.getDistance(cell, other))
+
+        self.assertEqual(3, lazy._distances.getNumRows())
+
+        with self.assertRaises(Exception):
+            lazy.getDistance((0, 0), cells[0])
+
+    def test_lazy_large_layout(self):
+        width = 100
+        height = 50
+
+        rows = ['%' * width] + ['%' + ('.' * (width - 2)) + '%'] * (height - 2) + ['%' * width]
+        layout = Layout(rows)
+
+        distancer = distanceCalculator.Distancer(layout)
+        distancer.getMazeDistances()
+
+        self.assertIsInstance(distancer._distances, distanceCalculator.LazyDistanceTable)
+        self.assertEqual(width + height - 6, distancer.getDistance((1, 1), (width - 2, height - 2)))
+
+    def test_batch_queries(self):
+        layout = getLayout('defaultCapture')
+        cells = layout.walls.asList(False)
+        targets = cells[::5] + [(cells[3][0], cells[3][1] + 0.5)]
+
+        for lazy in [False, True]:
+            distancer = distanceCalculator.Distancer(layout, lazy = lazy)
+            distancer.getMazeDistances()
+
+            for pos in [cells[0], cells[40], (cells[40][0] + 0.5, cells[40][1])]:
+                expected = [distancer.getDistance(pos, target) for target in targets]
+                self.assertEqual(expected, distancer.getDistancesFrom(pos, targets))
+
+                nearest, distance = distancer.getNearest(pos, targets)
+                self.assertEqual(min(expected), distance)
+                self.assertEqual(expected.index(distance), targets.index(nearest))
+
+            self.assertIsNone(distancer.getNearest(cells[0], []))
+
+            with self.assertRaises(Exception):
+                distancer.getDistancesFrom(cells[0], [(0, 0)])
+
+    def test_cache(self):
+        layout = getLayout('defaultCapture')
+        cells = layout.walls.asList(False)
+
+        oldCacheDir = distanceCalculator.CACHE_DIR
+        oldMaxCacheFiles = distanceCalculator.MAX_CACHE_FILES
+        oldDistanceMap = distanceCalculator.distanceMap
+
+        try:
+            with tempfile.TemporaryDirectory() as baseDir:
+                # The cache directory does not exist until the first table is saved,
+                # which is not worth a warning.
+                tempDir = os.path.join(baseDir, 'distances')
+                distanceCalculator.CACHE_DIR = tempDir
+                distanceCalculator.distanceMap = {}
+
+                warnings = []
+                handler = logging.Handler(logging.WARNING)
+                handler.emit = warnings.append
+                logging.getLogger().addHandler(handler)
+
+                try:
+                    computed = distanceCalculator.getDistanceTable(layout)
+                finally:
+                    logging.getLogger().removeHandler(handler)
+
+                self.assertEqual([], warnings)
+                self.assertEqual(1, len(os.listdir(tempDir)))
+
+                # Layouts with the same walls share a table.
+                sameWalls = getLayout('defaultCapture')
+                self.assertIs(computed, distanceCalculator.getDistanceTable(sameWalls))
+
+                # A new process would load the table from disk.
+                distanceCalculator.distanceMap = {}
+                loaded = distanceCalculator.getDistanceTable(layout)
+                self.assertIsNot(computed, loaded)
+
+                for other in cells:
+                    self.assertEqual(computed.getDistance(cells[0], other),
+                            loaded.getDistance(cells[0], other))
+
+                # Release the mapped file before it is changed.
+                distanceCalculator.distanceMap = {}
+                del loaded
+
+                # Tables that don't match their checksum are recomputed.
+                path = os.path.join(tempDir, os.listdir(tempDir)[0])
+                with open(path, 'r+b') as file:
+                    file.seek(-2, os.SEEK_END)
+                    file.write(b'\x00\x00')
+
+                digest = distanceCalculator.getWallsDigest(layout.walls)
+                self.assertIsNone(distanceCalculator._loadDistanceTable(digest,
+                        layout.getWidth(), layout.getHeight()))
+
+                recomputed = distanceCalculator.getDistanceTable(layout)
+                self.assertEqual(computed.getDistance(cells[0], cells[-1]),
+                        recomputed.getDistance(cells[0], cells[-1]))
+                del recomputed
+
+                # Only the most recent tables are kept.
+                distanceCalculator.MAX_CACHE_FILES = 1
+                distanceCalculator.distanceMap = {}
+                distanceCalculator.getDistanceTable(getLayout('mediumClassic'))
+                self.assertEqual(1, len(os.listdir(tempDir)))
+
+                distanceCalculator.distanceMap = {}
+        finally:
+            distanceCalculator.CACHE_DIR = oldCacheDir
+            distanceCalculator.MAX_CACHE_FILES = oldMaxCacheFiles
+            distanceCalculator.distanceMap = oldDistanceMap
+
+if __name__ == '__main__':
+    unittest.main()
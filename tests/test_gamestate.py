@@ -0,0 +1,243 @@
+import pickle
+import random
+import subprocess
+import sys
+import unittest
+
+from pacai.agents.capture.reflex import ReflexCaptureAgent
+from pacai.bin.capture import CaptureGameState
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.agentstate import AgentState
+from pacai.core.directions import Directions
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+
+"""
+Test the bookkeeping that game states do as the game advances.
+"""
+class GameStateTest(unittest.TestCase):
+    def test_incremental_hash(self):
+        rng = random.Random(4)
+        layout = getLayout('smallClassic')
+        table = layout.getZobristTable()
+
+        state = PacmanGameState(layout)
+        other = PacmanGameState(layout)
+        self.assertEqual(state, other)
+        self.assertEqual(hash(state), hash(other))
+
+        for i in range(200):
+            if (state.isOver()):
+                break
+
+            agentIndex = i % state.getNumAgents()
+            action = rng.choice(state.getLegalActions(agentIndex))
+
+            state = state.generateSuccessor(agentIndex, action)
+            other = other.generateSuccessor(agentIndex, action)
+
+            self.assertEqual(state, other)
+            self.assertEqual(hash(state), hash(other))
+
+            # The incremental hashes must match hashes built from scratch.
+            features = [('food', position) for position in state.getFood().asList()]
+            features += [('capsule', position) for position in state.getCapsules()]
+            self.assertEqual(table.hashFeatures(features), state._itemsHash)
+
+            for agentState in state.getAgentStates():
+                fresh = AgentState(agentState.getPosition(), agentState.getDirection(),
+                        agentState.isPacman())
+                fresh.setScaredTimer(agentState.getScaredTimer())
+                self.assertEqual(hash(fresh), hash(agentState))
+
+    def test_pickled_hash(self):
+        state = PacmanGameState(getLayout('smallClassic'))
+        for action in state.getLegalActions(0):
+            state = state.generateSuccessor(0, action)
+        hash(state)
+
+        # Loading in a new process must give the same agent hashes as building the states fresh.
+        script = ('import pickle, sys; '
+                + 'from pacai.core.agentstate import AgentState; '
+                + 'states = pickle.loads(sys.stdin.buffer.read()); '
+                + 'fresh = [AgentState(s.getPosition(), s.getDirection(), s.isPacman()) '
+                + 'for s in states]; '
+                + 'print(all([a == b and hash(a) == hash(b) for (a, b) in zip(states, fresh)]))')
+
+        output = subprocess.run([sys.executable, '-c', script], check = True,
+                input = pickle.dumps(state.getAgentStates()), stdout = subprocess.PIPE)
+        self.assertEqual('True', output.stdout.decode().strip())
+
+        # The food and capsule hash matches the loaded layout, and the state hash is rebuilt.
+        loaded = pickle.loads(pickle.dumps(state))
+        self.assertEqual(state._itemsHash, loaded._itemsHash)
+        self.assertIsNone(loaded._hash)
+
+        table = loaded.getInitialLayout().getZobristTable()
+        features = [('food', position) for position in loaded.getFood().asList()]
+        features += [('capsule', position) for position in loaded.getCapsules()]
+        self.assertEqual(table.hashFeatures(features), loaded._itemsHash)
+
+    def test_generate_successors(self):
+        state = PacmanGameState(getLayout('smallClassic'))
+
+        for agentIndex in range(state.getNumAgents()):
+            successors = state.generateSuccessors(agentIndex)
+            self.assertEqual(state.getLegalActions(agentIndex), [pair[0] for pair in successors])
+
+            for action, successor in successors:
+                self.assertEqual(state.generateSuccessor(agentIndex, action), successor)
+
+    def test_sibling_successors(self):
+        state = PacmanGameState(getLayout('smallClassic'))
+        numFood = state.getNumFood()
+
+        # Siblings share their setup, but changes to one never show up in the others.
+        successors = [successor for (action, successor) in state.generateSuccessors(0)]
+        self.assertGreater(len(successors), 1)
+
+        positions = [successor.getPacmanPosition() for successor in successors]
+        self.assertEqual(len(positions), len(set(positions)))
+
+        foodCounts = [successor.getNumFood() for successor in successors]
+
+        # Eat some food (that is still there) in just the first successor.
+        x, y = successors[0].getFood().asList()[0]
+        self.assertTrue(successors[0].eatFood(x, y))
+        successors[0].getMutableAgentState(1).setScaredTimer(5)
+
+        self.assertEqual(foodCounts[0] - 1, successors[0].getNumFood())
+        for (successor, foodCount) in zip(successors[1:], foodCounts[1:]):
+            self.assertEqual(foodCount, successor.getNumFood())
+            self.assertTrue(successor.hasFood(x, y))
+            self.assertEqual(0, successor.getAgentState(1).getScaredTimer())
+
+        self.assertEqual(numFood, state.getNumFood())
+        self.assertEqual(0, state.getAgentState(1).getScaredTimer())
+
+    def test_shared_agent_states(self):
+        state = PacmanGameState(getLayout('smallClassic'))
+        position = state.getPacmanPosition()
+
+        action = state.getLegalActions(0)[0]
+        successor = state.generateSuccessor(0, action)
+
+        # Only the agent that moved gets a new agent state.
+        self.assertIsNot(state.getAgentState(0), successor.getAgentState(0))
+        for ghostIndex in state.getGhostIndexes():
+            self.assertIs(state.getAgentState(ghostIndex), successor.getAgentState(ghostIndex))
+
+        self.assertEqual(position, state.getPacmanPosition())
+        self.assertNotEqual(position, successor.getPacmanPosition())
+
+    def test_unvalidated_successor(self):
+        state = PacmanGameState(getLayout('smallClassic'))
+
+        for action in state.getLegalActions(0):
+            self.assertEqual(state.generateSuccessor(0, action),
+                    state.generateSuccessor(0, action, validate = False))
+
+        illegal = set(Directions.CARDINAL) - set(state.getLegalActions(0))
+        for action in illegal:
+            with self.assertRaises(ValueError):
+                state.generateSuccessor(0, action)
+
+    def test_reflex_successor(self):
+        state = CaptureGameState(getLayout('tinyCapture'), 1000)
+        agent = ReflexCaptureAgent(0)
+
+        for action in state.getLegalActions(0):
+            self.assertEqual(agent.getSuccessor(state, action),
+                    agent.getSuccessor(state, action, validate = False))
+
+        # Actions are checked unless the caller opts out.
+        illegal = set(Directions.CARDINAL) - set(state.getLegalActions(0))
+        self.assertGreater(len(illegal), 0)
+        for action in illegal:
+            with self.assertRaises(ValueError):
+                agent.getSuccessor(state, action)
+
+    def test_apply_undo_pacman(self):
+        layout = getLayout('smallClassic')
+        self._checkApplyUndo(lambda: PacmanGameState(layout))
+
+    def test_apply_undo_capture(self):
+        layout = getLayout('tinyCapture')
+        self._checkApplyUndo(lambda: CaptureGameState(layout, 1000))
+
+    def test_apply_undo_capsule(self):
+        layout = Layout(['%%%%%%', '%oPo.%', '%%%%%%'])
+        state = PacmanGameState(layout)
+        initialHash = hash(state)
+
+        record = state.applyMove(0, Directions.EAST)
+        self.assertEqual([(1, 1)], state.getCapsules())
+
+        state.undoMove(record)
+        self.assertEqual([(1, 1), (3, 1)], state.getCapsules())
+        self.assertEqual(initialHash, hash(state))
+        self.assertEqual(PacmanGameState(layout), state)
+
+    def test_apply_undo_in_place(self):
+        state = PacmanGameState(getLayout('smallClassic'))
+        action = state.getLegalActions(0)[0]
+
+        # After the first move, the same agent state is modified (and restored) in place.
+        state.undoMove(state.applyMove(0, action))
+        agentState = state.getAgentState(0)
+        position = agentState.getPosition()
+
+        record = state.applyMove(0, action)
+        self.assertIs(agentState, state.getAgentState(0))
+        self.assertIsNone(record.eatenCapsules)
+
+        # A successor made in the middle of a move keeps the moved agent.
+        successor = state.generateSuccessor(1, state.getLegalActions(1)[0])
+        movedPosition = successor.getPacmanPosition()
+
+        state.undoMove(record)
+        self.assertEqual(position, state.getPacmanPosition())
+        self.assertEqual(movedPosition, successor.getPacmanPosition())
+
+    def _checkApplyUndo(self, stateFactory):
+        rng = random.Random(0)
+
+        # Walk the same random path with both successors and in-place moves.
+        state = stateFactory()
+        inPlace = stateFactory()
+        numAgents = state.getNumAgents()
+
+        path = [state]
+        records = []
+
+        for i in range(600):
+            if (state.isOver()):
+                break
+
+            agentIndex = i % numAgents
+            action = rng.choice(state.getLegalActions(agentIndex))
+
+            state = state.generateSuccessor(agentIndex, action)
+            records.append(inPlace.applyMove(agentIndex, action))
+            path.append(state)
+
+            self.assertEqual(state, inPlace)
+            self.assertEqual(hash(state), hash(inPlace))
+            self.assertEqual(state.getNumFood(), inPlace.getNumFood())
+            self.assertEqual(state.getCapsules(), inPlace.getCapsules())
+
+        self.assertLess(inPlace.getNumFood(), path[0].getNumFood())
+
+        # The states along the path must not have been disturbed.
+        for record in reversed(records):
+            path.pop()
+            inPlace.undoMove(record)
+
+            self.assertEqual(path[-1], inPlace)
+            self.assertEqual(hash(path[-1]), hash(inPlace))
+            self.assertEqual(path[-1].getNumFood(), inPlace.getNumFood())
+            self.assertEqual(path[-1].getCapsules(), inPlace.getCapsules())
+            self.assertEqual(path[-1].getLastFoodEaten(), inPlace.getLastFoodEaten())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import pickle
+import unittest
+
+from pacai.core.grid import Grid
+from pacai.core.layout import getLayout
+
+"""
+Test the bitset-backed grid.
+"""
+class GridTest(unittest.TestCase):
+    def test_access(self):
+        grid = Grid(3, 4)
+        self.assertFalse(grid[1][2])
+
+        grid[1][2] = True
+        self.assertTrue(grid[1][2])
+        self.assertTrue(grid.get(1, 2))
+        self.assertFalse(grid[2][1])
+
+        grid.set(1, 2, False)
+        self.assertFalse(grid[1][2])
+
+        # Negative indexes wrap around like lists.
+        grid.set(2, 3, True)
+        self.assertTrue(grid[-1][-1])
+
+        with self.assertRaises(IndexError):
+            grid[3][0]
+
+        with self.assertRaises(IndexError):
+            grid[0][4]
+
+    def test_cached_columns(self):
+        grid = Grid(3, 4)
+        column = grid[1]
+        self.assertIs(column, grid[1])
+        self.assertEqual([False] * 4, column)
+
+        # Columns already read see every way of writing to the grid.
+        grid.set(1, 0, True)
+        grid[1][3] = True
+        self.assertEqual([True, False, False, True], grid[1])
+
+        shallow = grid.shallowCopy()
+        shallow[1][1] = True
+        self.assertTrue(grid[1][1])
+
+        deep = grid.copy()
+        deep[1][2] = True
+        self.assertFalse(grid[1][2])
+        self.assertEqual([True, True, True, True], deep[1])
+
+        loaded = pickle.loads(pickle.dumps(grid))
+        self.assertEqual(grid, loaded)
+        self.assertEqual(list(grid[1]), list(loaded[1]))
+
+    def test_count_and_list(self):
+        grid = Grid(3, 4, initialValue = True)
+        self.assertEqual(12, grid.count())
+        self.assertEqual(0, grid.count(False))
+
+        grid[0][1] = False
+        grid[2][3] = False
+        self.assertEqual(10, grid.count())
+        self.assertEqual(2, grid.count(False))
+
+        self.assertEqual([(0, 1), (2, 3)], grid.asList(False))
+        self.assertEqual(10, len(grid.asList()))
+        self.assertEqual((0, 0), grid.asList()[0])
+        self.assertEqual((2, 2), grid.asList()[-1])
+
+    def test_copy(self):
+        grid = Grid(5, 5)
+        grid[2][2] = True
+
+        other = grid.copy()
+        self.assertEqual(grid, other)
+        self.assertEqual(hash(grid), hash(other))
+
+        other[3][3] = True
+        self.assertNotEqual(grid, other)
+        self.assertFalse(grid[3][3])
+
+    def test_hash(self):
+        # The hash matches the one computed by the original list-of-lists grid.
+        layout = getLayout('mediumClassic')
+        food = layout.food
+
+        hashcode = 0
+        base = 1
+        for x in range(food.getWidth()):
+            for y in range(food.getHeight()):
+                if (food[x][y]):
+                    hashcode += base
+                base *= 2
+
+        self.assertEqual(hash(hashcode), hash(food))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.distanceCalculator import Distancer
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+from pacai.core.search import heuristic
+from pacai.core.search.landmark import LandmarkTable
+from pacai.core.search.landmark import getLandmarkTable
+from pacai.core.search.position import PositionSearchProblem
+
+"""
+Test the landmark (ALT) lower bounds.
+"""
+class LandmarkTest(unittest.TestCase):
+    def test_lower_bound(self):
+        layout = getLayout('mediumMaze')
+        table = LandmarkTable(layout.walls, 4)
+        self.assertEqual(4, table.getNumLandmarks())
+
+        distancer = Distancer(layout)
+        distancer.getMazeDistances()
+
+        cells = layout.walls.asList(False)
+        for cell1 in cells[::7]:
+            for cell2 in cells[::11]:
+                bound = table.getLowerBound(cell1, cell2)
+                self.assertLessEqual(bound, distancer.getDistance(cell1, cell2))
+
+        # The bound is exact from a landmark.
+        landmark = table.getLandmarks()[0]
+        for cell in cells[::5]:
+            self.assertEqual(distancer.getDistance(landmark, cell),
+                    table.getLowerBound(landmark, cell))
+
+        self.assertEqual(0, table.getLowerBound((0, 0), cells[0]))
+
+    def test_few_cells(self):
+        layout = Layout([
+            '%%%%',
+            '%..%',
+            '%%%%',
+        ])
+
+        table = LandmarkTable(layout.walls, 8)
+        self.assertEqual(2, table.getNumLandmarks())
+        self.assertEqual(1, table.getLowerBound((1, 1), (2, 1)))
+
+    def test_cache(self):
+        walls = getLayout('mediumMaze').walls
+        otherWalls = getLayout('mediumMaze').walls
+
+        self.assertIs(getLandmarkTable(walls), getLandmarkTable(otherWalls))
+        self.assertIsNot(getLandmarkTable(walls), getLandmarkTable(walls, 2))
+
+    def test_heuristic(self):
+        state = PacmanGameState(getLayout('bigMaze'))
+        problem = PositionSearchProblem(state)
+
+        start = problem.startingState()
+        bound = heuristic.landmark(start, problem)
+
+        self.assertGreaterEqual(bound, heuristic.manhattan(start, problem))
+        self.assertEqual(0, heuristic.landmark(problem.goal, problem))
+
+if __name__ == '__main__':
+    unittest.main()
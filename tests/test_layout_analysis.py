@@ -0,0 +1,91 @@
+import unittest
+
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+
+"""
+Test the static analysis of layouts.
+"""
+class LayoutAnalysisTest(unittest.TestCase):
+    def test_small_layout(self):
+        # A loop on the left with a dead end sticking out of it to the right.
+        layout = Layout([
+            '%%%%%%%',
+            '%...%%%',
+            '%.%.%%%',
+            '%.....%',
+            '%%%%%%%',
+        ])
+
+        analysis = layout.getLayoutAnalysis()
+        self.assertIs(analysis, layout.getLayoutAnalysis())
+
+        self.assertEqual(0, analysis.getDeadEndDepth((1, 1)))
+        self.assertEqual(0, analysis.getDeadEndDepth((3, 1)))
+        self.assertEqual(1, analysis.getDeadEndDepth((4, 1)))
+        self.assertEqual(2, analysis.getDeadEndDepth((5, 1)))
+        self.assertTrue(analysis.isDeadEnd((5, 1)))
+        self.assertFalse(analysis.isDeadEnd((2, 3)))
+
+        self.assertEqual({(3, 1), (4, 1)}, analysis.getArticulationPoints())
+
+        self.assertEqual([(2, 1), (2, 3)], analysis.getBorderEntries(True))
+        self.assertEqual([(3, 1), (3, 3)], analysis.getBorderEntries(False))
+
+        self.assertEqual(set(), analysis.getBorderChokepoints(True))
+        self.assertEqual({(3, 1), (4, 1)}, analysis.getBorderChokepoints(False))
+
+    def test_articulation_points(self):
+        # Compare against removing each cell and counting the pieces left.
+        layout = getLayout('defaultCapture')
+        analysis = layout.getLayoutAnalysis()
+
+        cells = set(layout.walls.asList(False))
+        numComponents = self._countComponents(cells)
+
+        for cell in cells:
+            isArticulationPoint = (self._countComponents(cells - {cell}) > numComponents)
+            self.assertEqual(isArticulationPoint, analysis.isArticulationPoint(cell))
+
+    def test_dead_ends(self):
+        layout = getLayout('mediumClassic')
+        analysis = layout.getLayoutAnalysis()
+
+        # The depth into a dead end goes up by one with each step further in.
+        for cell in layout.walls.asList(False):
+            depth = analysis.getDeadEndDepth(cell)
+            if (depth == 0):
+                continue
+
+            neighborDepths = [analysis.getDeadEndDepth(neighbor)
+                    for neighbor in self._getNeighbors(cell, set(layout.walls.asList(False)))]
+            self.assertIn(depth - 1, neighborDepths)
+
+    def _countComponents(self, cells):
+        reached = set()
+        numComponents = 0
+
+        for cell in cells:
+            if (cell in reached):
+                continue
+
+            numComponents += 1
+            stack = [cell]
+            reached.add(cell)
+
+            while (len(stack) > 0):
+                current = stack.pop()
+                for neighbor in self._getNeighbors(current, cells):
+                    if (neighbor not in reached):
+                        reached.add(neighbor)
+                        stack.append(neighbor)
+
+        return numComponents
+
+    def _getNeighbors(self, cell, cells):
+        x, y = cell
+        return [neighbor for neighbor in [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]
+                if neighbor in cells]
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.actions import Actions
+from pacai.core.distanceCalculator import Distancer
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+from pacai.core.mazegraph import MazeGraph
+from pacai.core.search.corridor import CorridorSearchProblem
+from pacai.core.search.position import PositionSearchProblem
+
+"""
+Test the corridor-contracted maze graph.
+"""
+class MazeGraphTest(unittest.TestCase):
+    def test_edges(self):
+        for layoutName in ['mediumMaze', 'smallClassic', 'mediumClassic']:
+            walls = getLayout(layoutName).walls
+            graph = MazeGraph(walls)
+
+            self.assertLess(graph.getNumNodes(), len(walls.asList(False)))
+
+            for node in graph.getNodes():
+                for (otherNode, actions, cost) in graph.getEdges(node):
+                    self.assertEqual(len(actions), cost)
+
+                    cells = graph.getEdgeCells(node, actions)
+                    self.assertEqual(otherNode, cells[-1])
+                    for (x, y) in cells:
+                        self.assertFalse(walls.get(x, y))
+
+                    # Only the ends of a corridor are nodes.
+                    for cell in cells[:-1]:
+                        self.assertFalse(graph.isNode(cell))
+
+                    # Every corridor can be taken the other way.
+                    reverse = graph.getEdge(otherNode, Actions.reverseDirection(actions[-1]))
+                    self.assertEqual(node, reverse[0])
+                    self.assertEqual(cost, reverse[2])
+
+    def test_contracted(self):
+        for layoutName in ['mediumMaze', 'bigMaze', 'mediumClassic']:
+            state = PacmanGameState(getLayout(layoutName))
+            walls = state.getWalls()
+
+            extraNodes = [state.getPacmanPosition()]
+            graph = MazeGraph(walls, extraNodes)
+
+            # Only junctions, dead ends, and the extra nodes are nodes.
+            for node in graph.getNodes():
+                if (node in extraNodes):
+                    continue
+
+                x, y = node
+                numOpen = len([1 for (dx, dy) in [(0, 1), (0, -1), (1, 0), (-1, 0)]
+                        if not walls.get(x + dx, y + dy)])
+                self.assertNotEqual(2, numOpen)
+
+    def test_node_distances(self):
+        layout = getLayout('mediumClassic')
+        graph = MazeGraph(layout.walls)
+
+        distancer = Distancer(layout)
+        distancer.getMazeDistances()
+
+        for node in graph.getNodes()[::5]:
+            distances = graph.getNodeDistances(node)
+            self.assertEqual(graph.getNumNodes(), len(distances))
+
+            for (otherNode, distance) in distances.items():
+                self.assertEqual(distancer.getDistance(node, otherNode), distance)
+
+    def test_corridor_ends(self):
+        walls = getLayout('mediumMaze').walls
+        graph = MazeGraph(walls)
+
+        for cell in walls.asList(False):
+            for (node, actions, cost) in graph.getCorridorEnds(cell):
+                self.assertEqual(len(actions), cost)
+                self.assertTrue(graph.isNode(node))
+
+                if (cost == 0):
+                    self.assertEqual(cell, node)
+                else:
+                    self.assertEqual(node, graph.getEdgeCells(cell, actions)[-1])
+
+    def test_loop(self):
+        # A ring of corridor cells with no junctions.
+        layout = Layout([
+            '%%%%%',
+            '%...%',
+            '%.%.%',
+            '%...%',
+            '%%%%%',
+        ])
+
+        graph = MazeGraph(layout.walls)
+        self.assertEqual(1, graph.getNumNodes())
+
+        node = graph.getNodes()[0]
+        for (otherNode, actions, cost) in graph.getEdges(node):
+            self.assertEqual(node, otherNode)
+            self.assertEqual(8, cost)
+
+    def test_search_problem(self):
+        state = PacmanGameState(getLayout('mediumMaze'))
+        problem = CorridorSearchProblem(state)
+        positionProblem = PositionSearchProblem(state)
+
+        start = problem.startingState()
+        self.assertTrue(problem.graph.isNode(start))
+        self.assertTrue(problem.graph.isNode(problem.goal))
+
+        # Walk corridors (never straight back) and check the expanded moves.
+        path = []
+        previous = None
+        node = start
+
+        for i in range(5):
+            successors = [successor for successor in problem.successorStates(node)
+                    if successor[0] != previous]
+            if (len(successors) == 0):
+                break
+
+            previous = node
+            node, corridor, cost = successors[0]
+            path.append(corridor)
+
+        moves = problem.expandActions(path)
+        self.assertEqual(len(moves), problem.actionsCost(path))
+        self.assertEqual(len(moves), positionProblem.actionsCost(moves))
+
+        self.assertEqual(999999, problem.actionsCost([path[0][1:]] + path[1:]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import random
+import unittest
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.actions import Actions
+from pacai.core.distanceCalculator import Distancer
+from pacai.core.featureExtractors import SimpleExtractor
+from pacai.core.layout import getLayout
+from pacai.core.search import reference
+from pacai.core.search.nearest import TargetDistanceField
+from pacai.core.search.nearest import findNearest
+from pacai.student.searchAgents import AnyFoodSearchProblem
+
+"""
+Test the closest target searches.
+"""
+class NearestTest(unittest.TestCase):
+    def setUp(self):
+        self.layout = getLayout('mediumClassic')
+        self.walls = self.layout.walls
+        self.cells = self.walls.asList(False)
+
+        self.distancer = Distancer(self.layout)
+        self.distancer.getMazeDistances()
+
+    def test_find_nearest(self):
+        targets = self.layout.food.asList()[::9]
+
+        for cell in self.cells[::7]:
+            target, actions = findNearest(self.walls, cell, targets)
+
+            self.assertIn(target, targets)
+            self.assertEqual(self._getClosestDistance(cell, targets), len(actions))
+            self.assertEqual(target, self._follow(cell, actions))
+
+        self.assertIsNone(findNearest(self.walls, self.cells[0], []))
+
+    def test_distance_field(self):
+        targets = self.layout.food.asList()
+        field = TargetDistanceField(self.walls, targets)
+        self._checkField(field, targets)
+
+        # Eat some food, then put some of it back.
+        rng = random.Random(4)
+        removed = rng.sample(targets, 40)
+        for position in removed:
+            field.removeTarget(position)
+            targets.remove(position)
+
+        self._checkField(field, targets)
+
+        for position in removed[:10]:
+            field.addTarget(position)
+            targets.append(position)
+
+        self._checkField(field, targets)
+        self.assertEqual(sorted(targets), field.getTargets())
+
+        for position in list(targets):
+            field.removeTarget(position)
+
+        self.assertIsNone(field.getDistance(self.cells[0]))
+        self.assertIsNone(field.getNearest(self.cells[0]))
+        self.assertRaises(ValueError, field.removeTarget, self.cells[0])
+
+    def test_simple_extractor(self):
+        state = PacmanGameState(self.layout)
+
+        for i in range(10):
+            for action in state.getLegalActions():
+                features = SimpleExtractor.getFeatures(None, state, action)
+
+                x, y = Actions.getSuccessor(state.getPacmanPosition(), action)
+                problem = AnyFoodSearchProblem(state, start = (int(x), int(y)))
+                distance = len(reference.bfs(problem))
+
+                expected = distance / (self.walls.getWidth() * self.walls.getHeight()) / 10.0
+                self.assertAlmostEqual(expected, features['closest-food'])
+
+            state = state.generateSuccessor(0, state.getLegalActions()[0])
+
+    def _checkField(self, field, targets):
+        for cell in self.cells[::3]:
+            distance = self._getClosestDistance(cell, targets)
+            self.assertEqual(distance, field.getDistance(cell))
+
+            target, actions = field.getNearest(cell)
+            self.assertIn(target, targets)
+            self.assertEqual(distance, len(actions))
+            self.assertEqual(target, self._follow(cell, actions))
+
+    def _follow(self, position, actions):
+        for action in actions:
+            x, y = Actions.getSuccessor(position, action)
+            position = (int(x), int(y))
+
+            self.assertFalse(self.walls.get(*position))
+
+        return position
+
+    def _getClosestDistance(self, position, targets):
+        return min(self.distancer.getDistancesFrom(position, targets))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+import json
+import os
+import tempfile
+import unittest
+
+from pacai.agents.search.base import SearchAgent
+
+from pacai.bin.eightpuzzle import EightPuzzleSearchProblem
+from pacai.bin.eightpuzzle import loadEightPuzzle
+from pacai.bin.pacman import PacmanGameState
+from pacai.core import distance
+from pacai.core.directions import Directions
+from pacai.core.distanceCalculator import Distancer
+from pacai.core.layout import getLayout
+from pacai.core.search import heuristic
+from pacai.core.search import reference
+from pacai.core.search.corridor import CorridorSearchProblem
+from pacai.core.search.food import CompactFoodSearchProblem
+from pacai.core.search.food import FoodSearchProblem
+from pacai.core.search.stats import SearchStats
+from pacai.core.search.position import PositionSearchProblem
+
+"""
+Test the reference search implementations.
+"""
+class ReferenceSearchTest(unittest.TestCase):
+    def test_optimal_searches(self):
+        for layoutName in ['tinyMaze', 'mediumMaze', 'bigMaze']:
+            layout = getLayout(layoutName)
+            state = PacmanGameState(layout)
+
+            distancer = Distancer(layout)
+            distancer.getMazeDistances()
+
+            start = state.getPacmanPosition()
+            expected = distancer.getDistance(start, (1, 1))
+
+            searches = [
+                reference.bfs,
+                reference.ucs,
+                lambda problem: reference.astar(problem, heuristic.manhattan),
+                lambda problem: reference.astar(problem, heuristic.landmark, tieBreak = False),
+            ]
+
+            for search in searches:
+                problem = PositionSearchProblem(state)
+                self.assertEqual(expected, problem.actionsCost(search(problem)))
+
+    def test_other_searches(self):
+        state = PacmanGameState(getLayout('mediumMaze'))
+
+        searches = [
+            reference.dfs,
+            lambda problem: reference.greedy(problem, heuristic.manhattan),
+        ]
+
+        for search in searches:
+            problem = PositionSearchProblem(state)
+            path = search(problem)
+
+            self.assertIsNotNone(path)
+            self.assertLess(problem.actionsCost(path), 999999)
+
+    def test_tie_break(self):
+        state = PacmanGameState(getLayout('mediumMaze'))
+
+        problem = PositionSearchProblem(state)
+        reference.astar(problem, heuristic.manhattan, tieBreak = False)
+
+        tieBreakProblem = PositionSearchProblem(state)
+        reference.astar(tieBreakProblem, heuristic.manhattan)
+
+        self.assertLessEqual(tieBreakProblem.getExpandedCount(), problem.getExpandedCount())
+
+    def test_no_path(self):
+        state = PacmanGameState(getLayout('mediumMaze'))
+
+        # The goal is a wall.
+        for search in [reference.bfs, reference.dfs, reference.ucs]:
+            self.assertIsNone(search(PositionSearchProblem(state, goal = (0, 0))))
+
+        start = state.getPacmanPosition()
+        self.assertEqual([], reference.bfs(PositionSearchProblem(state, goal = start)))
+
+        with self.assertRaises(ValueError):
+            distance.maze(start, (0, 0), state)
+
+    def test_eight_puzzle(self):
+        puzzle = loadEightPuzzle(0)
+
+        bfsPath = reference.bfs(EightPuzzleSearchProblem(puzzle))
+        ucsPath = reference.ucs(EightPuzzleSearchProblem(puzzle))
+
+        self.assertEqual(len(bfsPath), len(ucsPath))
+
+        for action in bfsPath:
+            puzzle = puzzle.result(action)
+        self.assertTrue(puzzle.isGoal())
+
+    def test_compact_food(self):
+        state = PacmanGameState(getLayout('tinySearch'))
+
+        problem = FoodSearchProblem(state)
+        compactProblem = CompactFoodSearchProblem(state)
+
+        start = compactProblem.startingState()
+        self.assertEqual(problem.startingState(), compactProblem.toGridState(start))
+        self.assertEqual(heuristic.numFood(problem.startingState(), problem),
+                heuristic.numFood(start, compactProblem))
+
+        # Same successors, in the same order.
+        for ((nextState, action, cost), (compactState, compactAction, compactCost)) in zip(
+                problem.successorStates(problem.startingState()),
+                compactProblem.successorStates(start)):
+            self.assertEqual(nextState, compactProblem.toGridState(compactState))
+            self.assertEqual(action, compactAction)
+
+        path = reference.astar(problem, heuristic.numFood)
+        compactPath = reference.astar(compactProblem, heuristic.numFood)
+        self.assertEqual(problem.actionsCost(path), compactProblem.actionsCost(compactPath))
+
+    def test_food_spanning_tree(self):
+        state = PacmanGameState(getLayout('trickySearch'))
+
+        for problemClass in [FoodSearchProblem, CompactFoodSearchProblem]:
+            problem = problemClass(state)
+            path = reference.astar(problem, heuristic.foodSpanningTree)
+            self.assertEqual(60, problem.actionsCost(path))
+            self.assertIn('foodSpanningTree', problem.heuristicInfo)
+
+        # Admissible along the optimal path.
+        problem = CompactFoodSearchProblem(state)
+        path = reference.astar(problem, heuristic.foodSpanningTree)
+
+        current = problem.startingState()
+        for (i, action) in enumerate(path):
+            self.assertLessEqual(heuristic.foodSpanningTree(current, problem), len(path) - i)
+
+            for (nextState, nextAction, cost) in problem.successorStates(current):
+                if (nextAction == action):
+                    current = nextState
+
+        self.assertTrue(problem.isGoal(current))
+        self.assertEqual(0, heuristic.foodSpanningTree(current, problem))
+
+    def test_stats(self):
+        state = PacmanGameState(getLayout('mediumMaze'))
+
+        stats = SearchStats()
+        problem = stats.instrument(PositionSearchProblem(state))
+        self.assertIs(stats, problem.getStats())
+
+        reference.astar(problem, stats.wrapHeuristic(heuristic.manhattan), tieBreak = False)
+
+        self.assertEqual(problem.getExpandedCount(), stats.numExpanded)
+        self.assertGreaterEqual(stats.numGenerated, stats.numExpanded)
+        self.assertGreater(stats.numHeuristicCalls, 0)
+        self.assertGreater(stats.peakFrontierSize, 0)
+        self.assertGreaterEqual(stats.numPushes, stats.numDuplicatePushes)
+
+        values = json.loads(stats.toJSON(layout = 'mediumMaze'))
+        self.assertEqual('mediumMaze', values['layout'])
+        self.assertEqual(stats.numExpanded, values['numExpanded'])
+
+    def test_agent_stats(self):
+        state = PacmanGameState(getLayout('mediumMaze'))
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = os.path.join(tempDir, 'stats.jsonl')
+
+            agent = SearchAgent(0, fn = 'pacai.core.search.reference.astar',
+                    heuristic = 'pacai.core.search.heuristic.manhattan', statsPath = path)
+
+            for i in range(2):
+                agent.registerInitialState(state)
+
+            with open(path, 'r') as file:
+                lines = [json.loads(line) for line in file]
+
+        self.assertEqual(2, len(lines))
+        self.assertEqual(agent.getSearchStats().numExpanded, lines[-1]['numExpanded'])
+        self.assertEqual('pacai.core.search.heuristic.manhattan', lines[-1]['heuristic'])
+        self.assertGreater(lines[-1]['numHeuristicCalls'], 0)
+        self.assertEqual(lines[-1]['pathLength'], lines[-1]['cost'])
+
+    def test_agent_no_path(self):
+        # The default goal, (1, 1), is a wall on this layout.
+        state = PacmanGameState(getLayout('oddSearch'))
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = os.path.join(tempDir, 'stats.jsonl')
+
+            agent = SearchAgent(0, fn = 'pacai.core.search.reference.bfs', statsPath = path)
+            agent.registerInitialState(state)
+
+            with open(path, 'r') as file:
+                values = json.loads(file.read())
+
+        self.assertIsNone(values['cost'])
+        self.assertIsNone(values['pathLength'])
+        self.assertEqual(Directions.STOP, agent.getAction(state))
+
+        # No path expands to no path.
+        corridorProblem = CorridorSearchProblem(PacmanGameState(getLayout('mediumMaze')))
+        self.assertIsNone(corridorProblem.expandActions(None))
+
+if __name__ == '__main__':
+    unittest.main()
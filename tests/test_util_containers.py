@@ -1,5 +1,6 @@
 import unittest
 
+from pacai.util import frontier
 from pacai.util import priorityQueue
 from pacai.util import queue
 from pacai.util import stack
@@ -52,5 +53,80 @@ class UtilContainersTest(unittest.TestCase):
         for val, pri in reversed(val_list):
             self.assertEqual(val, testPriorityQueue.pop())
 
+    def test_indexed_priority_queue(self):
+        testPriorityQueue = priorityQueue.IndexedPriorityQueue()
+        self.assertTrue(testPriorityQueue.isEmpty())
+
+        # Sets only compare as subsets, so these would come out in the wrong order if compared.
+        items = [frozenset([x]) for x in range(10)]
+        for item in items:
+            testPriorityQueue.push(item, 5)
+
+        self.assertEqual(len(items), len(testPriorityQueue))
+        self.assertIn(items[3], testPriorityQueue)
+        self.assertRaises(ValueError, testPriorityQueue.push, items[3], 1)
+
+        # Only lowering a priority changes anything.
+        self.assertTrue(testPriorityQueue.update(items[7], 1))
+        self.assertFalse(testPriorityQueue.update(items[2], 9))
+        self.assertEqual(5, testPriorityQueue.getPriority(items[2]))
+        self.assertTrue(testPriorityQueue.update(frozenset(['new']), 0))
+
+        self.assertEqual(frozenset(['new']), testPriorityQueue.pop())
+        self.assertEqual(items[7], testPriorityQueue.pop())
+        self.assertNotIn(items[7], testPriorityQueue)
+
+        # Ties come out in the order they went in.
+        for item in items[:7] + items[8:]:
+            self.assertEqual(item, testPriorityQueue.pop())
+
+        self.assertTrue(testPriorityQueue.isEmpty())
+        self.assertRaises(IndexError, testPriorityQueue.pop)
+
+    def test_indexed_priority_queue_order(self):
+        testPriorityQueue = priorityQueue.IndexedPriorityQueue()
+
+        # Push items in a scrambled order, then lower some of their priorities.
+        priorities = {x: (x * 37) % 101 for x in range(100)}
+        for (item, priority) in priorities.items():
+            testPriorityQueue.push(item, priority)
+
+        for item in range(0, 100, 3):
+            priorities[item] -= 50
+            testPriorityQueue.update(item, priorities[item])
+
+        popped = [testPriorityQueue.pop() for i in range(len(priorities))]
+        self.assertEqual(sorted(priorities, key = lambda item: priorities[item]), popped)
+
+    def test_frontiers(self):
+        frontiers = [
+            (frontier.FrontierQueue(), [1, 2, 3, 2]),
+            (frontier.FrontierStack(), [2, 3, 2, 1]),
+            (frontier.FrontierPriorityQueueWithFunction(lambda item: -item), [3, 2, 2, 1]),
+        ]
+
+        for (testFrontier, order) in frontiers:
+            for val in [1, 2, 3, 2]:
+                testFrontier.push(val)
+
+            self.assertEqual(4, len(testFrontier))
+            self.assertIn(2, testFrontier)
+            self.assertNotIn(4, testFrontier)
+
+            # A value stays in the frontier until every copy of it is popped.
+            for (i, val) in enumerate(order):
+                self.assertEqual(val, testFrontier.pop())
+                self.assertEqual(val in order[(i + 1):], val in testFrontier)
+
+            self.assertTrue(testFrontier.isEmpty())
+
+    def test_frontier_key(self):
+        testFrontier = frontier.FrontierQueue(keyFunction = lambda item: item[0])
+        testFrontier.push(((1, 1), 'North'))
+
+        self.assertIn((1, 1), testFrontier)
+        self.assertEqual(((1, 1), 'North'), testFrontier.pop())
+        self.assertNotIn((1, 1), testFrontier)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,85 @@
+import importlib.util
+import random
+import unittest
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+
+NUM_GAMES = 40
+MAX_MOVES = 400
+
+"""
+Test that the vectorized simulator matches the scalar engine.
+"""
+class VectorSimTest(unittest.TestCase):
+    def test_matches_scalar(self):
+        if (importlib.util.find_spec('numpy') is None):
+            print("Skipping test, could not find numpy.")
+            return
+
+        from pacai.core import vectorsim
+
+        for layoutName in ['smallClassic', 'capsuleClassic', 'testClassic']:
+            self._checkLayout(vectorsim, getLayout(layoutName))
+
+        # A corridor that random play can win as well as lose.
+        self._checkLayout(vectorsim, Layout(['%%%%%%%%%%%', '%.P.o    G%', '%%%%%%%%%%%']))
+
+    def _checkLayout(self, vectorsim, layout):
+        rng = random.Random(4)
+
+        # Play random games with the scalar engine.
+        histories = []
+        finalStates = []
+
+        for i in range(NUM_GAMES):
+            state = PacmanGameState(layout)
+            history = []
+
+            while (not state.isOver() and len(history) < MAX_MOVES):
+                agentIndex = len(history) % state.getNumAgents()
+                action = rng.choice(state.getLegalActions(agentIndex))
+
+                history.append(action)
+                state = state.generateSuccessor(agentIndex, action)
+
+            histories.append(history)
+            finalStates.append(state)
+
+        # Replay the same actions in lockstep.
+        simulator = vectorsim.PacmanVectorSimulator(layout, NUM_GAMES)
+        numAgents = simulator.getNumAgents()
+
+        for move in range(max([len(history) for history in histories])):
+            actions = []
+            for history in histories:
+                if (move < len(history)):
+                    actions.append(history[move])
+                else:
+                    actions.append(vectorsim.ACTIONS[vectorsim.STOP_INDEX])
+
+            simulator.step(move % numAgents, actions)
+
+        scores = simulator.getScores()
+        wins = simulator.isWin()
+        loses = simulator.isLose()
+        numFood = simulator.getNumFood()
+        positions = simulator.getAgentPositions()
+        timers = simulator.getScaredTimers()
+
+        for i in range(NUM_GAMES):
+            state = finalStates[i]
+
+            self.assertEqual(state.getScore(), scores[i])
+            self.assertEqual(state.isWin(), wins[i])
+            self.assertEqual(state.isLose(), loses[i])
+            self.assertEqual(state.getNumFood(), numFood[i])
+
+            for agentIndex in range(numAgents):
+                agentState = state.getAgentState(agentIndex)
+                self.assertEqual(agentState.getPosition(), tuple(positions[i, agentIndex]))
+                self.assertEqual(agentState.getScaredTimer(), timers[i, agentIndex])
+
+if __name__ == '__main__':
+    unittest.main()
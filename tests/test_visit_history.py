@@ -0,0 +1,58 @@
+import unittest
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.layout import getLayout
+from pacai.core.search import reference
+from pacai.core.search.position import PositionSearchProblem
+from pacai.core.visitHistory import VisitHistory
+from pacai.ui.pacman.frame import PacmanFrame
+
+"""
+Test the bounded visit history used for highlighting.
+"""
+class VisitHistoryTest(unittest.TestCase):
+    def test_history(self):
+        history = VisitHistory(4, 3)
+        self.assertEqual(0, len(history))
+
+        self.assertTrue(history.add((2, 1)))
+        history.append((0, 0))
+        self.assertFalse(history.add((2, 1)))
+        history.append((3, 2))
+
+        self.assertEqual(3, len(history))
+        self.assertEqual([(2, 1), (0, 0), (3, 2)], list(history))
+
+        self.assertEqual(1, history.getOrder((0, 0)))
+        self.assertIsNone(history.getOrder((1, 1)))
+        self.assertIn((3, 2), history)
+        self.assertNotIn((1, 1), history)
+
+        self.assertRaises(ValueError, history.add, (4, 0))
+
+        # Copies are independent.
+        historyCopy = history.copy()
+        historyCopy.add((1, 1))
+        self.assertEqual(3, len(history))
+        self.assertEqual(4, len(historyCopy))
+
+    def test_highlights(self):
+        state = PacmanGameState(getLayout('mediumMaze'))
+        problem = PositionSearchProblem(state)
+        reference.dfs(problem)
+
+        history = problem.getVisitHistory()
+        self.assertLessEqual(len(history), len(state.getWalls().asList(False)))
+
+        state.setHighlightLocations(history)
+        self.assertEqual(list(history), list(state.getHighlightLocations()))
+
+        # Plain lists are deduplicated too.
+        state.setHighlightLocations([(1, 1), (2, 1), (1, 1)])
+        self.assertEqual([(1, 1), (2, 1)], list(state.getHighlightLocations()))
+
+        image = PacmanFrame(0, state, 0).toImage()
+        self.assertIsNotNone(image)
+
+if __name__ == '__main__':
+    unittest.main()